@@ -2,6 +2,19 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from app.extensions import db, migrate, jwt
+from app.jobs import job_queue
+from app.ai_cache import completion_cache
+from app.ai_providers import ai_providers
+from app.singleflight import single_flight
+from app.search import search_index
+from app import json_provider
+from app.query_stats import query_stats
+from app.metrics import metrics
+from app.profiling import request_profiler
+from app.passwords import password_hasher
+from app.ownership import ownership_cache
+from app.replicas import replica_router
+from app.sqlite_profile import sqlite_profile
 
 def create_app():
     app = Flask(__name__)
@@ -11,11 +24,31 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
+    app.config['AI_FANOUT_CONCURRENCY'] = int(os.environ.get('AI_FANOUT_CONCURRENCY', 8))
+    app.config['AI_FANOUT_TIMEOUT'] = float(os.environ.get('AI_FANOUT_TIMEOUT', 60))  # Seconds
+    app.config['PAGE_SIZE'] = int(os.environ.get('PAGE_SIZE', 50))  # Default rows per list page
+    app.config['MAX_PAGE_SIZE'] = int(os.environ.get('MAX_PAGE_SIZE', 200))
+    app.config['FAST_JSON'] = os.environ.get('FAST_JSON', '1') == '1'  # Encode responses with orjson when installed
+    app.config['IMPORT_CHUNK_SIZE'] = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))  # Rows per insert batch and transaction
+    app.config['IMPORT_MAX_RECORD_BYTES'] = int(os.environ.get('IMPORT_MAX_RECORD_BYTES', 1024 * 1024))
     
     # Initialize extensions
+    replica_router.init_app(app)  # Before db, which creates an engine per bind
     db.init_app(app)
+    sqlite_profile.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    password_hasher.init_app(app)
+    job_queue.init_app(app)
+    completion_cache.init_app(app)
+    ai_providers.init_app(app)
+    single_flight.init_app(app)
+    search_index.init_app(app)
+    ownership_cache.init_app(app)
+    json_provider.init_app(app)
+    metrics.init_app(app)  # First, so request timing covers the other hooks
+    query_stats.init_app(app)
+    request_profiler.init_app(app)
     
     # Enable CORS
     CORS(app)
@@ -42,8 +75,29 @@ def create_app():
     from app.api.questions import questions_bp
     app.register_blueprint(questions_bp, url_prefix='/api')
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    from app.api.progress import progress_bp
+    app.register_blueprint(progress_bp, url_prefix='/api/progress')
+    app.register_blueprint(progress_bp, url_prefix='/api', name='progress_api')
+    
+    from app.api.strategies import strategies_bp
+    app.register_blueprint(strategies_bp, url_prefix='/api')
+    
+    from app.api.jobs import jobs_bp
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    
+    from app.api.ai import ai_bp
+    app.register_blueprint(ai_bp, url_prefix='/api/ai')
+    
+    from app.api.search import search_bp
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    
+    from app.api.review import review_bp
+    app.register_blueprint(review_bp, url_prefix='/api/review')
+    
+    # CLI commands; the schema is created by `flask init-db`, not at boot
+    from app.extensions import init_db_command
+    from app.rollups import rebuild_rollups_command
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(rebuild_rollups_command)
     
     return app
\ No newline at end of file
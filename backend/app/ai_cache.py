@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, select, update
+from app.extensions import db
+from app.models.ai_models import CompletionCacheEntry
+
+def fingerprint(model, prompt, max_tokens, temperature):
+    """Return a stable cache key for a completion request.
+
+    Whitespace in the prompt is collapsed so the indentation of the prompt
+    templates does not leak into the key.
+    """
+    normalized_prompt = ' '.join(prompt.split())
+    material = json.dumps([model, normalized_prompt, int(max_tokens), float(temperature)])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class CompletionCache:
+    """Two-tier cache for AI completions.
+
+    The front tier is a per-process LRU; the back tier is the
+    ``completion_cache`` table, shared by every worker and kept within a TTL
+    and a row budget.
+    """
+
+    def __init__(self, app=None):
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('memory_hits', 'db_hits', 'misses', 'bypasses', 'stores', 'evictions'), 0
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_CACHE_ENABLED', os.environ.get('AI_CACHE_ENABLED', '1') == '1')
+        app.config.setdefault('AI_CACHE_MEMORY_SIZE', int(os.environ.get('AI_CACHE_MEMORY_SIZE', 256)))
+        app.config.setdefault('AI_CACHE_TTL', int(os.environ.get('AI_CACHE_TTL', 7 * 24 * 3600)))  # Seconds
+        app.config.setdefault('AI_CACHE_MAX_ROWS', int(os.environ.get('AI_CACHE_MAX_ROWS', 10000)))
+        app.extensions['completion_cache'] = self
+
+    def get(self, key):
+        """Return the cached text for a key, or None on a miss."""
+        config = current_app.config
+        if not config['AI_CACHE_ENABLED']:
+            return None
+
+        ttl = config['AI_CACHE_TTL']
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, stored_at = entry
+                if now - stored_at < ttl:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return text
+                del self._memory[key]
+
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                select(CompletionCacheEntry.text, CompletionCacheEntry.created_at)
+                .where(CompletionCacheEntry.key == key, CompletionCacheEntry.created_at >= cutoff)
+            ).first()
+            if row is not None:
+                conn.execute(
+                    update(CompletionCacheEntry)
+                    .where(CompletionCacheEntry.key == key)
+                    .values(
+                        hit_count=CompletionCacheEntry.hit_count + 1,
+                        last_used_at=datetime.utcnow()
+                    )
+                )
+
+        with self._lock:
+            if row is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['db_hits'] += 1
+            # Promote with the row's age so the memory copy expires with it
+            stored_at = now - (datetime.utcnow() - row.created_at).total_seconds()
+            self._remember(key, row.text, stored_at)
+        return row.text
+
+    def set(self, key, text, model):
+        """Store a completion in both tiers and trim the table to its budget."""
+        config = current_app.config
+        if not config['AI_CACHE_ENABLED']:
+            return
+
+        with self._lock:
+            self._remember(key, text, time.time())
+            self._counters['stores'] += 1
+
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=config['AI_CACHE_TTL'])
+        with db.engine.begin() as conn:
+            conn.execute(delete(CompletionCacheEntry).where(CompletionCacheEntry.key == key))
+            conn.execute(CompletionCacheEntry.__table__.insert().values(
+                key=key,
+                model=model,
+                text=text,
+                hit_count=0,
+                created_at=now,
+                last_used_at=now
+            ))
+
+            expired = conn.execute(
+                delete(CompletionCacheEntry).where(CompletionCacheEntry.created_at < cutoff)
+            ).rowcount
+            # Least recently used rows beyond the budget
+            overflow = (
+                select(CompletionCacheEntry.key)
+                .order_by(CompletionCacheEntry.last_used_at.desc())
+                .offset(config['AI_CACHE_MAX_ROWS'])
+                .scalar_subquery()
+            )
+            evicted = conn.execute(
+                delete(CompletionCacheEntry).where(CompletionCacheEntry.key.in_(overflow))
+            ).rowcount
+
+        if expired or evicted:
+            with self._lock:
+                self._counters['evictions'] += expired + evicted
+
+    def record_bypass(self):
+        with self._lock:
+            self._counters['bypasses'] += 1
+
+    def stats(self):
+        """Return hit/miss counters for this process."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['memory_entries'] = len(self._memory)
+        lookups = counters['memory_hits'] + counters['db_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['db_hits']
+        counters['hit_rate'] = round(hits / lookups, 3) if lookups else None
+        return counters
+
+    def clear_memory(self):
+        """Drop the in-process tier (the table is left untouched)."""
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key, text, stored_at):
+        # Callers hold self._lock
+        self._memory[key] = (text, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > current_app.config['AI_CACHE_MEMORY_SIZE']:
+            self._memory.popitem(last=False)
+
+completion_cache = CompletionCache()
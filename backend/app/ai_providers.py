@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from flask import current_app
+
+# What a provider returns for a blocking completion
+Completion = namedtuple('Completion', ['text', 'prompt_tokens', 'completion_tokens'])
+
+class AIProviderError(Exception):
+    """Raised when an LLM provider call fails."""
+
+class OpenAIProvider:
+    """Completions through the OpenAI HTTP API on a pooled keep-alive session."""
+
+    name = 'openai'
+
+    def __init__(self, api_key, model, base_url='https://api.openai.com/v1',
+                 connect_timeout=3.05, read_timeout=60, pool_size=10):
+        # Imported here so the stub provider does not pull in requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if not api_key:
+            raise ValueError("OpenAI API key is required")
+
+        self.model = model
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self._requests = requests
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+
+    def complete(self, prompt, max_tokens, temperature):
+        response = self._post({
+            'model': self.model,
+            'prompt': prompt,
+            'max_tokens': max_tokens,
+            'temperature': temperature
+        })
+        body = response.json()
+        usage = body.get('usage') or {}
+        return Completion(
+            body['choices'][0]['text'],
+            usage.get('prompt_tokens'),
+            usage.get('completion_tokens')
+        )
+
+    def stream(self, prompt, max_tokens, temperature):
+        """Yield text chunks as they arrive; closing the generator closes the connection."""
+        response = self._post({
+            'model': self.model,
+            'prompt': prompt,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'stream': True
+        }, stream=True)
+
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data: '):
+                    continue
+                data = line[len('data: '):]
+                if data == '[DONE]':
+                    break
+                yield json.loads(data)['choices'][0]['text']
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+    def _post(self, payload, stream=False):
+        try:
+            response = self.session.post(
+                f'{self.base_url}/completions',
+                json=payload,
+                timeout=self.timeout,
+                stream=stream
+            )
+        except self._requests.RequestException as e:
+            raise AIProviderError(f"OpenAI request failed: {str(e)}")
+
+        if response.status_code != 200:
+            try:
+                message = response.json()['error']['message']
+            except Exception:
+                message = response.text[:200]
+            response.close()
+            raise AIProviderError(f"OpenAI API returned {response.status_code}: {message}")
+
+        return response
+
+class StubProvider:
+    """Deterministic offline provider for tests, benchmarks and load tests.
+
+    The same prompt always produces the same text. ``latency`` is added to
+    every call and ``token_latency`` per generated token, so throughput runs
+    can model a real provider without network access.
+    """
+
+    name = 'stub'
+
+    def __init__(self, model='stub', latency=0.0, token_latency=0.0, tokens=200):
+        self.model = model
+        self.latency = latency
+        self.token_latency = token_latency
+        self.tokens = tokens
+
+    def complete(self, prompt, max_tokens, temperature):
+        words = self._words(prompt, max_tokens)
+        self._sleep(self.latency + self.token_latency * len(words))
+        return Completion(' '.join(words), len(prompt.split()), len(words))
+
+    def stream(self, prompt, max_tokens, temperature):
+        words = self._words(prompt, max_tokens)
+        self._sleep(self.latency)
+        for i, word in enumerate(words):
+            self._sleep(self.token_latency)
+            yield word if i == 0 else ' ' + word
+
+    def close(self):
+        pass
+
+    def _words(self, prompt, max_tokens):
+        count = min(self.tokens, max_tokens)
+
+        # Question prompts must parse, so answer them with the JSON they ask for
+        match = re.search(r'Create (\d+) practice questions', prompt)
+        if match and 'Format as JSON' in prompt:
+            topic = re.search(r'Topic: (.+)', prompt)
+            topic = topic.group(1).strip() if topic else 'the topic'
+            questions = [
+                {
+                    'question': f'Stub question {i + 1} about {topic}?',
+                    'answer': f'Stub answer {i + 1} about {topic}.',
+                    'difficulty': ('easy', 'medium', 'hard')[i % 3]
+                }
+                for i in range(int(match.group(1)))
+            ]
+            return json.dumps(questions).split(' ')
+
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16], 16)
+        rng = random.Random(seed)
+        vocabulary = [word for word in re.findall(r'[A-Za-z]+', prompt) if len(word) > 3] or ['study']
+        return [rng.choice(vocabulary).lower() for _ in range(count)]
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+class ProviderRegistry:
+    """Builds the configured LLM provider once per app and hands it out.
+
+    Providers are created on first use, so the app boots without API keys
+    and forked workers each open their own connection pool.
+    """
+
+    def __init__(self, app=None):
+        self._factories = {
+            'openai': _openai_from_config,
+            'stub': _stub_from_config
+        }
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_PROVIDER', os.environ.get('AI_PROVIDER', 'openai'))
+        app.config.setdefault('AI_MODEL', os.environ.get('AI_MODEL', 'text-davinci-003'))
+        app.config.setdefault('OPENAI_API_KEY', os.environ.get('OPENAI_API_KEY'))
+        app.config.setdefault('OPENAI_BASE_URL', os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1'))
+        app.config.setdefault('OPENAI_CONNECT_TIMEOUT', float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 3.05)))
+        app.config.setdefault('OPENAI_READ_TIMEOUT', float(os.environ.get('OPENAI_READ_TIMEOUT', 60)))
+        app.config.setdefault('OPENAI_POOL_SIZE', int(os.environ.get('OPENAI_POOL_SIZE', 10)))
+        app.config.setdefault('AI_STUB_LATENCY', float(os.environ.get('AI_STUB_LATENCY', 0)))  # Seconds per call
+        app.config.setdefault('AI_STUB_TOKEN_LATENCY', float(os.environ.get('AI_STUB_TOKEN_LATENCY', 0)))  # Seconds per token
+        app.config.setdefault('AI_STUB_TOKENS', int(os.environ.get('AI_STUB_TOKENS', 200)))
+
+    def register(self, name, factory):
+        """Make a provider available as AI_PROVIDER=name; factory(config) builds it."""
+        self._factories[name] = factory
+
+    def get(self):
+        """Return the current app's provider, building it on first use."""
+        app = current_app._get_current_object()
+        provider = app.extensions.get('ai_provider')
+        if provider is None:
+            with self._lock:
+                provider = app.extensions.get('ai_provider')
+                if provider is None:
+                    name = app.config['AI_PROVIDER']
+                    if name not in self._factories:
+                        raise ValueError(f"Unknown AI provider '{name}'")
+                    provider = self._factories[name](app.config)
+                    app.extensions['ai_provider'] = provider
+        return provider
+
+def _openai_from_config(config):
+    return OpenAIProvider(
+        api_key=config['OPENAI_API_KEY'],
+        model=config['AI_MODEL'],
+        base_url=config['OPENAI_BASE_URL'],
+        connect_timeout=config['OPENAI_CONNECT_TIMEOUT'],
+        read_timeout=config['OPENAI_READ_TIMEOUT'],
+        pool_size=config['OPENAI_POOL_SIZE']
+    )
+
+def _stub_from_config(config):
+    return StubProvider(
+        model=f"stub-{config['AI_MODEL']}",
+        latency=config['AI_STUB_LATENCY'],
+        token_latency=config['AI_STUB_TOKEN_LATENCY'],
+        tokens=config['AI_STUB_TOKENS']
+    )
+
+ai_providers = ProviderRegistry()
@@ -1,18 +1,155 @@
-import os
-import openai
+import json
+import time
 from flask import current_app
+from app.ai_cache import completion_cache, fingerprint
+from app.ai_providers import ai_providers
+from app.singleflight import single_flight
+from app.metrics import metrics
+
+def parse_practice_questions(text):
+    """Parse the JSON question list returned for a practice questions prompt.
+    
+    Raises ValueError when the completion does not contain a usable list.
+    """
+    # Models sometimes wrap the JSON in prose, so only parse the array itself
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end < start:
+        raise ValueError("Completion did not contain a JSON list of questions")
+    
+    try:
+        items = json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Completion was not valid JSON: {str(e)}")
+    
+    questions = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get('question') or not item.get('answer'):
+            continue
+        difficulty = str(item.get('difficulty', 'medium')).lower()
+        questions.append({
+            'question': str(item['question']),
+            'answer': str(item['answer']),
+            'difficulty': difficulty if difficulty in ('easy', 'medium', 'hard') else 'medium'
+        })
+    
+    if not questions:
+        raise ValueError("Completion contained no complete questions")
+    return questions
 
 class AIService:
-    """Service class for AI-powered features using OpenAI API."""
+    """Service class for AI-powered features.
     
-    def __init__(self):
-        # Initialize with OpenAI API key
-        openai.api_key = os.environ.get('OPENAI_API_KEY')
-        if not openai.api_key:
-            raise ValueError("OpenAI API key is required")
+    Completions are delegated to an LLM provider (see app.ai_providers). By
+    default that is the one configured for the current app, built on first
+    use, so constructing the service is free and needs no API key.
+    """
     
-    def generate_notes(self, course_title, topic, detail_level="medium"):
-        """Generate study notes for a given topic."""
+    def __init__(self, provider=None):
+        self._provider = provider
+    
+    @property
+    def provider(self):
+        return self._provider or ai_providers.get()
+    
+    @property
+    def model(self):
+        return self.provider.model
+    
+    def complete(self, prompt, max_tokens, temperature=0.7, use_cache=True, detail_level=None):
+        """Run a completion, serving repeated prompts from the completion cache.
+        
+        With use_cache=False the cache is not consulted, but the fresh
+        completion still replaces the cached one. Identical requests that
+        are already in flight share that call instead of starting another.
+        detail_level only labels the call's metrics: the notes detail level,
+        or the operation ('questions', 'strategies') for other prompts.
+        """
+        key = fingerprint(self.model, prompt, max_tokens, temperature)
+        
+        cached = self._cache_lookup(key, use_cache)
+        if cached is not None:
+            return cached
+        
+        def call_provider():
+            model = self.model
+            started = time.perf_counter()
+            try:
+                completion = self.provider.complete(prompt, max_tokens=max_tokens, temperature=temperature)
+            except Exception:
+                metrics.observe_ai(model, detail_level, 'complete', time.perf_counter() - started, error=True)
+                raise
+            metrics.observe_ai(
+                model, detail_level, 'complete', time.perf_counter() - started,
+                prompt_tokens=completion.prompt_tokens, completion_tokens=completion.completion_tokens
+            )
+            text = completion.text.strip()
+            self._cache_store(key, text)
+            return text
+        
+        # Waiters in other processes pick the result up from the cache
+        return single_flight.do(key, call_provider, recheck=lambda: self._cache_peek(key))
+    
+    def stream_complete(self, prompt, max_tokens, temperature=0.7, use_cache=True, detail_level=None):
+        """Yield a completion in chunks as the provider produces them.
+        
+        Closing the generator (e.g. when the client disconnects) closes the
+        upstream stream. Only completions received in full are cached.
+        """
+        key = fingerprint(self.model, prompt, max_tokens, temperature)
+        
+        cached = self._cache_lookup(key, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        model = self.model
+        started = time.perf_counter()
+        stream = self.provider.stream(prompt, max_tokens=max_tokens, temperature=temperature)
+        
+        chunks = []
+        failed = False
+        try:
+            for text in stream:
+                # Match complete(), which strips the leading whitespace
+                if not chunks:
+                    text = text.lstrip()
+                if text:
+                    chunks.append(text)
+                    yield text
+        except Exception:
+            failed = True
+            raise
+        finally:
+            stream.close()
+            # Streams report no usage, so only time and errors are recorded
+            metrics.observe_ai(model, detail_level, 'stream', time.perf_counter() - started, error=failed)
+        
+        self._cache_store(key, ''.join(chunks).strip())
+    
+    def _cache_lookup(self, key, use_cache):
+        if not use_cache:
+            completion_cache.record_bypass()
+            return None
+        try:
+            return completion_cache.get(key)
+        except Exception as e:
+            current_app.logger.warning(f"Completion cache read failed: {str(e)}")
+            return None
+    
+    def _cache_peek(self, key):
+        try:
+            return completion_cache.get(key)
+        except Exception:
+            return None
+    
+    def _cache_store(self, key, text):
+        try:
+            completion_cache.set(key, text, model=self.model)
+        except Exception as e:
+            current_app.logger.warning(f"Completion cache write failed: {str(e)}")
+    
+    def notes_prompt(self, course_title, topic, detail_level="medium"):
+        """Build the prompt and token limit for study notes."""
         # Define token limits based on detail level
         max_tokens = {
             "brief": 500,
@@ -35,20 +172,25 @@ class AIService:
         Use clear headings and bullet points where appropriate.
         """
         
+        return prompt, max_tokens
+    
+    def generate_notes(self, course_title, topic, detail_level="medium", use_cache=True):
+        """Generate study notes for a given topic."""
+        prompt, max_tokens = self.notes_prompt(course_title, topic, detail_level)
+        
         try:
-            response = openai.Completion.create(
-                model="text-davinci-003",
-                prompt=prompt,
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            return response.choices[0].text.strip()
+            return self.complete(prompt, max_tokens=max_tokens, use_cache=use_cache, detail_level=detail_level)
         except Exception as e:
-            current_app.logger.error(f"OpenAI API error: {str(e)}")
+            current_app.logger.error(f"AI provider error: {str(e)}")
             return f"Failed to generate notes. Error: {str(e)}"
     
-    def generate_practice_questions(self, course_title, topic, count=5, difficulty="mixed"):
-        """Generate practice questions for a given topic."""
+    def stream_notes(self, course_title, topic, detail_level="medium", use_cache=True):
+        """Stream study notes for a given topic chunk by chunk."""
+        prompt, max_tokens = self.notes_prompt(course_title, topic, detail_level)
+        return self.stream_complete(prompt, max_tokens=max_tokens, use_cache=use_cache, detail_level=detail_level)
+    
+    def practice_questions_prompt(self, course_title, topic, count=5, difficulty="mixed"):
+        """Build the prompt and token limit for practice questions."""
         difficulty_prompt = ""
         if difficulty != "mixed":
             difficulty_prompt = f"Make all questions {difficulty} difficulty level."
@@ -77,23 +219,22 @@ class AIService:
         {difficulty_prompt}
         """
         
+        return prompt, 2000
+    
+    def generate_practice_questions(self, course_title, topic, count=5, difficulty="mixed", use_cache=True):
+        """Generate practice questions for a given topic."""
+        prompt, max_tokens = self.practice_questions_prompt(course_title, topic, count, difficulty)
+        
         try:
-            response = openai.Completion.create(
-                model="text-davinci-003",
-                prompt=prompt,
-                max_tokens=2000,
-                temperature=0.7
-            )
-            
             # Note: In production, you'd want to properly parse the JSON
             # This is simplified for demonstration
-            return response.choices[0].text.strip()
+            return self.complete(prompt, max_tokens=max_tokens, use_cache=use_cache, detail_level='questions')
         except Exception as e:
-            current_app.logger.error(f"OpenAI API error: {str(e)}")
+            current_app.logger.error(f"AI provider error: {str(e)}")
             return f"Failed to generate questions. Error: {str(e)}"
     
-    def generate_test_strategies(self, test_type, student_problems=None):
-        """Generate test-taking strategies."""
+    def test_strategies_prompt(self, test_type, student_problems=None):
+        """Build the prompt and token limit for test-taking strategies."""
         problems_prompt = ""
         if student_problems:
             problems_prompt = f"The student has mentioned these specific challenges: {', '.join(student_problems)}."
@@ -113,14 +254,19 @@ class AIService:
         Format with clear sections and actionable advice.
         """
         
+        return prompt, 1500
+    
+    def generate_test_strategies(self, test_type, student_problems=None, use_cache=True):
+        """Generate test-taking strategies."""
+        prompt, max_tokens = self.test_strategies_prompt(test_type, student_problems)
+        
         try:
-            response = openai.Completion.create(
-                model="text-davinci-003",
-                prompt=prompt,
-                max_tokens=1500,
-                temperature=0.7
-            )
-            return response.choices[0].text.strip()
+            return self.complete(prompt, max_tokens=max_tokens, use_cache=use_cache, detail_level='strategies')
         except Exception as e:
-            current_app.logger.error(f"OpenAI API error: {str(e)}")
-            return f"Failed to generate test strategies. Error: {str(e)}"
\ No newline at end of file
+            current_app.logger.error(f"AI provider error: {str(e)}")
+            return f"Failed to generate test strategies. Error: {str(e)}"
+    
+    def stream_test_strategies(self, test_type, student_problems=None, use_cache=True):
+        """Stream test-taking strategies chunk by chunk."""
+        prompt, max_tokens = self.test_strategies_prompt(test_type, student_problems)
+        return self.stream_complete(prompt, max_tokens=max_tokens, use_cache=use_cache, detail_level='strategies')
\ No newline at end of file
@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.ai_cache import completion_cache
+from app.singleflight import single_flight
+
+ai_bp = Blueprint('ai', __name__)
+
+# Get completion cache and request coalescing counters for this process
+@ai_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_ai_stats():
+    return jsonify({
+        'completion_cache': completion_cache.stats(),
+        'single_flight': single_flight.stats()
+    }), 200
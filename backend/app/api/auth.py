@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
 from app.extensions import db
 from app.models.user import User
+from app.passwords import password_hasher
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -48,6 +49,11 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({"error": "Invalid username or password"}), 401
     
+    # Upgrade hashes made with an older method or cost while we have the password
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password = data['password']
+        db.session.commit()
+    
     # Generate access token
     access_token = create_access_token(identity=user.id)
     
@@ -1,28 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
+from app.pagination import InvalidCursor, paginate
+from app.serializers import course_serializer
+from app.api.etag import conditional_get
+from app import versions
+from app.ownership import ownership_cache
 from app.models.user import User
 from app.models.study_models import Course, Note
+from app.course_export import export_lines
 
 courses_bp = Blueprint('courses', __name__)
 
 # Get all courses for current user
 @courses_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get(versions.COURSES)
 def get_courses():
     current_user_id = get_jwt_identity()
-    courses = Course.query.filter_by(user_id=current_user_id).all()
-    
-    result = []
-    for course in courses:
-        result.append({
-            'id': course.id,
-            'title': course.title,
-            'description': course.description,
-            'created_at': course.created_at.isoformat()
-        })
-    
-    return jsonify(result), 200
+    try:
+        rows, next_cursor = paginate(course_serializer.select().where(Course.user_id == current_user_id), Course)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    
+    return jsonify({"items": course_serializer.rows(rows), "next_cursor": next_cursor}), 200
 
 # Create a new course
 @courses_bp.route('/', methods=['POST'])
@@ -41,18 +42,17 @@ def create_course():
     )
     
     db.session.add(new_course)
+    versions.bump(versions.courses_scope(current_user_id))
     db.session.commit()
+    # After the commit, so no request can cache the old answer again
+    ownership_cache.forget(current_user_id, new_course.id)
     
-    return jsonify({
-        'id': new_course.id,
-        'title': new_course.title,
-        'description': new_course.description,
-        'created_at': new_course.created_at.isoformat()
-    }), 201
+    return jsonify(course_serializer.one(new_course)), 201
 
 # Get a specific course
 @courses_bp.route('/<int:course_id>', methods=['GET'])
 @jwt_required()
+@conditional_get(versions.COURSE)
 def get_course(course_id):
     current_user_id = get_jwt_identity()
     course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
@@ -60,12 +60,24 @@ def get_course(course_id):
     if not course:
         return jsonify({"error": "Course not found"}), 404
     
-    return jsonify({
-        'id': course.id,
-        'title': course.title,
-        'description': course.description,
-        'created_at': course.created_at.isoformat()
-    }), 200
+    return jsonify(course_serializer.one(course)), 200
+
+# Export a course with its notes, questions and tests as NDJSON
+@courses_bp.route('/<int:course_id>/export', methods=['GET'])
+@jwt_required()
+def export_course(course_id):
+    current_user_id = get_jwt_identity()
+    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
+    
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+    
+    # Rows are read and written in batches while the response streams
+    return Response(
+        stream_with_context(export_lines(course)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename=course-{course.id}.ndjson'}
+    )
 
 # Update a course
 @courses_bp.route('/<int:course_id>', methods=['PUT'])
@@ -84,14 +96,10 @@ def update_course(course_id):
     if 'description' in data:
         course.description = data['description']
     
+    versions.bump(versions.courses_scope(current_user_id), versions.course_scope(course_id))
     db.session.commit()
     
-    return jsonify({
-        'id': course.id,
-        'title': course.title,
-        'description': course.description,
-        'created_at': course.created_at.isoformat()
-    }), 200
+    return jsonify(course_serializer.one(course)), 200
 
 # Delete a course
 @courses_bp.route('/<int:course_id>', methods=['DELETE'])
@@ -103,7 +111,15 @@ def delete_course(course_id):
     if not course:
         return jsonify({"error": "Course not found"}), 404
     
-    db.session.delete(course)
+    db.session.delete(course)  # Also unlinks the course's todos
+    # The course scope is bumped rather than dropped, so its tags never come back
+    versions.bump(
+        versions.courses_scope(current_user_id),
+        versions.todos_scope(current_user_id),
+        versions.course_scope(course_id)
+    )
     db.session.commit()
+    # After the commit, so no request can cache the old answer again
+    ownership_cache.forget(current_user_id, course_id)
     
     return jsonify({"message": "Course deleted successfully"}), 200
\ No newline at end of file
@@ -0,0 +1,50 @@
+from flask import Blueprint, jsonify, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.jobs import job_queue
+from app.models.job_models import GenerationJob
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def serialize_job(job):
+    """Build the status payload for a job, including its result once finished."""
+    data = {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': url_for('jobs.get_job', job_id=job.id)
+    }
+    if job.status == 'succeeded':
+        data['result'] = job.result
+    elif job.status == 'failed':
+        data['error'] = job.error
+    return data
+
+def job_accepted(job):
+    """Response for an endpoint that handed its work to the job queue."""
+    data = serialize_job(job)
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': data['status_url']
+    }), 202, {'Location': data['status_url']}
+
+# Get queue depth and latency figures
+@jobs_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_job_stats():
+    return jsonify(job_queue.stats()), 200
+
+# Get the status (and result, once finished) of a job
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    current_user_id = get_jwt_identity()
+
+    job = GenerationJob.query.filter_by(id=job_id, user_id=current_user_id).first()
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(serialize_job(job)), 200
@@ -1,9 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
+from app.pagination import InvalidCursor, paginate
+from app.serializers import note_serializer
+from app.api.etag import conditional_get
+from app.ownership import get_owned_note, ownership_cache
+from app import versions
+from app.bulk_import import CourseDeleted, import_records, records_from_request, validate_note
 from app.models.user import User
 from app.models.study_models import Course, Note
 from app.ai_service import AIService
+from app.jobs import job_queue
+from app.api.jobs import job_accepted
+from app.api.sse import sse_event, sse_response
 
 notes_bp = Blueprint('notes', __name__)
 ai_service = AIService()
@@ -11,27 +20,20 @@ ai_service = AIService()
 # Get all notes for a course
 @notes_bp.route('/course/<int:course_id>/notes', methods=['GET'])
 @jwt_required()
+@conditional_get(versions.COURSE)
 def get_notes(course_id):
     current_user_id = get_jwt_identity()
     
     # Verify course belongs to user
-    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
-    if not course:
+    if not ownership_cache.owns_course(current_user_id, course_id):
         return jsonify({"error": "Course not found"}), 404
     
-    notes = Note.query.filter_by(course_id=course_id).all()
-    
-    result = []
-    for note in notes:
-        result.append({
-            'id': note.id,
-            'title': note.title,
-            'content': note.content,
-            'created_at': note.created_at.isoformat(),
-            'course_id': note.course_id
-        })
+    try:
+        rows, next_cursor = paginate(note_serializer.select().where(Note.course_id == course_id), Note)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     
-    return jsonify(result), 200
+    return jsonify({"items": note_serializer.rows(rows), "next_cursor": next_cursor}), 200
 
 # Create a new note
 @notes_bp.route('/course/<int:course_id>/notes', methods=['POST'])
@@ -40,8 +42,7 @@ def create_note(course_id):
     current_user_id = get_jwt_identity()
     
     # Verify course belongs to user
-    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
-    if not course:
+    if not ownership_cache.owns_course(current_user_id, course_id, for_write=True):
         return jsonify({"error": "Course not found"}), 404
     
     data = request.get_json()
@@ -56,15 +57,28 @@ def create_note(course_id):
     )
     
     db.session.add(new_note)
+    versions.bump(versions.course_scope(course_id))
     db.session.commit()
     
-    return jsonify({
-        'id': new_note.id,
-        'title': new_note.title,
-        'content': new_note.content,
-        'created_at': new_note.created_at.isoformat(),
-        'course_id': new_note.course_id
-    }), 201
+    return jsonify(note_serializer.one(new_note)), 201
+
+# Bulk import notes from an NDJSON or JSON array body
+@notes_bp.route('/course/<int:course_id>/notes/import', methods=['POST'])
+@jwt_required()
+def import_notes(course_id):
+    current_user_id = get_jwt_identity()
+    
+    # Verify course belongs to user
+    if not ownership_cache.owns_course(current_user_id, course_id, for_write=True):
+        return jsonify({"error": "Course not found"}), 404
+    
+    try:
+        report = import_records(records_from_request(request), Note, validate_note, course_id,
+                                before_commit=lambda: versions.bump(versions.course_scope(course_id)))
+    except CourseDeleted:
+        db.session.rollback()
+        return jsonify({"error": "Course not found"}), 404
+    return jsonify(report), 200
 
 # Get a specific note
 @notes_bp.route('/notes/<int:note_id>', methods=['GET'])
@@ -72,22 +86,13 @@ def create_note(course_id):
 def get_note(note_id):
     current_user_id = get_jwt_identity()
     
-    # Join note with course to verify ownership
-    note = db.session.query(Note).join(Course).filter(
-        Note.id == note_id,
-        Course.user_id == current_user_id
-    ).first()
+    # Fetch the note and verify ownership in one query
+    note = get_owned_note(current_user_id, note_id)
     
     if not note:
         return jsonify({"error": "Note not found"}), 404
     
-    return jsonify({
-        'id': note.id,
-        'title': note.title,
-        'content': note.content,
-        'created_at': note.created_at.isoformat(),
-        'course_id': note.course_id
-    }), 200
+    return jsonify(note_serializer.one(note)), 200
 
 # Update a note
 @notes_bp.route('/notes/<int:note_id>', methods=['PUT'])
@@ -95,11 +100,8 @@ def get_note(note_id):
 def update_note(note_id):
     current_user_id = get_jwt_identity()
     
-    # Join note with course to verify ownership
-    note = db.session.query(Note).join(Course).filter(
-        Note.id == note_id,
-        Course.user_id == current_user_id
-    ).first()
+    # Fetch the note and verify ownership in one query
+    note = get_owned_note(current_user_id, note_id)
     
     if not note:
         return jsonify({"error": "Note not found"}), 404
@@ -111,15 +113,10 @@ def update_note(note_id):
     if 'content' in data:
         note.content = data['content']
     
+    versions.bump(versions.course_scope(note.course_id))
     db.session.commit()
     
-    return jsonify({
-        'id': note.id,
-        'title': note.title,
-        'content': note.content,
-        'created_at': note.created_at.isoformat(),
-        'course_id': note.course_id
-    }), 200
+    return jsonify(note_serializer.one(note)), 200
 
 # Delete a note
 @notes_bp.route('/notes/<int:note_id>', methods=['DELETE'])
@@ -127,16 +124,14 @@ def update_note(note_id):
 def delete_note(note_id):
     current_user_id = get_jwt_identity()
     
-    # Join note with course to verify ownership
-    note = db.session.query(Note).join(Course).filter(
-        Note.id == note_id,
-        Course.user_id == current_user_id
-    ).first()
+    # Fetch the note and verify ownership in one query
+    note = get_owned_note(current_user_id, note_id)
     
     if not note:
         return jsonify({"error": "Note not found"}), 404
     
     db.session.delete(note)
+    versions.bump(versions.course_scope(note.course_id))
     db.session.commit()
     
     return jsonify({"message": "Note deleted successfully"}), 200
@@ -159,31 +154,98 @@ def generate_notes(course_id):
     # Get optional detail level
     detail_level = data.get('detail_level', 'medium')
     
-    try:
-        # Generate notes using AI service
-        generated_content = ai_service.generate_notes(
-            course_title=course.title,
-            topic=data['topic'],
-            detail_level=detail_level
-        )
+    # Generation runs on the job queue; the client polls the job for the note
+    job = job_queue.enqueue('generate_notes', current_user_id, {
+        'course_id': course_id,
+        'topic': data['topic'],
+        'detail_level': detail_level,
+        'use_cache': not data.get('refresh', False)
+    })
+    
+    return job_accepted(job)
+
+# Generate notes with AI, streaming them as Server-Sent Events
+@notes_bp.route('/course/<int:course_id>/generate-notes/stream', methods=['POST'])
+@jwt_required()
+def stream_notes(course_id):
+    current_user_id = get_jwt_identity()
+    
+    # Verify course belongs to user
+    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+    
+    data = request.get_json()
+    if not data or not data.get('topic'):
+        return jsonify({"error": "Topic is required"}), 400
+    
+    topic = data['topic']
+    chunks = ai_service.stream_notes(
+        course_title=course.title,
+        topic=topic,
+        detail_level=data.get('detail_level', 'medium'),
+        use_cache=not data.get('refresh', False)
+    )
+    
+    def events():
+        content = []
+        try:
+            for chunk in chunks:
+                content.append(chunk)
+                yield sse_event('token', {'text': chunk})
+        except Exception as e:
+            current_app.logger.error(f"AI provider error: {str(e)}")
+            yield sse_event('error', {'error': str(e)})
+            return
+        finally:
+            # Runs on client disconnect too, cancelling the upstream completion
+            chunks.close()
         
-        # Create a new note with generated content
+        # Persist the note only once the whole completion has arrived
         new_note = Note(
-            title=f"Notes: {data['topic']}",
-            content=generated_content,
+            title=f"Notes: {topic}",
+            content=''.join(content).strip(),
             course_id=course_id
         )
-        
         db.session.add(new_note)
+        versions.bump(versions.course_scope(course_id))
         db.session.commit()
         
-        return jsonify({
-            'id': new_note.id,
-            'title': new_note.title,
-            'content': new_note.content,
-            'created_at': new_note.created_at.isoformat(),
-            'course_id': new_note.course_id
-        }), 201
-        
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        yield sse_event('done', note_serializer.one(new_note))
+    
+    return sse_response(events())
+
+@job_queue.handler('generate_notes')
+def run_generate_notes(job):
+    """Generate notes for a queued job and persist them as a new Note."""
+    payload = job.payload
+    
+    # The course may have been deleted while the job was waiting
+    course = Course.query.filter_by(id=payload['course_id'], user_id=job.user_id).first()
+    if not course:
+        raise LookupError("Course not found")
+    
+    # complete() raises on provider errors, which fails the job; the
+    # generate_* helpers would return the error text as the note
+    prompt, max_tokens = ai_service.notes_prompt(course.title, payload['topic'], payload['detail_level'])
+    generated_content = ai_service.complete(
+        prompt,
+        max_tokens=max_tokens,
+        use_cache=payload.get('use_cache', True),
+        detail_level=payload['detail_level']
+    )
+    
+    # Create a new note with generated content
+    new_note = Note(
+        title=f"Notes: {payload['topic']}",
+        content=generated_content,
+        course_id=course.id
+    )
+    
+    db.session.add(new_note)
+    versions.bump(versions.course_scope(course.id))
+    db.session.flush()
+    
+    return {
+        'note': note_serializer.one(new_note)
+    }
@@ -1,14 +1,32 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
+from app.pagination import InvalidCursor, paginate
+from app.serializers import todo_serializer
+from app.api.etag import conditional_get
+from app import versions
+from app.ownership import ownership_cache
 from app.models.user import User
 from app.models.study_models import Course, PracticeQuestion
 from app.models.progress_models import StudyProgress, DailyStudy, StudySession, Todo
+from app import progress_stats, rollups
 from datetime import datetime, date, timedelta
+from sqlalchemy import bindparam, case, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import json
 
 progress_bp = Blueprint('progress', __name__)
 
+MAX_BATCH_RATINGS = 1000
+
+progress_table = StudyProgress.__table__
+questions_table = PracticeQuestion.__table__
+courses_table = Course.__table__
+_single_upserts = {}  # Dialect name -> prebuilt single-rating upsert
+
 # Record question progress (confidence level)
 @progress_bp.route('/question-progress', methods=['POST'])
 @jwt_required()
@@ -26,32 +44,10 @@ def record_question_progress():
     if confidence_level not in [1, 2, 3]:
         return jsonify({"error": "Confidence level must be 1, 2, or 3"}), 400
     
-    # Verify the question exists and user has access to it
-    question = db.session.query(PracticeQuestion).join(Course).filter(
-        PracticeQuestion.id == question_id,
-        Course.user_id == current_user_id
-    ).first()
-    
-    if not question:
+    # Ownership check and insert-or-update in one statement
+    if not record_confidence(current_user_id, {question_id: confidence_level}):
         return jsonify({"error": "Question not found or you don't have access"}), 404
     
-    # Create or update progress record
-    progress = StudyProgress.query.filter_by(
-        user_id=current_user_id,
-        question_id=question_id
-    ).first()
-    
-    if progress:
-        progress.confidence_level = confidence_level
-    else:
-        progress = StudyProgress(
-            user_id=current_user_id,
-            course_id=question.course_id,
-            question_id=question_id,
-            confidence_level=confidence_level
-        )
-        db.session.add(progress)
-    
     db.session.commit()
     
     return jsonify({
@@ -60,6 +56,36 @@ def record_question_progress():
         "confidence_level": confidence_level
     }), 200
 
+# Record many confidence ratings at once, e.g. at the end of a study session
+@progress_bp.route('/question-progress/batch', methods=['POST'])
+@jwt_required()
+def record_question_progress_batch():
+    current_user_id = get_jwt_identity()
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('ratings'), list) or not data['ratings']:
+        return jsonify({"error": "A non-empty list of ratings is required"}), 400
+    if len(data['ratings']) > MAX_BATCH_RATINGS:
+        return jsonify({"error": f"At most {MAX_BATCH_RATINGS} ratings per request"}), 400
+    
+    # Later ratings of the same question win
+    ratings = {}
+    for index, rating in enumerate(data['ratings']):
+        if not isinstance(rating, dict) or not isinstance(rating.get('question_id'), int):
+            return jsonify({"error": f"Rating {index}: question_id is required"}), 400
+        if rating.get('confidence_level') not in [1, 2, 3]:
+            return jsonify({"error": f"Rating {index}: confidence level must be 1, 2, or 3"}), 400
+        ratings[rating['question_id']] = rating['confidence_level']
+    
+    recorded = record_confidence(current_user_id, ratings)
+    db.session.commit()
+    
+    return jsonify({
+        "message": "Progress recorded successfully",
+        "recorded": len(recorded),
+        "not_found": sorted(set(ratings) - set(recorded))
+    }), 200
+
 # Start a new study session
 @progress_bp.route('/study-session/start', methods=['POST'])
 @jwt_required()
@@ -72,8 +98,7 @@ def start_study_session():
     
     # If course_id provided, verify user has access to it
     if course_id:
-        course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
-        if not course:
+        if not ownership_cache.owns_course(current_user_id, course_id, for_write=True):
             return jsonify({"error": "Course not found or you don't have access"}), 404
     
     # Create new study session
@@ -114,7 +139,6 @@ def end_study_session(session_id):
     
     # End the session
     session.end_session()
-    db.session.commit()
     
     # Update daily study time
     today = date.today()
@@ -133,6 +157,10 @@ def end_study_session(session_id):
         )
         db.session.add(daily_study)
     
+    # Keep the streak/rollup row in step, in the same transaction
+    db.session.flush()
+    rollups.record_study(current_user_id, today, session.duration_minutes, daily_study.total_minutes)
+    
     db.session.commit()
     
     return jsonify({
@@ -149,75 +177,51 @@ def get_weekly_progress():
     current_user_id = get_jwt_identity()
     
     # Calculate date range for last 7 days
-    end_date = date.today()
-    start_date = end_date - timedelta(days=6)
-    
-    # Query daily study records for the last 7 days
-    daily_records = DailyStudy.query.filter(
-        DailyStudy.user_id == current_user_id,
-        DailyStudy.study_date >= start_date,
-        DailyStudy.study_date <= end_date
-    ).all()
+    start_date, end_date = progress_stats.week_range(date.today())
     
-    # Initialize daily data with zeros
+    # Study time and streaks come from the rollup row; users without one
+    # yet (no session ended since rollups were added) get it built now
+    rollup = rollups.get_rollup(current_user_id)
+    if rollup is None:
+        rollup = rollups.rebuild_rollup(current_user_id, end_date)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request built it first; use that one
+            db.session.rollback()
+            rollup = rollups.get_rollup(current_user_id)
+    minutes_by_day = rollup.minutes_between(start_date, end_date)
+    
+    # Initialize daily data with zeros and fill in actual data
     daily_data = {}
     current_date = start_date
     while current_date <= end_date:
-        daily_data[current_date.isoformat()] = 0
+        daily_data[current_date.isoformat()] = minutes_by_day.get(current_date, 0) / 60  # Convert to hours
         current_date += timedelta(days=1)
     
-    # Fill in actual data
-    for record in daily_records:
-        daily_data[record.study_date.isoformat()] = record.total_minutes / 60  # Convert to hours
-    
     # Get question confidence distribution
-    confidence_counts = {1: 0, 2: 0, 3: 0}
-    progress_records = StudyProgress.query.filter_by(user_id=current_user_id).all()
-    
-    for record in progress_records:
-        confidence_counts[record.confidence_level] = confidence_counts.get(record.confidence_level, 0) + 1
+    confidence_counts = progress_stats.confidence_distribution(current_user_id)
     
-    # Calculate course performance
+    # Calculate course performance from the average confidence per course
     course_performance = []
-    courses = Course.query.filter_by(user_id=current_user_id).all()
-    
-    for course in courses:
-        # Get average confidence for questions in this course
-        course_progress = StudyProgress.query.filter_by(
-            user_id=current_user_id,
-            course_id=course.id
-        ).all()
-        
-        if course_progress:
-            avg_confidence = sum(p.confidence_level for p in course_progress) / len(course_progress)
-            # Scale to percentage (1=33%, 2=66%, 3=100%)
-            performance = (avg_confidence / 3) * 100
-        else:
-            performance = 0
+    for course_id, title, avg_confidence in progress_stats.course_performance(current_user_id):
+        # Scale to percentage (1=33%, 2=66%, 3=100%)
+        performance = (float(avg_confidence) / 3) * 100 if avg_confidence is not None else 0
         
         course_performance.append({
-            'id': course.id,
-            'title': course.title,
+            'id': course_id,
+            'title': title,
             'performance': round(performance, 1)
         })
     
     # Calculate total study hours for the week
     total_hours = sum(daily_data.values())
     
-    # Calculate current study streak
-    streak = 0
-    current_date = end_date
-    while True:
-        daily_record = DailyStudy.query.filter_by(
-            user_id=current_user_id,
-            study_date=current_date
-        ).first()
-        
-        if daily_record and daily_record.total_minutes > 0:
-            streak += 1
-            current_date -= timedelta(days=1)
-        else:
-            break
+    # Current streak counts only if it runs up to today
+    streak = rollup.streak_on(end_date)
+    
+    # Minutes over the last 30 days
+    minutes_30d = sum(rollup.minutes_between(end_date - timedelta(days=29), end_date).values())
     
     return jsonify({
         "weekly_data": {
@@ -231,29 +235,25 @@ def get_weekly_progress():
         },
         "course_performance": course_performance,
         "total_hours": round(total_hours, 1),
-        "streak": streak
+        "streak": streak,
+        "longest_streak": rollup.longest_streak,
+        "minutes_last_30_days": minutes_30d
     }), 200
 
 # Get user's todos
 @progress_bp.route('/todos', methods=['GET'])
 @jwt_required()
+@conditional_get(versions.TODOS)
 def get_todos():
     current_user_id = get_jwt_identity()
     
-    todos = Todo.query.filter_by(user_id=current_user_id).order_by(Todo.created_at.desc()).all()
-    
-    result = []
-    for todo in todos:
-        result.append({
-            'id': todo.id,
-            'text': todo.text,
-            'completed': todo.completed,
-            'course_id': todo.course_id,
-            'due_date': todo.due_date.isoformat() if todo.due_date else None,
-            'created_at': todo.created_at.isoformat()
-        })
+    # Newest first
+    try:
+        rows, next_cursor = paginate(todo_serializer.select().where(Todo.user_id == current_user_id), Todo, descending=True)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     
-    return jsonify(result), 200
+    return jsonify({"items": todo_serializer.rows(rows), "next_cursor": next_cursor}), 200
 
 # Create a new todo
 @progress_bp.route('/todos', methods=['POST'])
@@ -285,16 +285,10 @@ def create_todo():
     )
     
     db.session.add(todo)
+    versions.bump(versions.todos_scope(current_user_id))
     db.session.commit()
     
-    return jsonify({
-        'id': todo.id,
-        'text': todo.text,
-        'completed': todo.completed,
-        'course_id': todo.course_id,
-        'due_date': todo.due_date.isoformat() if todo.due_date else None,
-        'created_at': todo.created_at.isoformat()
-    }), 201
+    return jsonify(todo_serializer.one(todo)), 201
 
 # Update todo status
 @progress_bp.route('/todos/<int:todo_id>', methods=['PUT'])
@@ -320,16 +314,10 @@ def update_todo(todo_id):
         else:
             todo.due_date = None
     
+    versions.bump(versions.todos_scope(current_user_id))
     db.session.commit()
     
-    return jsonify({
-        'id': todo.id,
-        'text': todo.text,
-        'completed': todo.completed,
-        'course_id': todo.course_id,
-        'due_date': todo.due_date.isoformat() if todo.due_date else None,
-        'created_at': todo.created_at.isoformat()
-    }), 200
+    return jsonify(todo_serializer.one(todo)), 200
 
 # Delete a todo
 @progress_bp.route('/todos/<int:todo_id>', methods=['DELETE'])
@@ -342,6 +330,74 @@ def delete_todo(todo_id):
         return jsonify({"error": "Todo not found or you don't have access"}), 404
     
     db.session.delete(todo)
+    versions.bump(versions.todos_scope(current_user_id))
     db.session.commit()
     
-    return jsonify({"message": "Todo deleted successfully"}), 200
\ No newline at end of file
+    return jsonify({"message": "Todo deleted successfully"}), 200
+
+def record_confidence(user_id, ratings):
+    """Upsert {question_id: confidence_level} for questions the user owns.
+
+    One INSERT ... SELECT ... ON CONFLICT DO UPDATE: the join to courses
+    drops questions the user cannot access, and the unique index on
+    (user_id, question_id) turns repeat ratings into updates. Returns the
+    question ids that were recorded.
+    """
+    dialect = db.engine.dialect
+    params = {'user_id': user_id, 'now': datetime.utcnow()}
+    
+    if len(ratings) == 1:
+        # The single-rating statement never changes shape, so build it once
+        statement = _single_upserts.get(dialect.name)
+        if statement is None:
+            statement = _single_upserts[dialect.name] = _confidence_upsert(
+                dialect,
+                bindparam('confidence_level'),
+                questions_table.c.id == bindparam('question_id')
+            )
+        (params['question_id'], params['confidence_level']), = ratings.items()
+    else:
+        statement = _confidence_upsert(
+            dialect,
+            case(ratings, value=questions_table.c.id),
+            questions_table.c.id.in_(list(ratings))
+        )
+    
+    if dialect.insert_returning:
+        return db.session.execute(statement.returning(progress_table.c.question_id), params).scalars().all()
+    
+    # Without RETURNING, look up which of the questions are the user's
+    db.session.execute(statement, params)
+    return db.session.execute(
+        select(questions_table.c.id)
+        .join(courses_table, courses_table.c.id == questions_table.c.course_id)
+        .where(questions_table.c.id.in_(list(ratings)), courses_table.c.user_id == user_id)
+    ).scalars().all()
+
+def _confidence_upsert(dialect, level, question_filter):
+    # Core tables rather than mapped classes: the statement needs no ORM
+    # bookkeeping, which would otherwise cost more than the query itself
+    rows = (
+        select(
+            bindparam('user_id'),
+            questions_table.c.course_id,
+            questions_table.c.id,
+            level,
+            bindparam('now', type_=progress_table.c.created_at.type)
+        )
+        .join(courses_table, courses_table.c.id == questions_table.c.course_id)
+        .where(question_filter, courses_table.c.user_id == bindparam('user_id'))
+    )
+    columns = ['user_id', 'course_id', 'question_id', 'confidence_level', 'created_at']
+    
+    if dialect.name == 'mysql':
+        statement = mysql_insert(progress_table).from_select(columns, rows)
+        return statement.on_duplicate_key_update(confidence_level=statement.inserted.confidence_level)
+    
+    # SQLite and PostgreSQL share the ON CONFLICT syntax
+    insert_for = sqlite_insert if dialect.name == 'sqlite' else postgresql_insert
+    statement = insert_for(progress_table).from_select(columns, rows)
+    return statement.on_conflict_do_update(
+        index_elements=['user_id', 'question_id'],
+        set_={'confidence_level': statement.excluded.confidence_level}
+    )
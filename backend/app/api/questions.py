@@ -1,36 +1,41 @@
-from flask import Blueprint, request, jsonify
+import time
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
 from app.extensions import db
+from app.pagination import InvalidCursor, paginate
+from app.serializers import question_serializer
+from app.api.etag import conditional_get
+from app.ownership import ownership_cache
+from app import review, versions
+from app.bulk_import import CourseDeleted, import_records, records_from_request, validate_question
 from app.models.user import User
 from app.models.study_models import Course, PracticeQuestion
+from app.ai_service import AIService, parse_practice_questions
+from app.fanout import fan_out
 
 questions_bp = Blueprint('questions', __name__)
+ai_service = AIService()
+
+MAX_BATCH_TOPICS = 30
 
 # Get all practice questions for a course
 @questions_bp.route('/course/<int:course_id>/questions', methods=['GET'])
 @jwt_required()
+@conditional_get(versions.COURSE)
 def get_questions(course_id):
     current_user_id = get_jwt_identity()
     
     # Verify course belongs to user
-    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
-    if not course:
+    if not ownership_cache.owns_course(current_user_id, course_id):
         return jsonify({"error": "Course not found"}), 404
     
-    questions = PracticeQuestion.query.filter_by(course_id=course_id).all()
-    
-    result = []
-    for question in questions:
-        result.append({
-            'id': question.id,
-            'question': question.question,
-            'answer': question.answer,
-            'difficulty': question.difficulty,
-            'created_at': question.created_at.isoformat(),
-            'course_id': question.course_id
-        })
+    try:
+        rows, next_cursor = paginate(question_serializer.select().where(PracticeQuestion.course_id == course_id), PracticeQuestion)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
     
-    return jsonify(result), 200
+    return jsonify({"items": question_serializer.rows(rows), "next_cursor": next_cursor}), 200
 
 # Create a new practice question
 @questions_bp.route('/course/<int:course_id>/questions', methods=['POST'])
@@ -39,8 +44,7 @@ def create_question(course_id):
     current_user_id = get_jwt_identity()
     
     # Verify course belongs to user
-    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
-    if not course:
+    if not ownership_cache.owns_course(current_user_id, course_id, for_write=True):
         return jsonify({"error": "Course not found"}), 404
     
     data = request.get_json()
@@ -56,16 +60,37 @@ def create_question(course_id):
     )
     
     db.session.add(new_question)
+    versions.bump(versions.course_scope(course_id))
     db.session.commit()
     
-    return jsonify({
-        'id': new_question.id,
-        'question': new_question.question,
-        'answer': new_question.answer,
-        'difficulty': new_question.difficulty,
-        'created_at': new_question.created_at.isoformat(),
-        'course_id': new_question.course_id
-    }), 201
+    return jsonify(question_serializer.one(new_question)), 201
+
+# Bulk import practice questions from an NDJSON or JSON array body
+@questions_bp.route('/course/<int:course_id>/questions/import', methods=['POST'])
+@jwt_required()
+def import_questions(course_id):
+    current_user_id = get_jwt_identity()
+    
+    # Verify course belongs to user
+    if not ownership_cache.owns_course(current_user_id, course_id, for_write=True):
+        return jsonify({"error": "Course not found"}), 404
+    
+    after_id = review.last_question_id()
+
+    def before_commit():
+        nonlocal after_id
+        # The rows inserted since the last chunk have ids after after_id
+        review.add_new_cards(db.session.connection(), PracticeQuestion.course_id == course_id, PracticeQuestion.id > after_id)
+        after_id = review.last_question_id()
+        versions.bump(versions.course_scope(course_id))
+
+    try:
+        report = import_records(records_from_request(request), PracticeQuestion, validate_question, course_id,
+                                before_commit=before_commit)
+    except CourseDeleted:
+        db.session.rollback()
+        return jsonify({"error": "Course not found"}), 404
+    return jsonify(report), 200
 
 # Generate practice questions with AI
 @questions_bp.route('/course/<int:course_id>/generate-questions', methods=['POST'])
@@ -109,9 +134,102 @@ def generate_questions(course_id):
             'difficulty': question.difficulty
         })
     
+    versions.bump(versions.course_scope(course_id))
     db.session.commit()
     
     return jsonify({
         'message': f"Generated {count} practice questions",
         'questions': result
-    }), 201
\ No newline at end of file
+    }), 201
+
+# Generate practice questions for many topics at once with AI
+@questions_bp.route('/course/<int:course_id>/generate-questions/batch', methods=['POST'])
+@jwt_required()
+def generate_questions_batch(course_id):
+    current_user_id = get_jwt_identity()
+    
+    # Verify course belongs to user
+    course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
+    if not course:
+        return jsonify({"error": "Course not found"}), 404
+    
+    data = request.get_json()
+    if not data or not data.get('topics') or not isinstance(data['topics'], list):
+        return jsonify({"error": "A list of topics is required"}), 400
+    
+    # Drop blanks and duplicates but keep the requested order
+    topics = list(dict.fromkeys(str(topic).strip() for topic in data['topics'] if str(topic).strip()))
+    if not topics or len(topics) > MAX_BATCH_TOPICS:
+        return jsonify({"error": f"Between 1 and {MAX_BATCH_TOPICS} topics are required"}), 400
+    
+    try:
+        count = int(data.get('count', 5))
+        if count <= 0 or count > 20:
+            return jsonify({"error": "Count must be between 1 and 20"}), 400
+    except ValueError:
+        return jsonify({"error": "Count must be a number"}), 400
+    
+    difficulty = data.get('difficulty', 'mixed')
+    use_cache = not data.get('refresh', False)
+    course_title = course.title
+    
+    def generate_for_topic(topic):
+        prompt, max_tokens = ai_service.practice_questions_prompt(course_title, topic, count, difficulty)
+        text = ai_service.complete(prompt, max_tokens=max_tokens, use_cache=use_cache, detail_level='questions')
+        return parse_practice_questions(text)[:count]
+    
+    started = time.perf_counter()
+    results = fan_out(
+        generate_for_topic,
+        topics,
+        max_workers=current_app.config['AI_FANOUT_CONCURRENCY'],
+        timeout=current_app.config['AI_FANOUT_TIMEOUT']
+    )
+    
+    rows = []
+    topic_report = []
+    for result in results:
+        questions = result['value'] or []
+        if result['error']:
+            current_app.logger.error(f"Question generation failed for '{result['item']}': {result['error']}")
+        topic_report.append({
+            'topic': result['item'],
+            'status': 'failed' if result['error'] else 'succeeded',
+            'question_count': len(questions),
+            'latency_ms': result['latency_ms'],
+            'error': result['error']
+        })
+        for question in questions:
+            rows.append(dict(question, topic=result['item']))
+    
+    if not rows:
+        return jsonify({
+            "error": "Question generation failed for every topic",
+            'topics': topic_report
+        }), 502
+    
+    # The course may have been deleted while the topics were generated
+    if not ownership_cache.owns_course(current_user_id, course_id, for_write=True):
+        return jsonify({"error": "Course not found"}), 404
+    
+    # Persist every generated question in one executemany insert
+    after_id = review.last_question_id()
+    db.session.execute(insert(PracticeQuestion), [
+        {
+            'question': row['question'],
+            'answer': row['answer'],
+            'difficulty': row['difficulty'],
+            'course_id': course_id
+        }
+        for row in rows
+    ])
+    review.add_new_cards(db.session.connection(), PracticeQuestion.course_id == course_id, PracticeQuestion.id > after_id)
+    versions.bump(versions.course_scope(course_id))
+    db.session.commit()
+    
+    return jsonify({
+        'message': f"Generated {len(rows)} practice questions for {len(topics)} topics",
+        'questions': rows,
+        'topics': topic_report,
+        'total_latency_ms': round((time.perf_counter() - started) * 1000, 1)
+    }), 201
@@ -0,0 +1,82 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.ownership import ownership_cache
+from app import review
+
+review_bp = Blueprint('review', __name__)
+
+MAX_REVIEW_BATCH = 100
+MAX_ANSWERS = 1000
+
+# Get the next questions to review: due cards first, then new questions
+@review_bp.route('/next', methods=['GET'])
+@jwt_required()
+def get_next_reviews():
+    current_user_id = get_jwt_identity()
+    
+    n = max(1, min(request.args.get('n', 20, type=int), MAX_REVIEW_BATCH))
+    course_id = request.args.get('course_id', type=int)
+    if course_id is not None:
+        # Verify course belongs to user
+        if not ownership_cache.owns_course(current_user_id, course_id):
+            return jsonify({"error": "Course not found"}), 404
+    
+    result = []
+    for question, card in review.next_cards(current_user_id, n, datetime.utcnow(), course_id=course_id):
+        result.append({
+            'question_id': question.id,
+            'question': question.question,
+            'answer': question.answer,
+            'difficulty': question.difficulty,
+            'course_id': question.course_id,
+            'new': card is None,
+            'due_at': card.due_at.isoformat() if card else None,
+            'interval_days': card.interval_days if card else 0,
+            'ease': card.ease if card else review.DEFAULT_EASE
+        })
+    
+    return jsonify({"cards": result}), 200
+
+# Record review answers and reschedule the questions
+@review_bp.route('/answers', methods=['POST'])
+@jwt_required()
+def record_review_answers():
+    current_user_id = get_jwt_identity()
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('answers'), list) or not data['answers']:
+        return jsonify({"error": "A non-empty list of answers is required"}), 400
+    if len(data['answers']) > MAX_ANSWERS:
+        return jsonify({"error": f"At most {MAX_ANSWERS} answers per request"}), 400
+    
+    # Later answers for the same question win
+    grades = {}
+    for index, answer in enumerate(data['answers']):
+        # bool is an int subclass, and True == 1, so rule it out explicitly
+        if not isinstance(answer, dict) or not _is_int(answer.get('question_id')):
+            return jsonify({"error": f"Answer {index}: question_id is required"}), 400
+        if not _is_int(answer.get('grade')) or not 0 <= answer['grade'] <= 5:
+            return jsonify({"error": f"Answer {index}: grade must be an integer from 0 to 5"}), 400
+        grades[answer['question_id']] = answer['grade']
+    
+    updates = review.record_answers(current_user_id, grades, datetime.utcnow())
+    db.session.commit()
+    
+    return jsonify({
+        "reviewed": len(updates),
+        "not_found": sorted(set(grades) - {update['question_id'] for update in updates}),
+        "cards": [
+            {
+                'question_id': update['question_id'],
+                'due_at': update['due_at'].isoformat(),
+                'interval_days': update['interval_days'],
+                'ease': update['ease']
+            }
+            for update in updates
+        ]
+    }), 200
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.ownership import ownership_cache
+from app.search import search_index
+
+search_bp = Blueprint('search', __name__)
+
+# Search the user's notes and practice questions, optionally within one course
+@search_bp.route('', methods=['GET'])
+@jwt_required()
+def search():
+    current_user_id = get_jwt_identity()
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    
+    course_id = request.args.get('course_id', type=int)
+    if course_id is not None:
+        # Verify course belongs to user
+        if not ownership_cache.owns_course(current_user_id, course_id):
+            return jsonify({"error": "Course not found"}), 404
+    
+    results = search_index.search(
+        query,
+        current_user_id,
+        course_id=course_id,
+        limit=request.args.get('limit', type=int)
+    )
+    
+    return jsonify({
+        "query": query,
+        "backend": search_index.backend().name,
+        "results": results
+    }), 200
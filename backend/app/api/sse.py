@@ -0,0 +1,21 @@
+import json
+from flask import Response, stream_with_context
+
+def sse_event(event, data):
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Stream a generator of SSE messages to the client as they are produced.
+    
+    When the client disconnects the WSGI server closes the generator, which
+    lets it cancel any upstream work it is driving.
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Keep nginx from buffering the stream
+        }
+    )
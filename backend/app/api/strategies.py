@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
 from app.models.user import User
 from app.ai_service import AIService
+from app.jobs import job_queue
+from app.api.jobs import job_accepted
+from app.api.sse import sse_event, sse_response
 
 strategies_bp = Blueprint('strategies', __name__)
 ai_service = AIService()
@@ -27,17 +29,75 @@ def get_test_strategies():
     test_type = data.get('test_type')
     student_problems = data.get('problems', [])
     
-    try:
-        # Generate test strategies using AI service
-        strategies = ai_service.generate_test_strategies(
-            test_type=test_type,
-            student_problems=student_problems
-        )
+    # Generation runs on the job queue; the client polls the job for the strategies
+    job = job_queue.enqueue('test_strategies', current_user_id, {
+        'test_type': test_type,
+        'problems': student_problems,
+        'use_cache': not data.get('refresh', False)
+    })
+    
+    return job_accepted(job)
+
+@strategies_bp.route('/test-strategies/stream', methods=['POST'])
+@jwt_required()
+def stream_test_strategies():
+    """
+    Stream personalized test-taking strategies as Server-Sent Events
+    """
+    current_user_id = get_jwt_identity()
+    
+    user = User.query.get(current_user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    data = request.get_json()
+    if not data or not data.get('test_type'):
+        return jsonify({"error": "Test type is required"}), 400
+    
+    test_type = data.get('test_type')
+    chunks = ai_service.stream_test_strategies(
+        test_type=test_type,
+        student_problems=data.get('problems', []),
+        use_cache=not data.get('refresh', False)
+    )
+    
+    def events():
+        strategies = []
+        try:
+            for chunk in chunks:
+                strategies.append(chunk)
+                yield sse_event('token', {'text': chunk})
+        except Exception as e:
+            current_app.logger.error(f"AI provider error: {str(e)}")
+            yield sse_event('error', {'error': str(e)})
+            return
+        finally:
+            # Runs on client disconnect too, cancelling the upstream completion
+            chunks.close()
         
-        return jsonify({
+        yield sse_event('done', {
             'test_type': test_type,
-            'strategies': strategies
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+            'strategies': ''.join(strategies).strip()
+        })
+    
+    return sse_response(events())
+
+@job_queue.handler('test_strategies')
+def run_test_strategies(job):
+    """Generate test strategies for a queued job."""
+    payload = job.payload
+    
+    # complete() raises on provider errors, so the job fails instead of
+    # succeeding with the error text as its strategies
+    prompt, max_tokens = ai_service.test_strategies_prompt(payload['test_type'], payload['problems'])
+    strategies = ai_service.complete(
+        prompt,
+        max_tokens=max_tokens,
+        use_cache=payload.get('use_cache', True),
+        detail_level='strategies'
+    )
+    
+    return {
+        'test_type': payload['test_type'],
+        'strategies': strategies
+    }
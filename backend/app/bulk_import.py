@@ -0,0 +1,201 @@
+import codecs
+import json
+import time
+from flask import current_app
+from sqlalchemy import insert, select
+from app.extensions import db
+from app.models.study_models import Course
+
+MAX_REPORTED_ERRORS = 1000  # Further failures are counted but not listed
+READ_SIZE = 64 * 1024
+
+class ImportRecordError(ValueError):
+    """Raised by a validator when a record cannot be imported."""
+
+class CourseDeleted(LookupError):
+    """Raised when the course is deleted while records are being imported into it."""
+
+def record_too_large(max_record_bytes):
+    return ImportRecordError(f"Record is larger than {max_record_bytes} bytes")
+
+def iter_ndjson(stream, max_record_bytes):
+    """Yield (line_number, record or ImportRecordError) for each non-blank line.
+
+    Lines are read at most max_record_bytes at a time; a longer line is
+    reported and skipped without being held in memory.
+    """
+    line_number = 0
+    while True:
+        # One byte over the limit leaves room for the newline
+        line = stream.readline(max_record_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > max_record_bytes and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(READ_SIZE)
+            yield line_number, record_too_large(max_record_bytes)
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ImportRecordError(f"Invalid JSON: {str(e)}")
+
+def iter_json_array(stream, max_record_bytes):
+    """Yield (index, record or ImportRecordError) for each element of a JSON array.
+
+    The body is read in fixed-size chunks and each element is decoded as
+    soon as it is complete, so only one element is held in memory at once.
+    Numbering starts at 1 to match NDJSON line numbers.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    eof = False
+    started = False
+    after_comma = False
+    index = 0
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = stream.read(READ_SIZE)
+        # The incremental decoder keeps multi-byte characters split across chunks
+        buffer += text_decoder.decode(chunk, final=not chunk)
+        eof = not chunk
+
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            if eof:
+                if not started:
+                    yield 1, ImportRecordError("Expected a JSON array")
+                else:
+                    yield index + 1, ImportRecordError("Unterminated JSON array")
+                return
+            fill()
+            continue
+
+        if not started:
+            if buffer[0] != '[':
+                yield 1, ImportRecordError("Expected a JSON array")
+                return
+            started = True
+            buffer = buffer[1:]
+            continue
+
+        if buffer[0] == ']':
+            return
+        if index > 0 and not after_comma:
+            if buffer[0] != ',':
+                yield index + 1, ImportRecordError("Expected ',' or ']' between records")
+                return
+            after_comma = True
+            buffer = buffer[1:]
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except ValueError as e:
+            if len(buffer) > max_record_bytes:
+                yield index + 1, record_too_large(max_record_bytes)
+                return
+            if not eof:
+                fill()  # Most likely an element split across chunks
+                continue
+            yield index + 1, ImportRecordError(f"Invalid JSON: {str(e)}")
+            return
+        index += 1
+        after_comma = False
+        buffer = buffer[end:]
+        # A record that arrived in one chunk is still held to the limit
+        yield index, record if end <= max_record_bytes else record_too_large(max_record_bytes)
+
+def validate_note(record):
+    """Return the insert row for an imported note."""
+    if not isinstance(record, dict):
+        raise ImportRecordError("Record must be an object")
+    title, content = record.get('title'), record.get('content')
+    if not isinstance(title, str) or not title.strip() or not isinstance(content, str) or not content.strip():
+        raise ImportRecordError("Title and content are required")
+    if len(title) > 100:
+        raise ImportRecordError("Title must be at most 100 characters")
+    return {'title': title, 'content': content}
+
+def validate_question(record):
+    """Return the insert row for an imported practice question."""
+    if not isinstance(record, dict):
+        raise ImportRecordError("Record must be an object")
+    question, answer = record.get('question'), record.get('answer')
+    if not isinstance(question, str) or not question.strip() or not isinstance(answer, str) or not answer.strip():
+        raise ImportRecordError("Question and answer are required")
+    difficulty = record.get('difficulty', 'medium')
+    if difficulty not in ('easy', 'medium', 'hard'):
+        raise ImportRecordError("Difficulty must be easy, medium or hard")
+    return {'question': question, 'answer': answer, 'difficulty': difficulty}
+
+def import_records(records, model, validate, course_id, before_commit=None):
+    """Validate and insert records into model for the course.
+
+    Valid rows are inserted with one executemany per IMPORT_CHUNK_SIZE rows,
+    each chunk in its own transaction, so a large upload neither holds a
+    long write lock nor loses earlier chunks if a later one fails.
+    before_commit, if given, is called in each chunk's transaction.
+    Returns the import report, or raises CourseDeleted if the course is
+    deleted before a chunk is written.
+    """
+    chunk_size = current_app.config['IMPORT_CHUNK_SIZE']
+    started = time.perf_counter()
+    imported = 0
+    failed = 0
+    errors = []
+    chunk = []
+
+    def flush():
+        nonlocal imported
+        # Courses never change owner, so one that still exists is still the
+        # caller's; the share lock keeps it from being deleted until the commit
+        if db.session.execute(select(Course.id).where(Course.id == course_id).with_for_update(read=True)).first() is None:
+            raise CourseDeleted(course_id)
+        db.session.execute(insert(model), chunk)
+        if before_commit is not None:
+            before_commit()
+        db.session.commit()
+        imported += len(chunk)
+        chunk.clear()
+
+    for line_number, record in records:
+        try:
+            if isinstance(record, ImportRecordError):
+                raise record
+            row = validate(record)
+        except ImportRecordError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'line': line_number, 'error': str(e)})
+            continue
+
+        row['course_id'] = course_id
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'rows_per_second': round(imported / elapsed, 1) if elapsed > 0 else None
+    }
+
+def records_from_request(request):
+    """Pick the parser for the request body from its content type."""
+    max_record_bytes = current_app.config['IMPORT_MAX_RECORD_BYTES']
+    if request.mimetype == 'application/json':
+        return iter_json_array(request.stream, max_record_bytes)
+    return iter_ndjson(request.stream, max_record_bytes)
@@ -0,0 +1,49 @@
+import json
+from sqlalchemy import select
+from app.extensions import db
+from app.models.study_models import Note, PracticeQuestion, Test, TestQuestion
+
+EXPORT_BATCH_SIZE = 500  # Rows fetched from the cursor per round trip
+
+# Each export section is a Core select of plain columns, so rows are never
+# turned into ORM objects or held in the identity map. yield_per fetches
+# them from the cursor in batches and each batch becomes one chunk of
+# NDJSON, so memory stays flat however large the course is.
+SECTIONS = [
+    ('note', [Note.id, Note.title, Note.content, Note.created_at],
+     lambda course_id: Note.course_id == course_id, Note.id),
+    ('question', [PracticeQuestion.id, PracticeQuestion.question, PracticeQuestion.answer,
+                  PracticeQuestion.difficulty, PracticeQuestion.created_at],
+     lambda course_id: PracticeQuestion.course_id == course_id, PracticeQuestion.id),
+    ('test', [Test.id, Test.title, Test.description, Test.due_date, Test.created_at],
+     lambda course_id: Test.course_id == course_id, Test.id),
+    ('test_question', [TestQuestion.id, TestQuestion.test_id, TestQuestion.question, TestQuestion.options,
+                       TestQuestion.correct_answer, TestQuestion.points],
+     lambda course_id: TestQuestion.test_id.in_(select(Test.id).where(Test.course_id == course_id)),
+     TestQuestion.id),
+]
+
+def export_lines(course):
+    """Yield the course as NDJSON text, one chunk per fetched batch of rows."""
+    yield _line('course', {
+        'id': course.id,
+        'title': course.title,
+        'description': course.description,
+        'created_at': course.created_at
+    })
+
+    for record_type, columns, where, order_by in SECTIONS:
+        result = db.session.execute(
+            select(*columns)
+            .where(where(course.id))
+            .order_by(order_by)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            yield ''.join(_line(record_type, row._mapping) for row in rows)
+
+def _line(record_type, values):
+    record = {'type': record_type}
+    for key, value in values.items():
+        record[key] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return json.dumps(record) + '\n'
@@ -1,8 +1,57 @@
+import click
+from flask.cli import with_appcontext
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from app.replicas import RoutingSession
+
+class LazyMigrate:
+    """Flask-Migrate, imported only when a ``flask db`` command runs.
+
+    Flask-Migrate imports Alembic and Mako at import time, a large share of
+    the app's startup, yet only the migration commands use it. init_app
+    registers a ``db`` command group that sets up the real extension the
+    first time one of its commands is looked up.
+    """
+
+    def __init__(self, directory='migrations'):
+        self.directory = directory
+
+    def init_app(self, app, db):
+        def load():
+            from flask_migrate import Migrate
+            from flask_migrate.cli import db as db_group
+            Migrate(app, db, directory=self.directory)
+            return db_group
+
+        app.cli.add_command(_LazyGroup(load, name='db', help='Perform database migrations.'))
+
+class _LazyGroup(click.Group):
+    """A click group whose commands come from a group loaded on first use."""
+
+    def __init__(self, load, **kwargs):
+        super().__init__(**kwargs)
+        self._load = load
+        self._group = None
+
+    def _loaded(self):
+        if self._group is None:
+            self._group = self._load()
+        return self._group
+
+    def list_commands(self, ctx):
+        return self._loaded().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._loaded().get_command(ctx, name)
 
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
-jwt = JWTManager()
\ No newline at end of file
+db = SQLAlchemy(session_options={'expire_on_commit': False, 'class_': RoutingSession})
+migrate = LazyMigrate()
+jwt = JWTManager()
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create any missing tables; run before serving, not on every worker boot."""
+    db.create_all()
+    click.echo('Database tables are in place.')
@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+
+def fan_out(func, items, max_workers, timeout=None):
+    """Run ``func(item)`` for every item on a bounded thread pool.
+
+    Each call runs inside its own app context. Returns one dict per item, in
+    input order, with either ``value`` or ``error`` set and the call's
+    ``latency_ms``. Items still unfinished when ``timeout`` expires are
+    reported as timed out rather than holding up the others.
+    """
+    app = current_app._get_current_object()
+
+    def timed_call(item):
+        started = time.perf_counter()
+        with app.app_context():
+            try:
+                return {'value': func(item), 'error': None, 'latency_ms': _elapsed_ms(started)}
+            except Exception as e:
+                return {'value': None, 'error': str(e), 'latency_ms': _elapsed_ms(started)}
+
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    try:
+        futures = [executor.submit(timed_call, item) for item in items]
+        wait(futures, timeout=timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for item, future in zip(items, futures):
+        if future.done() and not future.cancelled():
+            result = future.result()
+        else:
+            result = {'value': None, 'error': 'Timed out', 'latency_ms': _elapsed_ms(started)}
+        result['item'] = item
+        results.append(result)
+    return results
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
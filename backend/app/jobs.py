@@ -0,0 +1,270 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from app.extensions import db
+from app.models.job_models import GenerationJob
+
+class JobQueue:
+    """Database-backed job queue drained by a pool of local worker threads.
+
+    Jobs are rows in ``generation_jobs``; workers claim them with a conditional
+    UPDATE so several processes can share one queue without a broker.
+
+    Each process starts its workers on its first request. A claim is a
+    lease of JOB_LEASE seconds, which must exceed the longest job: a job
+    still running after that is taken to belong to a dead worker and is
+    queued again, or failed once it has been tried JOB_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, app=None):
+        self._handlers = {}
+        self._app = None
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._reclaim_lock = threading.Lock()
+        self._next_reclaim = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOB_WORKERS', int(os.environ.get('JOB_WORKERS', 2)))
+        app.config.setdefault('JOB_POLL_INTERVAL', float(os.environ.get('JOB_POLL_INTERVAL', 1.0)))
+        app.config.setdefault('JOB_LEASE', float(os.environ.get('JOB_LEASE', 600)))  # Seconds
+        app.config.setdefault('JOB_MAX_ATTEMPTS', int(os.environ.get('JOB_MAX_ATTEMPTS', 3)))
+        app.config.setdefault('JOB_AUTOSTART', os.environ.get('JOB_AUTOSTART', '1') == '1')  # Start workers on the first request
+        app.config.setdefault('JOBS_EAGER', False)  # Run jobs inline at enqueue time (tests)
+        app.extensions['job_queue'] = self
+        self._app = app
+        app.before_request(self._before_request)
+
+    def handler(self, kind):
+        """Register the function that runs jobs of the given kind.
+
+        The handler receives the ``GenerationJob`` and returns a JSON-able
+        result. Anything it adds to ``db.session`` is committed together with
+        the job's final status.
+        """
+        def decorator(func):
+            self._handlers[kind] = func
+            return func
+        return decorator
+
+    def enqueue(self, kind, user_id, payload):
+        """Persist a new job and hand it to the workers."""
+        if kind not in self._handlers:
+            raise LookupError(f"No handler registered for job kind '{kind}'")
+
+        job = GenerationJob(kind=kind, user_id=user_id, payload=payload, status='queued')
+        db.session.add(job)
+        db.session.commit()
+
+        if current_app.config['JOBS_EAGER']:
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            job.attempts = 1
+            db.session.commit()
+            self._execute(job.id)
+        else:
+            self._ensure_workers(current_app._get_current_object())
+            self._wakeup.set()
+
+        return job
+
+    def stats(self, window=100):
+        """Return queue depth and latency figures for the most recent jobs."""
+        counts = dict(
+            db.session.query(GenerationJob.status, func.count(GenerationJob.id))
+            .group_by(GenerationJob.status)
+            .all()
+        )
+
+        recent = (
+            db.session.query(GenerationJob.created_at, GenerationJob.started_at, GenerationJob.finished_at)
+            .filter(GenerationJob.finished_at.isnot(None))
+            .order_by(GenerationJob.finished_at.desc())
+            .limit(window)
+            .all()
+        )
+        wait_times = [(started - created).total_seconds() for created, started, _ in recent if started]
+        run_times = [(finished - started).total_seconds() for _, started, finished in recent if started]
+        total_times = [(finished - created).total_seconds() for created, _, finished in recent]
+
+        return {
+            'queue_depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'succeeded': counts.get('succeeded', 0),
+            'failed': counts.get('failed', 0),
+            'workers': sum(1 for thread in self._threads if thread.is_alive()),
+            'latency': {
+                'sample_size': len(total_times),
+                'wait_avg': _average(wait_times),
+                'wait_p95': _percentile(wait_times, 95),
+                'run_avg': _average(run_times),
+                'run_p95': _percentile(run_times, 95),
+                'total_p95': _percentile(total_times, 95)
+            }
+        }
+
+    def reclaim_stale(self):
+        """Requeue running jobs whose lease has run out; return how many were requeued.
+
+        Jobs already tried JOB_MAX_ATTEMPTS times are failed instead, so a
+        job that takes its worker down with it is not retried forever.
+        """
+        config = current_app.config
+        now = datetime.utcnow()
+        stale = (
+            GenerationJob.status == 'running',
+            GenerationJob.started_at < now - timedelta(seconds=config['JOB_LEASE'])
+        )
+        failed = GenerationJob.query.filter(*stale, GenerationJob.attempts >= config['JOB_MAX_ATTEMPTS']).update(
+            {'status': 'failed', 'error': 'The worker stopped before the job finished', 'finished_at': now},
+            synchronize_session=False
+        )
+        requeued = GenerationJob.query.filter(*stale).update(
+            {'status': 'queued', 'started_at': None},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if failed or requeued:
+            current_app.logger.warning(f"Reclaimed abandoned jobs: {requeued} requeued, {failed} failed")
+        return requeued
+
+    def shutdown(self, timeout=None):
+        """Stop the worker threads once their current job has finished."""
+        with self._lock:
+            self._stopping.set()
+            self._wakeup.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            self._pid = None
+            self._stopping.clear()
+            self._wakeup.clear()
+
+    def _before_request(self):
+        # Cheap once started: only a new (e.g. forked) process gets past the pid check
+        if self._pid == os.getpid():
+            return
+        app = current_app._get_current_object()
+        if app.config['JOB_AUTOSTART'] and not app.config['JOBS_EAGER'] and not app.testing:
+            self._ensure_workers(app)
+
+    def _ensure_workers(self, app):
+        with self._lock:
+            # Threads do not survive a fork, so a forked worker process starts its own pool
+            if self._pid == os.getpid() and any(thread.is_alive() for thread in self._threads):
+                return
+            self._pid = os.getpid()
+            self._threads = []
+            for i in range(app.config['JOB_WORKERS']):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    args=(app,),
+                    name=f'job-worker-{i}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker_loop(self, app):
+        while not self._stopping.is_set():
+            self._wakeup.wait(app.config['JOB_POLL_INTERVAL'])
+            self._wakeup.clear()
+
+            with app.app_context():
+                try:
+                    if self._reclaim_due(app):
+                        self.reclaim_stale()
+                except Exception as e:
+                    current_app.logger.error(f"Job reclaim error: {str(e)}")
+                    db.session.rollback()
+
+            while not self._stopping.is_set():
+                with app.app_context():
+                    try:
+                        job_id = self._claim_next()
+                        if job_id is None:
+                            break
+                        self._execute(job_id)
+                    except Exception as e:
+                        current_app.logger.error(f"Job worker error: {str(e)}")
+                        db.session.rollback()
+                        break
+
+    def _reclaim_due(self, app):
+        # One worker per process checks, a few times per lease
+        now = time.monotonic()
+        # Not self._lock, which shutdown holds while it joins the workers
+        with self._reclaim_lock:
+            if now < self._next_reclaim:
+                return False
+            self._next_reclaim = now + app.config['JOB_LEASE'] / 4
+            return True
+
+    def _claim_next(self):
+        """Atomically move the oldest queued job to running and return its id."""
+        while True:
+            job_id = (
+                db.session.query(GenerationJob.id)
+                .filter(GenerationJob.status == 'queued')
+                .order_by(GenerationJob.id)
+                .limit(1)
+                .scalar()
+            )
+            if job_id is None:
+                return None
+
+            claimed = GenerationJob.query.filter_by(id=job_id, status='queued').update(
+                {'status': 'running', 'started_at': datetime.utcnow(), 'attempts': GenerationJob.attempts + 1},
+                synchronize_session=False
+            )
+            db.session.commit()
+
+            # Another worker may have claimed it between the select and the update
+            if claimed:
+                return job_id
+
+    def _execute(self, job_id):
+        job = db.session.get(GenerationJob, job_id)
+        handler = self._handlers.get(job.kind)
+
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job.kind}'")
+            job.result = handler(job)
+            job.status = 'succeeded'
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Job {job_id} ({job.kind}) failed: {str(e)}")
+            job = db.session.get(GenerationJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        current_app.logger.info(
+            f"Job {job.id} ({job.kind}) {job.status}: "
+            f"waited {job.wait_seconds:.3f}s, ran {job.run_seconds:.3f}s"
+        )
+
+def _average(values):
+    if not values:
+        return None
+    return round(sum(values) / len(values), 3)
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, int(round(pct / 100 * len(ordered))) - 1)
+    return round(ordered[index], 3)
+
+job_queue = JobQueue()
@@ -0,0 +1,44 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: responses fall back to the standard json module
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson.
+
+    Output matches the default provider's: keys are sorted when sort_keys
+    is set, and dates, decimals and other types orjson does not handle the
+    same way are passed to the default provider's ``default``. Debug-mode
+    pretty printing and any call with extra json.dumps arguments use the
+    default provider.
+    """
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def init_app(app):
+    """Use orjson for JSON responses when it is installed and FAST_JSON is on."""
+    if app.config['FAST_JSON'] and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, request
+from app.extensions import db
+
+# Minimal Prometheus text-format metrics, kept in process memory. Each
+# worker process exposes its own values; Prometheus sums them per instance.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+AI_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+# Notes detail levels, then the other operations; anything else is labelled 'other'
+AI_DETAIL_LEVELS = ('brief', 'medium', 'detailed', 'questions', 'strategies')
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_sample(labels, value))
+        return lines
+
+    def _render_sample(self, labels, value):
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}']
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, labels=(), value=0):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        # Per-bucket counts (the last is +Inf), then the sum
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def _render_sample(self, labels, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), state):
+            cumulative += count
+            le = 'le="' + _format_value(bound if bound == float('inf') else float(bound)) + '"'
+            lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+        label_text = _format_labels(self.labelnames, labels)
+        lines.append(f'{self.name}_sum{label_text} {_format_value(float(state[-1]))}')
+        lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+class Metrics:
+    """Request, database pool and AI call metrics served at /metrics.
+
+    Request latency is recorded per blueprint, route template, method and
+    status. Pool size and checkout counts are read at scrape time; the time
+    spent waiting for a pooled connection is timed around the pool's
+    checkout. AIService records provider calls (not cache hits) by model
+    and detail level, which for prompts other than notes is the operation.
+    """
+
+    def __init__(self, app=None):
+        self.requests_in_flight = Gauge(
+            'http_requests_in_flight', 'Requests being handled.', ['blueprint'])
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Time to build the response.',
+            ['blueprint', 'route', 'method', 'status'])
+        self.pool_size = Gauge('db_pool_size', 'Connections the pool keeps open.')
+        self.pool_checked_out = Gauge('db_pool_checked_out', 'Pooled connections in use.')
+        self.pool_overflow = Gauge('db_pool_overflow', 'Connections open beyond the pool size.')
+        self.pool_checkout_wait = Histogram(
+            'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.',
+            buckets=POOL_WAIT_BUCKETS)
+        self.ai_duration = Histogram(
+            'ai_request_duration_seconds', 'Provider call time, to the last token when streaming.',
+            ['model', 'detail_level', 'mode'], buckets=AI_LATENCY_BUCKETS)
+        self.ai_errors = Counter(
+            'ai_request_errors_total', 'Provider calls that raised.', ['model', 'detail_level', 'mode'])
+        self.ai_tokens = Counter(
+            'ai_tokens_total', 'Tokens reported by the provider.', ['model', 'detail_level', 'kind'])
+        self.all = [
+            self.requests_in_flight, self.request_duration,
+            self.pool_size, self.pool_checked_out, self.pool_overflow, self.pool_checkout_wait,
+            self.ai_duration, self.ai_errors, self.ai_tokens
+        ]
+        self._route_labels = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', os.environ.get('METRICS_ENABLED', '1') == '1')
+        app.extensions['metrics'] = self
+        if not app.config['METRICS_ENABLED']:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        self._read_pool()
+        lines = []
+        for metric in self.all:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Clear every recorded value (tests and benchmarks)."""
+        for metric in self.all:
+            metric.clear()
+
+    def observe_ai(self, model, detail_level, mode, seconds, error=False, prompt_tokens=None, completion_tokens=None):
+        """Record one provider call made by AIService."""
+        if detail_level is None:
+            detail_level = 'none'
+        elif detail_level not in AI_DETAIL_LEVELS:
+            detail_level = 'other'
+        self.ai_duration.observe((model, detail_level, mode), seconds)
+        if error:
+            self.ai_errors.inc((model, detail_level, mode))
+        if prompt_tokens:
+            self.ai_tokens.inc((model, detail_level, 'prompt'), prompt_tokens)
+        if completion_tokens:
+            self.ai_tokens.inc((model, detail_level, 'completion'), completion_tokens)
+
+    def _before_request(self):
+        started = time.perf_counter()
+        pool = db.engine.pool
+        if not getattr(pool, '_metrics_timed', False):
+            self._time_checkouts(pool)
+        # Labels are worked out once per route and method
+        current = request._get_current_object()
+        rule = current.url_rule
+        key = (rule.rule if rule is not None else 'unmatched', current.method)
+        labels = self._route_labels.get(key)
+        if labels is None:
+            blueprint = current.blueprint or ''
+            labels = self._route_labels[key] = ((blueprint,), (blueprint,) + key)
+        # [start time, labels, status]; the status stays 500 if no response is made
+        g.metrics_request = [started, labels, 500]
+        self.requests_in_flight.inc(labels[0])
+
+    def _after_request(self, response):
+        state = g.get('metrics_request')
+        if state is not None:
+            state[2] = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        state = g.pop('metrics_request', None)
+        if state is None:
+            return
+        started, (blueprint, route), status = state
+        self.requests_in_flight.dec(blueprint)
+        self.request_duration.observe(route + (str(status),), time.perf_counter() - started)
+
+    def _metrics_view(self):
+        return Response(self.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def _read_pool(self):
+        pool = db.engine.pool
+        # Only QueuePool keeps these counts; SQLite memory pools do not
+        if hasattr(pool, 'checkedout'):
+            self.pool_size.set((), pool.size())
+            self.pool_checked_out.set((), pool.checkedout())
+            # overflow() counts up from -size while the pool is filling
+            self.pool_overflow.set((), max(pool.overflow(), 0))
+
+    def _time_checkouts(self, pool):
+        # Pool events fire after a checkout, so time the blocking get itself
+        pool._metrics_timed = True
+        do_get = pool._do_get
+        observe = self.pool_checkout_wait.observe
+
+        def timed_do_get():
+            started = time.perf_counter()
+            try:
+                return do_get()
+            finally:
+                observe((), time.perf_counter() - started)
+
+        pool._do_get = timed_do_get
+
+metrics = Metrics()
@@ -0,0 +1,28 @@
+from app.extensions import db
+from datetime import datetime
+
+class CompletionCacheEntry(db.Model):
+    """Model for the persistent tier of the AI completion cache."""
+    __tablename__ = 'completion_cache'
+
+    key = db.Column(db.String(64), primary_key=True)  # SHA-256 prompt fingerprint
+    model = db.Column(db.String(100), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    hit_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<CompletionCacheEntry {self.key[:12]} model={self.model}>'
+
+class InflightLock(db.Model):
+    """Model for cross-process single-flight locks on AI completions."""
+    __tablename__ = 'inflight_locks'
+
+    key = db.Column(db.String(64), primary_key=True)  # Same fingerprint as the completion cache
+    owner = db.Column(db.String(64), nullable=False)
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<InflightLock {self.key[:12]} owner={self.owner}>'
@@ -0,0 +1,35 @@
+from app.extensions import db
+from datetime import datetime
+
+class GenerationJob(db.Model):
+    """Model for queued AI generation work (notes, test strategies)."""
+    __tablename__ = 'generation_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)  # e.g., 'generate_notes', 'test_strategies'
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed
+    payload = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Claims so far, including reclaimed ones
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<GenerationJob {self.id} kind={self.kind} status={self.status}>'
+
+    @property
+    def wait_seconds(self):
+        """Time spent in the queue before a worker picked the job up."""
+        if not self.started_at:
+            return None
+        return (self.started_at - self.created_at).total_seconds()
+
+    @property
+    def run_seconds(self):
+        """Time the worker spent running the job."""
+        if not self.started_at or not self.finished_at:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
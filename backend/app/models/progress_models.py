@@ -1,10 +1,15 @@
 from app.extensions import db
-from datetime import datetime
+from datetime import datetime, date
 import json
 
 class StudyProgress(db.Model):
     """Model for tracking user progress on practice questions."""
     __tablename__ = 'study_progress'
+    __table_args__ = (
+        db.Index('ix_study_progress_user_course', 'user_id', 'course_id'),
+        # One row per user and question, so ratings can be upserted
+        db.Index('uq_study_progress_user_question', 'user_id', 'question_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -16,9 +21,39 @@ class StudyProgress(db.Model):
     def __repr__(self):
         return f'<StudyProgress user_id={self.user_id} question_id={self.question_id}>'
 
+class ReviewCard(db.Model):
+    """Model for the spaced-repetition schedule of a practice question for a user."""
+    __tablename__ = 'review_cards'
+    __table_args__ = (
+        db.Index('uq_review_cards_user_question', 'user_id', 'question_id', unique=True),
+        # Due queue: the next cards for a user, optionally within one course
+        db.Index('ix_review_cards_user_due', 'user_id', 'due_at'),
+        db.Index('ix_review_cards_user_course_due', 'user_id', 'course_id', 'due_at'),
+        # Removing a question's cards
+        db.Index('ix_review_cards_question', 'question_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('practice_questions.id', ondelete='CASCADE'), nullable=False)
+    ease = db.Column(db.Float, nullable=False, default=2.5)  # SM-2 ease factor, at least 1.3
+    interval_days = db.Column(db.Float, nullable=False, default=0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)  # Successful reviews in a row
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+    due_at = db.Column(db.DateTime)  # None until the first review
+    last_reviewed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ReviewCard user_id={self.user_id} question_id={self.question_id} due_at={self.due_at}>'
+
 class DailyStudy(db.Model):
     """Model for tracking daily study time."""
     __tablename__ = 'daily_study'
+    __table_args__ = (
+        db.Index('ix_daily_study_user_date', 'user_id', 'study_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -33,6 +68,38 @@ class DailyStudy(db.Model):
     def __repr__(self):
         return f'<DailyStudy user_id={self.user_id} date={self.study_date} minutes={self.total_minutes}>'
 
+class StudyRollup(db.Model):
+    """Model for per-user study totals kept up to date as sessions end."""
+    __tablename__ = 'study_rollups'
+    
+    RECENT_DAYS = 30  # Days of per-day minutes kept for the rolling windows
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    current_streak = db.Column(db.Integer, default=0)  # As of last_study_date
+    longest_streak = db.Column(db.Integer, default=0)
+    last_study_date = db.Column(db.Date, nullable=True)  # Last day with minutes > 0
+    minutes_7d = db.Column(db.Integer, default=0)  # As of updated_at
+    minutes_30d = db.Column(db.Integer, default=0)
+    recent_minutes = db.Column(db.JSON, default=dict)  # {'YYYY-MM-DD': minutes} for the last RECENT_DAYS days
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<StudyRollup user_id={self.user_id} streak={self.current_streak}>'
+    
+    def streak_on(self, day):
+        """Return the streak ending on the given day (0 if nothing was studied that day)."""
+        return self.current_streak if self.last_study_date == day else 0
+    
+    def minutes_between(self, start_date, end_date):
+        """Return {date: minutes} for the recorded days in the range (within RECENT_DAYS)."""
+        result = {}
+        for iso_date, minutes in (self.recent_minutes or {}).items():
+            study_date = date.fromisoformat(iso_date)
+            if start_date <= study_date <= end_date:
+                result[study_date] = minutes
+        return result
+
 class StudySession(db.Model):
     """Model for tracking individual study sessions."""
     __tablename__ = 'study_sessions'
@@ -97,6 +164,9 @@ class UserPreference(db.Model):
 class Todo(db.Model):
     """Model for user to-do tasks."""
     __tablename__ = 'todos'
+    __table_args__ = (
+        db.Index('ix_todos_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
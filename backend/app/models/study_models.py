@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Course(db.Model):
     __tablename__ = 'courses'
+    __table_args__ = (
+        db.Index('ix_courses_user_created', 'user_id', 'created_at', 'id'),
+        # Never hand a deleted course's id to a new course: ownership
+        # answers cached in other processes and ETags are keyed by it
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -20,6 +26,9 @@ class Course(db.Model):
 
 class Note(db.Model):
     __tablename__ = 'notes'
+    __table_args__ = (
+        db.Index('ix_notes_course_created', 'course_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -32,6 +41,9 @@ class Note(db.Model):
 
 class PracticeQuestion(db.Model):
     __tablename__ = 'practice_questions'
+    __table_args__ = (
+        db.Index('ix_practice_questions_course_created', 'course_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     question = db.Column(db.Text, nullable=False)
@@ -72,15 +84,17 @@ class TestQuestion(db.Model):
     def __repr__(self):
         return f'<TestQuestion {self.id}>'
 
-# User study progress tracking
-class StudySession(db.Model):
-    __tablename__ = 'study_sessions'
+class ContentVersion(db.Model):
+    """Model for a counter that changes whenever a set of rows changes.
+
+    scope names the set: a user's course list ("courses:<user_id>"), a
+    user's todos ("todos:<user_id>"), or one course with its notes and
+    practice questions ("course:<course_id>").
+    """
+    __tablename__ = 'content_versions'
     
-    id = db.Column(db.Integer, primary_key=True)
-    start_time = db.Column(db.DateTime, default=datetime.utcnow)
-    end_time = db.Column(db.DateTime)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
+    scope = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
     
     def __repr__(self):
-        return f'<StudySession {self.id}>'
\ No newline at end of file
+        return f'<ContentVersion {self.scope}={self.version}>'
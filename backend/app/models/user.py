@@ -1,5 +1,5 @@
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.passwords import password_hasher
 from datetime import datetime
 
 class User(db.Model):
@@ -13,7 +13,6 @@ class User(db.Model):
     
     # Relationships
     courses = db.relationship('Course', backref='user', lazy=True)
-    study_sessions = db.relationship('StudySession', backref='user', lazy=True)
     
     @property
     def password(self):
@@ -21,10 +20,10 @@ class User(db.Model):
     
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
\ No newline at end of file
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db
+from app.models.study_models import Course, Note
+
+class OwnershipCache:
+    """Per-process LRU of whether a user owns a course.
+
+    Most course-scoped endpoints only need to know that the course is the
+    caller's before reading its notes or questions, so the answer is kept
+    for COURSE_OWNERSHIP_TTL seconds instead of being looked up on every
+    request. Courses never change owner; creating or deleting one forgets
+    its entry in this process, and the TTL bounds how long another process
+    can keep a stale answer. Course ids are never reused, so a stale
+    answer can only be about a course that no longer exists, never about
+    another user's. Writes into a course must not act on such an answer,
+    so they ask with for_write and always get the database's.
+    """
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('hits', 'misses', 'evictions'), 0)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COURSE_OWNERSHIP_CACHE_SIZE', int(os.environ.get('COURSE_OWNERSHIP_CACHE_SIZE', 10000)))  # 0 disables
+        app.config.setdefault('COURSE_OWNERSHIP_TTL', float(os.environ.get('COURSE_OWNERSHIP_TTL', 60)))  # Seconds
+        app.extensions['course_ownership'] = self
+        # A new app may sit on a different database
+        self.clear()
+
+    def owns_course(self, user_id, course_id, for_write=False):
+        """Return whether the user owns the course, from the cache when fresh.
+
+        With for_write the cache is skipped and the course row is share
+        locked until the transaction ends, so it cannot be deleted under
+        the rows the caller is about to insert.
+        """
+        config = current_app.config
+        size = config['COURSE_OWNERSHIP_CACHE_SIZE']
+        key = (user_id, course_id)
+        now = time.monotonic()
+
+        if size > 0 and not for_write:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return entry[0]
+                self._counters['misses'] += 1
+
+        statement = select(Course.id).where(Course.id == course_id, Course.user_id == user_id)
+        if for_write:
+            statement = statement.with_for_update(read=True)
+        owned = db.session.execute(statement).first() is not None
+        self.remember(user_id, course_id, owned)
+        return owned
+
+    def remember(self, user_id, course_id, owned=True):
+        """Record an ownership answer learned elsewhere, e.g. from a joined query."""
+        config = current_app.config
+        size = config['COURSE_OWNERSHIP_CACHE_SIZE']
+        if size <= 0:
+            return
+        with self._lock:
+            self._entries[(user_id, course_id)] = (owned, time.monotonic() + config['COURSE_OWNERSHIP_TTL'])
+            self._entries.move_to_end((user_id, course_id))
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def forget(self, user_id, course_id):
+        """Drop the entry for a course that was just created or deleted."""
+        with self._lock:
+            self._entries.pop((user_id, course_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters = dict.fromkeys(self._counters, 0)
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, 'entries': len(self._entries)}
+
+def get_owned_note(user_id, note_id):
+    """Return the note if it is in one of the user's courses, else None.
+
+    One joined query both authorizes and fetches the row; a hit also
+    records that the user owns the note's course.
+    """
+    note = db.session.execute(
+        select(Note).join(Course, Course.id == Note.course_id).where(Note.id == note_id, Course.user_id == user_id)
+    ).scalar_one_or_none()
+    if note is not None:
+        ownership_cache.remember(user_id, note.course_id)
+    return note
+
+ownership_cache = OwnershipCache()
@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import and_, or_
+from app.extensions import db
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def encode_cursor(created_at, row_id):
+    """Return an opaque cursor pointing just past the given row."""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor made by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+def page_size():
+    """Return the page size from ?limit=, clamped to the configured maximum."""
+    config = current_app.config
+    try:
+        size = int(request.args.get('limit', config['PAGE_SIZE']))
+    except ValueError:
+        size = config['PAGE_SIZE']
+    return max(1, min(size, config['MAX_PAGE_SIZE']))
+
+def paginate(statement, model, descending=False):
+    """Return (rows, next_cursor) for the page of a select() after ?cursor=.
+
+    The statement must select the model's created_at and id columns. Rows
+    are ordered by (created_at, id), which the per-owner composite indexes
+    cover, so each page is an index range scan however deep it is.
+    next_cursor is None on the last page.
+    """
+    created_at, row_id = model.created_at, model.id
+    cursor = request.args.get('cursor')
+    if cursor:
+        after_created, after_id = decode_cursor(cursor)
+        if descending:
+            statement = statement.where(or_(
+                created_at < after_created,
+                and_(created_at == after_created, row_id < after_id)
+            ))
+        else:
+            statement = statement.where(or_(
+                created_at > after_created,
+                and_(created_at == after_created, row_id > after_id)
+            ))
+
+    if descending:
+        statement = statement.order_by(created_at.desc(), row_id.desc())
+    else:
+        statement = statement.order_by(created_at, row_id)
+
+    # One extra row tells us whether there is another page
+    size = page_size()
+    rows = db.session.execute(statement.limit(size + 1)).all()
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
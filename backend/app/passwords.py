@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import BrokenExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+class PasswordHasher:
+    """Hashes and verifies passwords in a bounded pool of worker processes.
+
+    Key derivation is deliberately CPU-heavy, so a burst of logins or
+    registrations would otherwise tie up the request threads. The calling
+    thread still waits for the result, but at most PASSWORD_HASH_WORKERS
+    hashes run at once, leaving cores free for other requests. With zero
+    workers, or outside an app context, hashing runs on the calling thread.
+
+    The method and cost come from PASSWORD_HASH_METHOD and
+    PASSWORD_HASH_ITERATIONS; ``needs_rehash`` tells whether a stored hash
+    was made with other settings, so it can be upgraded at the next login.
+    """
+
+    def __init__(self, app=None):
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        method = app.config.setdefault('PASSWORD_HASH_METHOD', os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256'))
+        # A cost given with the method, as in pbkdf2:sha256:600000, is the default iteration count
+        parts = method.split(':')
+        iterations = int(parts[2]) if method.startswith('pbkdf2:') and len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        app.config.setdefault('PASSWORD_HASH_ITERATIONS', int(os.environ.get('PASSWORD_HASH_ITERATIONS', iterations)))
+        app.config.setdefault('PASSWORD_SALT_LENGTH', int(os.environ.get('PASSWORD_SALT_LENGTH', 16)))
+        app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)))  # 0 hashes inline
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        """Return a salted hash of password using the configured method and cost."""
+        if not has_app_context():
+            return generate_password_hash(password)
+        return self._call(generate_password_hash, password, self.method(), current_app.config['PASSWORD_SALT_LENGTH'])
+
+    def verify(self, password_hash, password):
+        """Return whether password matches the stored hash."""
+        if not has_app_context():
+            return check_password_hash(password_hash, password)
+        return self._call(check_password_hash, password_hash, password)
+
+    def method(self):
+        """Return the werkzeug method string, e.g. ``pbkdf2:sha256:260000``."""
+        config = current_app.config
+        method = config['PASSWORD_HASH_METHOD']
+        if method.startswith('pbkdf2:'):
+            # The method may carry its own cost; PASSWORD_HASH_ITERATIONS replaces it
+            hash_name = method.split(':')[1]
+            return f"pbkdf2:{hash_name}:{config['PASSWORD_HASH_ITERATIONS']}"
+        return method
+
+    def needs_rehash(self, password_hash):
+        """Return whether the stored hash was made with a different method or cost."""
+        return password_hash.split('$', 1)[0] != self.method()
+
+    def shutdown(self):
+        """Stop the worker processes; the next hash starts a new pool."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool = None
+            self._pid = None
+
+    def _call(self, func, *args):
+        workers = current_app.config['PASSWORD_HASH_WORKERS']
+        if workers <= 0:
+            return func(*args)
+        try:
+            return self._ensure_pool(workers).submit(func, *args).result()
+        except BrokenExecutor:
+            # A worker died (e.g. it was killed); start over next time and hash here now
+            current_app.logger.warning("Password hashing pool broke; hashing inline")
+            self.shutdown()
+            return func(*args)
+
+    def _ensure_pool(self, workers):
+        with self._lock:
+            # Worker processes belong to the process that started them, so a forked server worker starts its own
+            if self._pool is None or self._pid != os.getpid():
+                # Imported here: multiprocessing is only needed once a password is hashed
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=workers)
+                self._pid = os.getpid()
+            return self._pool
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,38 @@
+import gc
+import importlib
+from sqlalchemy.orm import configure_mappers
+from app.extensions import db
+
+# Imported lazily on first use, so each forked worker would otherwise import
+# them itself; a preloading master imports them once for all workers
+PRELOAD_MODULES = (
+    'requests',
+    'requests.adapters',
+    'concurrent.futures.process',
+)
+
+def preload(app):
+    """Finish loading the app in a server's master process, before it forks workers.
+
+    Imports the lazily imported modules, configures the ORM mappers, closes
+    any database connections (they must not be shared with the workers)
+    and then moves every object allocated so far into the permanent
+    generation with ``gc.freeze()``. Workers forked afterwards share those
+    pages copy-on-write; without the freeze, the first garbage collection
+    in each worker touches every object and copies the pages anyway.
+
+    Safe to call when nothing forks: the frozen objects live for the
+    lifetime of the process regardless.
+    """
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    configure_mappers()
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    gc.collect()
+    gc.freeze()
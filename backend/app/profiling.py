@@ -0,0 +1,167 @@
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity
+from app.query_stats import query_stats
+
+class _Sampler:
+    """Statistical profiler: samples one thread's stack at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """Return the samples in the collapsed-stack format flamegraph tools read."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+class RequestProfiler:
+    """Profiles individual requests on demand.
+
+    A request is profiled when it carries ``X-Profile: <PROFILE_TOKEN>`` or
+    is picked at PROFILE_SAMPLE_RATE. With PROFILE_MODE 'cprofile' the
+    request runs under cProfile and a pstats file is written; with
+    'sampler' its thread's stack is sampled every PROFILE_SAMPLE_INTERVAL
+    seconds and a collapsed-stack file is written for flamegraph tools.
+    Either way a JSON file alongside records the route, user id, query
+    count and timing.
+
+    With no token and a zero sample rate no hooks are installed, so
+    requests pay nothing. The settings are read when the app is created.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILE_TOKEN', os.environ.get('PROFILE_TOKEN'))  # Value of the X-Profile header
+        app.config.setdefault('PROFILE_SAMPLE_RATE', float(os.environ.get('PROFILE_SAMPLE_RATE', 0)))  # Share of requests, 0 to 1
+        app.config.setdefault('PROFILE_MODE', os.environ.get('PROFILE_MODE', 'cprofile'))  # cprofile or sampler
+        app.config.setdefault('PROFILE_SAMPLE_INTERVAL', float(os.environ.get('PROFILE_SAMPLE_INTERVAL', 0.005)))  # Seconds
+        app.config.setdefault('PROFILE_DIR', os.environ.get('PROFILE_DIR', os.path.join(app.instance_path, 'profiles')))
+        app.extensions['request_profiler'] = self
+        if not app.config['PROFILE_TOKEN'] and app.config['PROFILE_SAMPLE_RATE'] <= 0:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _wanted(self):
+        config = current_app.config
+        token = config['PROFILE_TOKEN']
+        header = request.headers.get('X-Profile')
+        if token and header and hmac.compare_digest(header, token):
+            return True
+        return config['PROFILE_SAMPLE_RATE'] > 0 and random.random() < config['PROFILE_SAMPLE_RATE']
+
+    def _before_request(self):
+        if not self._wanted():
+            return
+        config = current_app.config
+        if config['PROFILE_MODE'] == 'sampler':
+            profiler = _Sampler(threading.get_ident(), config['PROFILE_SAMPLE_INTERVAL'])
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.request_profile = {'profiler': profiler, 'started': time.perf_counter()}
+
+    def _after_request(self, response):
+        profile = g.get('request_profile')
+        if profile is not None:
+            # Read these before query_stats' own after_request hook clears them
+            tally = query_stats.current()
+            profile['status'] = response.status_code
+            profile['query_count'] = tally.count if tally is not None else None
+            profile['db_ms'] = round(tally.seconds * 1000, 2) if tally is not None else None
+        return response
+
+    def _teardown_request(self, exc):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return
+        profiler = profile['profiler']
+        if isinstance(profiler, _Sampler):
+            profiler.stop()
+        else:
+            profiler.disable()
+        elapsed_ms = round((time.perf_counter() - profile['started']) * 1000, 2)
+        try:
+            self._write(profile, profiler, elapsed_ms)
+        except OSError as e:
+            current_app.logger.warning(f"Could not write request profile: {str(e)}")
+
+    def _write(self, profile, profiler, elapsed_ms):
+        rule = request.url_rule
+        route = rule.rule if rule is not None else request.path
+        user_id = _user_id()
+        directory = current_app.config['PROFILE_DIR']
+        os.makedirs(directory, exist_ok=True)
+
+        # e.g. 20240101T120000123456-GET-api_progress_weekly-progress-u7
+        slug = re.sub(r'[^A-Za-z0-9_-]+', '_', route).strip('_') or 'root'
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        base = os.path.join(directory, f"{stamp}-{request.method}-{slug}-u{user_id if user_id is not None else 'anon'}")
+
+        if isinstance(profiler, _Sampler):
+            profile_file = base + '.folded'
+            with open(profile_file, 'w') as f:
+                f.write(profiler.collapsed())
+        else:
+            profile_file = base + '.prof'
+            profiler.dump_stats(profile_file)
+
+        with open(base + '.json', 'w') as f:
+            json.dump({
+                'route': route,
+                'path': request.full_path,
+                'method': request.method,
+                'status': profile.get('status', 500),
+                'user_id': user_id,
+                'query_count': profile.get('query_count'),
+                'db_ms': profile.get('db_ms'),
+                'elapsed_ms': elapsed_ms,
+                'mode': 'sampler' if isinstance(profiler, _Sampler) else 'cprofile',
+                'profile': os.path.basename(profile_file)
+            }, f, indent=2)
+
+def _user_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # The route does not use JWT
+        return None
+
+request_profiler = RequestProfiler()
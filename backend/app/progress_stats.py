@@ -0,0 +1,112 @@
+from datetime import timedelta
+from sqlalchemy import and_, func, select
+from app.extensions import db
+from app.models.study_models import Course
+from app.models.progress_models import StudyProgress, DailyStudy
+
+# Each helper below issues exactly one query, however many courses or
+# study days the user has.
+
+def daily_minutes(user_id, start_date, end_date):
+    """Return {date: minutes} for the days in the range that have a record."""
+    rows = db.session.execute(
+        select(DailyStudy.study_date, func.sum(DailyStudy.total_minutes))
+        .where(
+            DailyStudy.user_id == user_id,
+            DailyStudy.study_date >= start_date,
+            DailyStudy.study_date <= end_date
+        )
+        .group_by(DailyStudy.study_date)
+    ).all()
+    return {study_date: minutes or 0 for study_date, minutes in rows}
+
+def confidence_distribution(user_id):
+    """Return {confidence_level: count} over all of the user's progress records."""
+    rows = db.session.execute(
+        select(StudyProgress.confidence_level, func.count(StudyProgress.id))
+        .where(StudyProgress.user_id == user_id)
+        .group_by(StudyProgress.confidence_level)
+    ).all()
+    return {level: count for level, count in rows}
+
+def course_performance(user_id):
+    """Return (id, title, average confidence or None) for each of the user's courses."""
+    return db.session.execute(
+        select(Course.id, Course.title, func.avg(StudyProgress.confidence_level))
+        .outerjoin(StudyProgress, and_(
+            StudyProgress.course_id == Course.id,
+            StudyProgress.user_id == user_id
+        ))
+        .where(Course.user_id == user_id)
+        .group_by(Course.id, Course.title)
+        .order_by(Course.id)
+    ).all()
+
+def last_study_date(user_id, today):
+    """Return the most recent day up to today with study time, or None."""
+    return db.session.execute(
+        select(DailyStudy.study_date)
+        .where(
+            DailyStudy.user_id == user_id,
+            DailyStudy.study_date <= today,
+            DailyStudy.total_minutes > 0
+        )
+        .order_by(DailyStudy.study_date.desc())
+        .limit(1)
+    ).scalar()
+
+def current_streak(user_id, today):
+    """Return the number of consecutive study days ending today.
+
+    Study days are numbered newest first; along an unbroken run back from
+    today, day_number(date) + row_number is constant (today + 1), so the
+    streak is the count of rows matching that value.
+    """
+    study_days = _numbered_study_days(user_id, today)
+    return db.session.execute(
+        select(func.count())
+        .select_from(study_days)
+        .where(_day_number(study_days.c.study_date) + study_days.c.rn == _day_number(today) + 1)
+    ).scalar()
+
+def longest_streak(user_id, today):
+    """Return the length of the longest run of consecutive study days up to today.
+
+    Uses the same numbering as current_streak: each unbroken run shares one
+    day_number(date) + row_number value, so runs are groups of that value.
+    """
+    study_days = _numbered_study_days(user_id, today)
+    runs = (
+        select(func.count().label('length'))
+        .select_from(study_days)
+        .group_by(_day_number(study_days.c.study_date) + study_days.c.rn)
+        .subquery()
+    )
+    return db.session.execute(select(func.coalesce(func.max(runs.c.length), 0))).scalar()
+
+def _numbered_study_days(user_id, today):
+    """Subquery of the user's study days up to today, numbered newest first."""
+    return (
+        select(
+            DailyStudy.study_date.label('study_date'),
+            func.row_number().over(order_by=DailyStudy.study_date.desc()).label('rn')
+        )
+        .where(DailyStudy.user_id == user_id, DailyStudy.study_date <= today)
+        .group_by(DailyStudy.study_date)
+        .having(func.sum(DailyStudy.total_minutes) > 0)
+        .subquery()
+    )
+
+def _day_number(value):
+    """SQL expression for a date as a whole number of days."""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return func.julianday(value)
+    if dialect == 'mysql':
+        return func.to_days(value)
+    # PostgreSQL and most others: days since the epoch
+    return func.extract('epoch', value) / 86400
+
+def week_range(today):
+    """Return the first and last date of the 7-day window ending today."""
+    return today - timedelta(days=6), today
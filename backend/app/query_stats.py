@@ -0,0 +1,128 @@
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class _Tally:
+    """Queries run and time spent in the database for one request or block."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold):
+        """Return (statement, times) for statements run at least threshold times."""
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+class QueryStats:
+    """Counts SQL queries and database time per request.
+
+    Every cursor execution on any engine is added to the tallies open in
+    the current app context: the request's, and any opened by
+    count_queries(). Requests over QUERY_BUDGET queries are logged, as is
+    any statement repeated QUERY_REPEAT_THRESHOLD times or more, the usual
+    sign of an N+1 loop. In debug mode (or with QUERY_STATS_HEADERS) the
+    counts are also sent as response headers.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_BUDGET', int(os.environ.get('QUERY_BUDGET', 20)))  # Queries per request before logging
+        app.config.setdefault('QUERY_REPEAT_THRESHOLD', int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5)))
+        app.config.setdefault('QUERY_STATS_HEADERS', os.environ.get('QUERY_STATS_HEADERS', '0') == '1')
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['query_stats'] = self
+
+    @contextmanager
+    def count_queries(self):
+        """Count the queries run inside the block; yields the tally."""
+        tally = _Tally()
+        tallies = g.setdefault('query_tallies', [])
+        tallies.append(tally)
+        try:
+            yield tally
+        finally:
+            tallies.remove(tally)
+
+    @contextmanager
+    def assert_max_queries(self, limit):
+        """Fail if the block runs more than limit queries, listing what ran."""
+        with self.count_queries() as tally:
+            yield tally
+        if tally.count > limit:
+            ran = '\n'.join(f'{times}x {statement}' for statement, times in tally.statements.most_common())
+            raise AssertionError(f'{tally.count} queries run, at most {limit} expected:\n{ran}')
+
+    def current(self):
+        """Return the current request's tally, or None outside a request."""
+        return g.get('request_queries')
+
+    def _before_request(self):
+        tally = g.request_queries = _Tally()
+        g.setdefault('query_tallies', []).append(tally)
+
+    def _after_request(self, response):
+        tally = g.pop('request_queries', None)
+        if tally is None:
+            return response
+        g.query_tallies.remove(tally)
+
+        config = current_app.config
+        elapsed_ms = round(tally.seconds * 1000, 2)
+        if current_app.debug or config['QUERY_STATS_HEADERS']:
+            response.headers['X-Query-Count'] = str(tally.count)
+            response.headers['X-Query-Time-Ms'] = str(elapsed_ms)
+            response.headers.add('Server-Timing', f'db;desc="{tally.count} queries";dur={elapsed_ms}')
+
+        if tally.count > config['QUERY_BUDGET']:
+            current_app.logger.warning(
+                f"{request.method} {request.path} ran {tally.count} queries "
+                f"({elapsed_ms} ms), over the budget of {config['QUERY_BUDGET']}"
+            )
+        for statement, times in tally.repeated(config['QUERY_REPEAT_THRESHOLD']):
+            current_app.logger.warning(
+                f"{request.method} {request.path} ran the same statement {times} times "
+                f"(possible N+1): {' '.join(statement.split())[:200]}"
+            )
+        return response
+
+    def _teardown_request(self, exc):
+        # after_request is skipped when the view raises
+        tally = g.pop('request_queries', None)
+        if tally is not None:
+            g.query_tallies.remove(tally)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and g.get('query_tallies'):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if has_app_context():
+        for tally in g.get('query_tallies', ()):
+            tally.count += 1
+            tally.seconds += elapsed
+            tally.statements[statement] += 1
+
+def _handle_error(exception_context):
+    started = exception_context.connection is not None and exception_context.connection.info.get('query_started')
+    if started:
+        started.pop()
+
+query_stats = QueryStats()
+
+event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+event.listen(Engine, 'handle_error', _handle_error)
@@ -0,0 +1,123 @@
+import math
+import os
+import time
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeSerializer
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+STICKY_COOKIE = 'db_primary_until'
+
+class RoutingSession(Session):
+    """Session that sends GET requests' reads to the replica bind.
+
+    Everything else goes where Flask-SQLAlchemy would send it: writes,
+    flushes and SELECT ... FOR UPDATE always reach the primary, and so do
+    the reads after them in the same request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and replica_router.reads_from_replica(self, clause):
+            engines = self._db.engines
+            if engine is engines[None]:
+                return engines[REPLICA_BIND]
+        return engine
+
+class ReplicaRouter:
+    """Routes GET requests to a read replica, with read-your-writes stickiness.
+
+    DATABASE_REPLICA_URL adds a ``replica`` bind. GET and HEAD requests
+    read from it until they write; every other request, and work outside a
+    request (jobs, CLI commands), uses the primary. After a user's write
+    request succeeds, their reads stay on the primary for
+    DB_REPLICA_STICKY_SECONDS, which should exceed the replication lag.
+
+    The end of that window travels with the client in a cookie signed with
+    SECRET_KEY, so it holds whichever worker process serves the next
+    request. Clients that drop cookies read from the replica at once.
+    Without a replica URL no hooks are installed.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the replica bind; call before ``db.init_app``, which creates the engines."""
+        app.config.setdefault('DATABASE_REPLICA_URL', os.environ.get('DATABASE_REPLICA_URL'))
+        app.config.setdefault('DB_REPLICA_STICKY_SECONDS', float(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5)))
+        app.extensions['replica_router'] = self
+        if not app.config['DATABASE_REPLICA_URL']:
+            return
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), REPLICA_BIND: app.config['DATABASE_REPLICA_URL']}
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def reads_from_replica(self, session, clause):
+        """Return whether this statement may run on the replica."""
+        if not has_request_context() or not current_app.config['DATABASE_REPLICA_URL']:
+            return False
+        if g.get('db_route') == 'pending':
+            # Decided on the first statement, once the view has checked the JWT
+            user_id = _user_id()
+            g.db_route = 'primary' if user_id is not None and self.is_sticky(user_id) else REPLICA_BIND
+        if g.get('db_route') != REPLICA_BIND:
+            return False
+        if session._flushing or _is_write(clause):
+            # The rest of the request must see what it is writing
+            g.db_route = 'primary'
+            return False
+        return True
+
+    def is_sticky(self, user_id):
+        """Return whether the request's cookie says the user wrote within the window."""
+        cookie = request.cookies.get(STICKY_COOKIE)
+        if not cookie:
+            return False
+        try:
+            written_by, until = self._serializer().loads(cookie)
+        except (BadSignature, TypeError, ValueError):
+            return False
+        return written_by == user_id and until > time.time()
+
+    def mark_written(self, user_id, response):
+        """Keep the user's reads on the primary for the stickiness window."""
+        seconds = current_app.config['DB_REPLICA_STICKY_SECONDS']
+        response.set_cookie(
+            STICKY_COOKIE,
+            self._serializer().dumps([user_id, time.time() + seconds]),
+            max_age=math.ceil(seconds),
+            secure=request.is_secure,
+            httponly=True,
+            samesite='Lax'
+        )
+
+    def _serializer(self):
+        return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='db-replica-sticky')
+
+    def _before_request(self):
+        g.db_route = 'pending' if request.method in READ_METHODS else 'primary'
+
+    def _after_request(self, response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            user_id = _user_id()
+            if user_id is not None:
+                self.mark_written(user_id, response)
+        return response
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    return getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
+
+def _user_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # The route does not use JWT
+        return None
+
+replica_router = ReplicaRouter()
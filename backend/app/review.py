@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, event, func, literal, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.study_models import Course, PracticeQuestion
+from app.models.progress_models import ReviewCard
+
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+PASSING_GRADE = 3  # Grades run 0 (blackout) to 5 (perfect recall)
+
+def schedule(card, grade, now):
+    """Return the card's next SM-2 state after answering with grade.
+
+    card is a mapping with ease, interval_days, repetitions and lapses
+    (None for a question never reviewed).
+    """
+    ease = card['ease'] if card else DEFAULT_EASE
+    interval = card['interval_days'] if card else 0
+    repetitions = card['repetitions'] if card else 0
+    lapses = card['lapses'] if card else 0
+
+    if grade < PASSING_GRADE:
+        # Forgotten: start the run again tomorrow
+        repetitions = 0
+        interval = 1
+        lapses += 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1
+        elif repetitions == 2:
+            interval = 6
+        else:
+            interval = round(interval * ease, 2)
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    return {
+        'ease': round(ease, 4),
+        'interval_days': interval,
+        'repetitions': repetitions,
+        'lapses': lapses,
+        'due_at': now + timedelta(days=interval),
+        'last_reviewed_at': now
+    }
+
+def next_cards(user_id, n, now, course_id=None):
+    """Return up to n (question, card or None) pairs to review next.
+
+    Due cards come first, oldest due first, read from the (user_id, due_at)
+    index so the cost depends on n, not on how many cards the user has.
+    Any room left is filled with questions the user has never reviewed,
+    whose cards have no due_at yet and so are a range of the same index.
+    """
+    due_query = (
+        select(PracticeQuestion, ReviewCard)
+        .join(PracticeQuestion, PracticeQuestion.id == ReviewCard.question_id)
+        .where(ReviewCard.user_id == user_id, ReviewCard.due_at <= now)
+        .order_by(ReviewCard.due_at)
+        .limit(n)
+    )
+    if course_id is not None:
+        due_query = due_query.where(ReviewCard.course_id == course_id)
+    picked = [(question, card) for question, card in db.session.execute(due_query)]
+
+    if len(picked) < n:
+        new_query = (
+            select(PracticeQuestion)
+            .join(ReviewCard, ReviewCard.question_id == PracticeQuestion.id)
+            .where(ReviewCard.user_id == user_id, ReviewCard.due_at.is_(None))
+            .order_by(ReviewCard.id)
+            .limit(n - len(picked))
+        )
+        if course_id is not None:
+            new_query = new_query.where(ReviewCard.course_id == course_id)
+        picked.extend((question, None) for question in db.session.execute(new_query).scalars())
+
+    return picked
+
+def add_new_cards(connection, *criteria):
+    """Give the practice questions matching criteria new cards for their courses' users.
+
+    Questions created through the ORM get theirs when they are flushed;
+    bulk inserts, which bypass the flush, must call this themselves.
+    Questions that already have a card are skipped. The caller commits.
+    """
+    table = ReviewCard.__table__
+    statement = _insert_ignoring_duplicates(table).from_select(
+        ['user_id', 'course_id', 'question_id', 'ease', 'interval_days', 'repetitions', 'lapses', 'created_at'],
+        select(
+            Course.user_id,
+            PracticeQuestion.course_id,
+            PracticeQuestion.id,
+            literal(DEFAULT_EASE),
+            literal(0.0),
+            literal(0),
+            literal(0),
+            literal(datetime.utcnow())
+        )
+        .join(Course, Course.id == PracticeQuestion.course_id)
+        .where(*criteria)
+    )
+    connection.execute(statement)
+
+def last_question_id():
+    """Return the highest practice question id; a bulk insert's rows come after it."""
+    return db.session.execute(select(func.max(PracticeQuestion.id))).scalar() or 0
+
+def record_answers(user_id, grades, now):
+    """Apply {question_id: grade} for questions the user owns; return the new states.
+
+    One query reads the current cards (and checks ownership), then one
+    executemany upsert writes every updated card.
+    """
+    rows = db.session.execute(
+        select(
+            PracticeQuestion.id,
+            PracticeQuestion.course_id,
+            ReviewCard.ease,
+            ReviewCard.interval_days,
+            ReviewCard.repetitions,
+            ReviewCard.lapses,
+            ReviewCard.id.label('card_id')
+        )
+        .join(Course, Course.id == PracticeQuestion.course_id)
+        .outerjoin(ReviewCard, and_(
+            ReviewCard.question_id == PracticeQuestion.id,
+            ReviewCard.user_id == user_id
+        ))
+        .where(PracticeQuestion.id.in_(list(grades)), Course.user_id == user_id)
+    ).all()
+
+    updates = []
+    for row in rows:
+        card = row._mapping if row.card_id is not None else None
+        state = schedule(card, grades[row.id], now)
+        state.update(user_id=user_id, course_id=row.course_id, question_id=row.id)
+        updates.append(state)
+
+    if updates:
+        db.session.execute(_card_upsert(), updates)
+    return updates
+
+def _card_upsert():
+    table = ReviewCard.__table__
+    values = ['ease', 'interval_days', 'repetitions', 'lapses', 'due_at', 'last_reviewed_at']
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(table)
+        return statement.on_duplicate_key_update({column: statement.inserted[column] for column in values})
+    # SQLite and PostgreSQL share the ON CONFLICT syntax
+    statement = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(table)
+    return statement.on_conflict_do_update(
+        index_elements=['user_id', 'question_id'],
+        set_={column: statement.excluded[column] for column in values}
+    )
+
+def _insert_ignoring_duplicates(table):
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        return mysql_insert(table).prefix_with('IGNORE')
+    return (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(table).on_conflict_do_nothing()
+
+def _after_flush(session, flush_context):
+    # SQLite does not enforce the cascade, and may reuse a deleted question's id
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, PracticeQuestion)]
+    if deleted:
+        session.connection().execute(delete(ReviewCard.__table__).where(ReviewCard.question_id.in_(deleted)))
+    created = [obj.id for obj in session.new if isinstance(obj, PracticeQuestion)]
+    if created:
+        add_new_cards(session.connection(), PracticeQuestion.id.in_(created))
+
+event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select
+from app.extensions import db
+from app import progress_stats
+from app.models.user import User
+from app.models.progress_models import StudyRollup
+
+# The rollup row holds everything the dashboard needs about study time, so
+# reading it is one lookup by user_id however long the user's history is.
+# record_study() keeps it current as sessions end; rebuild_rollup()
+# recomputes it from DailyStudy when it is missing or out of order.
+
+def get_rollup(user_id, for_update=False):
+    """Return the user's rollup row, or None if it has not been built yet."""
+    query = select(StudyRollup).where(StudyRollup.user_id == user_id)
+    if for_update:
+        query = query.with_for_update()
+    return db.session.execute(query).scalar()
+
+def record_study(user_id, study_date, minutes, day_total):
+    """Fold minutes studied on study_date into the user's rollup.
+
+    day_total is the user's DailyStudy total for study_date after adding
+    minutes. The caller commits, so the rollup changes in the same
+    transaction as the DailyStudy row it mirrors.
+    """
+    rollup = get_rollup(user_id, for_update=True)
+    if rollup is None or (rollup.last_study_date and study_date < rollup.last_study_date):
+        # No row yet, or a backdated day that could join two runs: recompute
+        return rebuild_rollup(user_id, study_date)
+
+    if day_total > 0 and rollup.last_study_date != study_date:
+        if rollup.last_study_date == study_date - timedelta(days=1):
+            rollup.current_streak += 1
+        else:
+            rollup.current_streak = 1
+        rollup.last_study_date = study_date
+        rollup.longest_streak = max(rollup.longest_streak, rollup.current_streak)
+
+    recent = dict(rollup.recent_minutes or {})
+    recent[study_date.isoformat()] = day_total
+    _set_recent(rollup, recent, study_date)
+    return rollup
+
+def rebuild_rollup(user_id, today=None):
+    """Recompute the user's rollup from their DailyStudy rows."""
+    today = today or date.today()
+    rollup = get_rollup(user_id, for_update=True)
+    if rollup is None:
+        rollup = StudyRollup(user_id=user_id)
+        db.session.add(rollup)
+
+    start_date = today - timedelta(days=StudyRollup.RECENT_DAYS - 1)
+    minutes_by_day = progress_stats.daily_minutes(user_id, start_date, today)
+    last_study_date = progress_stats.last_study_date(user_id, today)
+
+    rollup.last_study_date = last_study_date
+    rollup.current_streak = progress_stats.current_streak(user_id, last_study_date) if last_study_date else 0
+    rollup.longest_streak = progress_stats.longest_streak(user_id, today)
+    _set_recent(rollup, {day.isoformat(): minutes for day, minutes in minutes_by_day.items()}, today)
+    return rollup
+
+def rebuild_all(today=None):
+    """Rebuild every user's rollup, committing per user; return the user count."""
+    user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+    for user_id in user_ids:
+        rebuild_rollup(user_id, today)
+        db.session.commit()
+    return len(user_ids)
+
+def _set_recent(rollup, recent, today):
+    """Store per-day minutes for the last RECENT_DAYS days and the window totals."""
+    cutoff = today - timedelta(days=StudyRollup.RECENT_DAYS - 1)
+    recent = {
+        iso_date: minutes
+        for iso_date, minutes in recent.items()
+        if date.fromisoformat(iso_date) >= cutoff
+    }
+    rollup.recent_minutes = recent
+    rollup.minutes_7d = sum(
+        minutes for iso_date, minutes in recent.items()
+        if date.fromisoformat(iso_date) > today - timedelta(days=7)
+    )
+    rollup.minutes_30d = sum(recent.values())
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Recompute study rollups for all users from their daily study records."""
+    count = rebuild_all()
+    click.echo(f'Rebuilt study rollups for {count} users.')
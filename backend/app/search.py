@@ -0,0 +1,412 @@
+import heapq
+import math
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from flask import current_app
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+from app import versions
+from app.extensions import db
+from app.models.study_models import Course, Note, PracticeQuestion
+
+SNIPPET_TOKENS = 12
+
+# Searchable documents: kind -> (model, searchable columns, FTS5 table)
+DOCUMENTS = {
+    'note': (Note, ('title', 'content'), 'notes_fts'),
+    'question': (PracticeQuestion, ('question', 'answer'), 'questions_fts'),
+}
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+def tokenize(value):
+    """Lowercase word tokens with accents removed, like FTS5's unicode61 tokenizer."""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return _WORD.findall(value.lower())
+
+def _fts_query(terms):
+    """Build an FTS5 MATCH expression: all terms, the last one as a prefix."""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+class _Fts5Backend:
+    """Ranked search through external-content FTS5 tables kept current by triggers.
+
+    Triggers on ``notes`` and ``practice_questions`` mirror every insert,
+    update and delete, including bulk statements and cascade deletes, into
+    the index in the same transaction.
+    """
+
+    name = 'fts5'
+
+    def create_schema(self, connection):
+        for kind, (model, columns, fts_table) in DOCUMENTS.items():
+            table = model.__tablename__
+            existed = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': fts_table}
+            ).scalar()
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            connection.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+                f"{column_list}, content='{table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            )
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            )
+            if not existed:
+                # Index rows written before the index existed
+                connection.exec_driver_sql(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+    def drop_schema(self, connection):
+        for kind, (model, columns, fts_table) in DOCUMENTS.items():
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS {fts_table}')
+
+    def search(self, terms, user_id, course_id, limit):
+        match = _fts_query(terms)
+        scope = " AND d.course_id = :course_id" if course_id is not None else ''
+        rows = []
+        # One query per table: FTS5 can only use its rank-ordered LIMIT
+        # shortcut, which also limits snippet() to the returned rows, in a
+        # simple query. bm25 ranks are lower for better matches.
+        for kind, (model, columns, fts_table) in DOCUMENTS.items():
+            table = model.__tablename__
+            rows.extend(db.session.execute(
+                text(
+                    f"SELECT '{kind}', d.id, d.course_id, d.{columns[0]}, "
+                    f"snippet({fts_table}, 1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}), {fts_table}.rank "
+                    f"FROM {fts_table} JOIN {table} d ON d.id = {fts_table}.rowid "
+                    f"JOIN courses c ON c.id = d.course_id "
+                    f"WHERE {fts_table} MATCH :match AND c.user_id = :user_id{scope} "
+                    f"ORDER BY {fts_table}.rank LIMIT :limit"
+                ),
+                {'match': match, 'user_id': user_id, 'course_id': course_id, 'limit': limit}
+            ).all())
+        return [
+            {
+                'type': kind,
+                'id': doc_id,
+                'course_id': doc_course_id,
+                'title': title,
+                'snippet': snippet,
+                'score': round(-rank, 4)
+            }
+            for kind, doc_id, doc_course_id, title, snippet, rank in heapq.nsmallest(limit, rows, key=lambda row: row[5])
+        ]
+
+_UNLOADED = object()
+
+class _InvertedIndex:
+    """In-process BM25 inverted index for databases without FTS5.
+
+    Built from the database on the first search in each process, then kept
+    current from committed ORM changes. Bulk statements against the indexed
+    tables mark it stale and it is rebuilt on the next search.
+
+    Other processes' commits are caught through the course version scopes
+    every note and question write bumps: each search compares the versions
+    of the searched courses with those the index last loaded, and reloads
+    the courses that changed.
+    """
+
+    name = 'python'
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._postings = {}  # term -> {doc_key: term frequency}
+        self._docs = {}  # doc_key -> (course_id, fields, length)
+        self._course_docs = {}  # course_id -> doc_keys
+        self._course_versions = {}  # course_id -> scope version when last loaded
+        self._vocabulary = []  # Sorted terms, for prefix matching
+        self._total_length = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+
+    def apply(self, upserts, deletes):
+        """Apply committed changes: upserts are (doc_key, course_id, fields)."""
+        with self._lock:
+            if not self._built:
+                return
+            for doc_key in deletes:
+                self._remove(doc_key)
+            for doc_key, course_id, fields in upserts:
+                self._remove(doc_key)
+                self._add(doc_key, course_id, fields)
+            self._vocabulary = sorted(self._postings)
+
+    def search(self, terms, user_id, course_id, limit):
+        course_ids = set(db.session.execute(
+            select(Course.id).where(Course.user_id == user_id)
+        ).scalars())
+        if course_id is not None:
+            course_ids &= {course_id}
+        scopes = {versions.course_scope(owned_id): owned_id for owned_id in course_ids}
+        seen = dict.fromkeys(course_ids)
+        for scope, version in db.session.execute(
+            select(versions.versions_table.c.scope, versions.versions_table.c.version)
+            .where(versions.versions_table.c.scope.in_(list(scopes)))
+        ):
+            seen[scopes[scope]] = version
+
+        with self._lock:
+            if not self._built:
+                self._build()
+            for changed_id, version in seen.items():
+                if self._course_versions.get(changed_id, _UNLOADED) != version:
+                    self._reload_course(changed_id, version)
+            matches = None
+            weights = []
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1:
+                    expanded = self._prefix_terms(term)
+                else:
+                    expanded = [term] if term in self._postings else []
+                docs = set()
+                for expanded_term in expanded:
+                    docs.update(self._postings[expanded_term])
+                matches = docs if matches is None else matches & docs
+                weights.append(expanded)
+
+            candidates = [doc_key for doc_key in matches or () if self._docs[doc_key][0] in course_ids]
+            scored = heapq.nlargest(
+                limit,
+                ((self._score(doc_key, weights), doc_key) for doc_key in candidates)
+            )
+            return [
+                {
+                    'type': doc_key[0],
+                    'id': doc_key[1],
+                    'course_id': self._docs[doc_key][0],
+                    'title': self._docs[doc_key][1][0],
+                    'snippet': self._snippet(self._docs[doc_key][1][1], terms),
+                    'score': round(score, 4)
+                }
+                for score, doc_key in scored
+            ]
+
+    def _build(self):
+        self._postings, self._docs, self._course_docs, self._total_length = {}, {}, {}, 0
+        # Versions first, so a write racing the build is reloaded later
+        scope = versions.course_scope('') + Course.id.cast(db.String)
+        self._course_versions = dict.fromkeys(db.session.execute(select(Course.id)).scalars())
+        self._course_versions.update(db.session.execute(
+            select(Course.id, versions.versions_table.c.version)
+            .join(versions.versions_table, versions.versions_table.c.scope == scope)
+        ).all())
+        for kind, (model, columns, fts_table) in DOCUMENTS.items():
+            rows = db.session.execute(
+                select(model.id, model.course_id, *[getattr(model, column) for column in columns])
+                .execution_options(yield_per=1000)
+            )
+            for doc_id, course_id, *fields in rows:
+                self._add((kind, doc_id), course_id, tuple(fields))
+        self._vocabulary = sorted(self._postings)
+        self._built = True
+
+    def _reload_course(self, course_id, version):
+        for doc_key in list(self._course_docs.get(course_id, ())):
+            self._remove(doc_key)
+        for kind, (model, columns, fts_table) in DOCUMENTS.items():
+            rows = db.session.execute(
+                select(model.id, *[getattr(model, column) for column in columns])
+                .where(model.course_id == course_id)
+            )
+            for doc_id, *fields in rows:
+                self._add((kind, doc_id), course_id, tuple(fields))
+        self._vocabulary = sorted(self._postings)
+        self._course_versions[course_id] = version
+
+    def _add(self, doc_key, course_id, fields):
+        tokens = [token for field in fields for token in tokenize(field)]
+        for term, count in Counter(tokens).items():
+            self._postings.setdefault(term, {})[doc_key] = count
+        self._docs[doc_key] = (course_id, fields, len(tokens))
+        self._course_docs.setdefault(course_id, set()).add(doc_key)
+        self._total_length += len(tokens)
+
+    def _remove(self, doc_key):
+        doc = self._docs.pop(doc_key, None)
+        if doc is None:
+            return
+        course_id, fields, length = doc
+        self._course_docs[course_id].discard(doc_key)
+        self._total_length -= length
+        for term in set(token for field in fields for token in tokenize(field)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_key, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _prefix_terms(self, prefix):
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _score(self, doc_key, weights):
+        doc_count = len(self._docs)
+        average_length = self._total_length / doc_count if doc_count else 1
+        length = self._docs[doc_key][2]
+        score = 0.0
+        for expanded in weights:
+            for term in expanded:
+                frequency = self._postings[term].get(doc_key)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (doc_count - len(self._postings[term]) + 0.5) / (len(self._postings[term]) + 0.5))
+                norm = frequency + self.K1 * (1 - self.B + self.B * length / average_length)
+                score += idf * frequency * (self.K1 + 1) / norm
+        return score
+
+    def _snippet(self, body, terms):
+        words = (body or '').split()
+        normalized = [' '.join(tokenize(word)) for word in words]
+        hit = next(
+            (i for i, word in enumerate(normalized) if any(word.startswith(term) for term in terms)),
+            0
+        )
+        start = max(0, hit - SNIPPET_TOKENS // 2)
+        window = words[start:start + SNIPPET_TOKENS]
+        marked = [
+            f'<mark>{word}</mark>' if any(normalized[start + i].startswith(term) for term in terms) else word
+            for i, word in enumerate(window)
+        ]
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if start + SNIPPET_TOKENS < len(words) else ''
+        return prefix + ' '.join(marked) + suffix
+
+class SearchIndex:
+    """Full-text search over notes and practice questions.
+
+    Uses SQLite FTS5 when the database supports it and the in-process
+    inverted index otherwise (or when SEARCH_BACKEND is 'python').
+    """
+
+    def __init__(self, app=None):
+        self.fts5 = _Fts5Backend()
+        self.inverted_index = _InvertedIndex()
+        self._fts5_available = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SEARCH_BACKEND', os.environ.get('SEARCH_BACKEND', 'auto'))  # auto, fts5 or python
+        app.config.setdefault('SEARCH_MAX_RESULTS', int(os.environ.get('SEARCH_MAX_RESULTS', 50)))
+        app.extensions['search_index'] = self
+
+    def backend(self, connection=None):
+        """Return the backend in use for the current app's database."""
+        setting = current_app.config['SEARCH_BACKEND']
+        if setting == 'python':
+            return self.inverted_index
+        if setting == 'fts5' or self._supports_fts5(connection):
+            return self.fts5
+        return self.inverted_index
+
+    def search(self, query, user_id, course_id=None, limit=None):
+        """Return ranked matches from the user's courses (optionally one course)."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        limit = min(limit or current_app.config['SEARCH_MAX_RESULTS'], current_app.config['SEARCH_MAX_RESULTS'])
+        return self.backend().search(terms, user_id, course_id, limit)
+
+    def _supports_fts5(self, connection=None):
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return False
+        url = str(engine.url)
+        if url not in self._fts5_available:
+            def probe(conn):
+                options = conn.exec_driver_sql('PRAGMA compile_options').scalars().all()
+                return 'ENABLE_FTS5' in options
+            if connection is not None:
+                self._fts5_available[url] = probe(connection)
+            else:
+                with engine.connect() as conn:
+                    self._fts5_available[url] = probe(conn)
+        return self._fts5_available[url]
+
+    # Schema and sync hooks, registered below
+
+    def _after_create(self, target, connection, **kw):
+        if self.backend(connection) is self.fts5:
+            self.fts5.create_schema(connection)
+        self.inverted_index.invalidate()
+
+    def _before_drop(self, target, connection, **kw):
+        if connection.dialect.name == 'sqlite':
+            self.fts5.drop_schema(connection)
+        self.inverted_index.invalidate()
+
+    def _after_flush(self, session, flush_context):
+        pending = session.info.setdefault('search_changes', ([], []))
+        upserts, deletes = pending
+        for obj in list(session.new) + list(session.dirty):
+            kind = _kind_of(obj)
+            if kind is not None:
+                columns = DOCUMENTS[kind][1]
+                upserts.append(((kind, obj.id), obj.course_id, tuple(getattr(obj, column) for column in columns)))
+        for obj in session.deleted:
+            kind = _kind_of(obj)
+            if kind is not None:
+                deletes.append((kind, obj.id))
+
+    def _after_commit(self, session):
+        upserts, deletes = session.info.pop('search_changes', ([], []))
+        if upserts or deletes:
+            self.inverted_index.apply(upserts, deletes)
+
+    def _after_rollback(self, session):
+        session.info.pop('search_changes', None)
+
+    def _do_orm_execute(self, orm_execute_state):
+        # Bulk INSERT/UPDATE/DELETE bypass the flush, so rebuild instead
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, 'table', None)
+            if table is not None and table.name in ('notes', 'practice_questions'):
+                self.inverted_index.invalidate()
+
+def _kind_of(obj):
+    if isinstance(obj, Note):
+        return 'note'
+    if isinstance(obj, PracticeQuestion):
+        return 'question'
+    return None
+
+search_index = SearchIndex()
+
+event.listen(db.metadata, 'after_create', search_index._after_create)
+event.listen(db.metadata, 'before_drop', search_index._before_drop)
+event.listen(Session, 'after_flush', search_index._after_flush)
+event.listen(Session, 'after_commit', search_index._after_commit)
+event.listen(Session, 'after_rollback', search_index._after_rollback)
+event.listen(Session, 'do_orm_execute', search_index._do_orm_execute)
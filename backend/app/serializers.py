@@ -0,0 +1,59 @@
+from sqlalchemy import Date, DateTime, select
+from app.models.study_models import Course, Note, PracticeQuestion
+from app.models.progress_models import Todo
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+class Serializer:
+    """Turns rows of one model into response dicts.
+
+    The column list and the per-field conversions are worked out once, when
+    the serializer is defined. List endpoints select just those columns
+    with select() and get plain row tuples back, skipping ORM object
+    construction; single-object endpoints can still pass mapped instances.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self.columns = tuple(getattr(model, field) for field in self.fields)
+        # Dates and datetimes become ISO 8601 strings; everything else passes through
+        self._converters = tuple(
+            _isoformat if isinstance(column.type, (Date, DateTime)) else None
+            for column in self.columns
+        )
+        self._converted = tuple(
+            (index, convert) for index, convert in enumerate(self._converters) if convert is not None
+        )
+
+    def select(self):
+        """Return a select() of just the serialized columns."""
+        return select(*self.columns)
+
+    def row(self, row):
+        """Serialize one row tuple from self.select()."""
+        values = list(row)
+        for index, convert in self._converted:
+            values[index] = convert(values[index])
+        return dict(zip(self.fields, values))
+
+    def rows(self, rows):
+        """Serialize a sequence of row tuples from self.select()."""
+        fields, converted = self.fields, self._converted
+        result = []
+        for row in rows:
+            values = list(row)
+            for index, convert in converted:
+                values[index] = convert(values[index])
+            result.append(dict(zip(fields, values)))
+        return result
+
+    def one(self, obj):
+        """Serialize a mapped instance."""
+        return self.row(tuple(getattr(obj, field) for field in self.fields))
+
+course_serializer = Serializer(Course, ['id', 'title', 'description', 'created_at'])
+note_serializer = Serializer(Note, ['id', 'title', 'content', 'created_at', 'course_id'])
+question_serializer = Serializer(PracticeQuestion, ['id', 'question', 'answer', 'difficulty', 'created_at', 'course_id'])
+todo_serializer = Serializer(Todo, ['id', 'text', 'completed', 'course_id', 'due_date', 'created_at'])
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.ai_models import InflightLock
+
+class _Flight:
+    """One in-progress call that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one.
+
+    Within a process, threads asking for the same key wait for the first
+    thread's result. Across processes, the first caller holds a row in
+    ``inflight_locks``; callers elsewhere wait for the row to go away and
+    then ask ``recheck`` (normally the completion cache) for the result,
+    falling back to making the call themselves.
+    """
+
+    def __init__(self, app=None):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('leaders', 'coalesced_local', 'coalesced_remote', 'remote_fallbacks'), 0
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_SINGLEFLIGHT_ENABLED', os.environ.get('AI_SINGLEFLIGHT_ENABLED', '1') == '1')
+        app.config.setdefault('AI_SINGLEFLIGHT_LEASE', float(os.environ.get('AI_SINGLEFLIGHT_LEASE', 120)))  # Seconds
+        app.config.setdefault('AI_SINGLEFLIGHT_POLL', float(os.environ.get('AI_SINGLEFLIGHT_POLL', 0.1)))  # Seconds
+        app.extensions['single_flight'] = self
+
+    def do(self, key, func, recheck=None):
+        """Return func(), sharing one execution among concurrent callers of key."""
+        if not current_app.config['AI_SINGLEFLIGHT_ENABLED']:
+            return func()
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._counters['leaders'] += 1
+
+        if not leader:
+            flight.done.wait()
+            with self._lock:
+                self._counters['coalesced_local'] += 1
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run_across_processes(key, func, recheck)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        """Return how many calls ran and how many were collapsed in this process."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = len(self._flights)
+        counters['coalesced'] = counters['coalesced_local'] + counters['coalesced_remote']
+        return counters
+
+    def _run_across_processes(self, key, func, recheck):
+        owner = uuid.uuid4().hex
+        try:
+            acquired = self._acquire(key, owner)
+        except Exception as e:
+            # The lock table is an optimization; never fail the call over it
+            current_app.logger.warning(f"Single-flight lock unavailable: {str(e)}")
+            return func()
+
+        if acquired:
+            try:
+                return func()
+            finally:
+                self._release(key, owner)
+
+        self._wait_for_release(key)
+        if recheck is not None:
+            result = recheck()
+            if result is not None:
+                with self._lock:
+                    self._counters['coalesced_remote'] += 1
+                return result
+
+        with self._lock:
+            self._counters['remote_fallbacks'] += 1
+        return func()
+
+    def _acquire(self, key, owner):
+        now = datetime.utcnow()
+        # A crashed owner leaves its row behind; take over once the lease runs out
+        with db.engine.begin() as conn:
+            conn.execute(delete(InflightLock).where(InflightLock.key == key, InflightLock.expires_at < now))
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(InflightLock).values(
+                    key=key,
+                    owner=owner,
+                    acquired_at=now,
+                    expires_at=now + timedelta(seconds=current_app.config['AI_SINGLEFLIGHT_LEASE'])
+                ))
+            return True
+        except IntegrityError:
+            return False
+
+    def _release(self, key, owner):
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(delete(InflightLock).where(InflightLock.key == key, InflightLock.owner == owner))
+        except Exception as e:
+            current_app.logger.warning(f"Single-flight lock release failed: {str(e)}")
+
+    def _wait_for_release(self, key):
+        config = current_app.config
+        deadline = time.monotonic() + config['AI_SINGLEFLIGHT_LEASE']
+        while time.monotonic() < deadline:
+            with db.engine.connect() as conn:
+                expires_at = conn.execute(
+                    select(InflightLock.expires_at).where(InflightLock.key == key)
+                ).scalar()
+            if expires_at is None or expires_at < datetime.utcnow():
+                return
+            time.sleep(config['AI_SINGLEFLIGHT_POLL'])
+
+single_flight = SingleFlight()
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from sqlalchemy import event
+from app.extensions import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: the writer lock only serializes threads in one process
+    fcntl = None
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+class _WriterLock:
+    """Serializes write transactions: between threads, and between processes via a lock file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+        self._pid = None
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=timeout):
+            return False
+        if fcntl is None:
+            return True
+        # Only one thread per process gets here, so processes queue on the file one writer each
+        if self._pid != os.getpid():
+            self._file = open(self.path, 'a')
+            self._pid = os.getpid()
+        while True:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self._thread_lock.release()
+                    return False
+                time.sleep(0.001)
+
+    def release(self):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+class SQLiteProfile:
+    """Production settings for SQLite databases.
+
+    With SQLITE_PROFILE on, every new connection to a SQLite file gets WAL
+    journaling (readers no longer block the writer), synchronous=NORMAL
+    (safe with WAL, without an fsync per commit), a busy timeout, a memory
+    map and a larger page cache.
+
+    Transactions begin deferred, so reads, and the AI calls, password
+    checks and streams that run between them, never hold the write lock.
+    At a transaction's first write the read snapshot is ended and a new
+    transaction begins with BEGIN IMMEDIATE, which waits in the busy
+    handler for the lock. Upgrading the read transaction instead would
+    fail at once with "database is locked" if another connection had
+    committed since it began. Reads before the first write therefore see
+    committed data, as under PostgreSQL's READ COMMITTED, rather than a
+    snapshot. With SQLITE_SINGLE_WRITER the writes also queue on a lock
+    file shared by all worker processes, so writers take turns rather
+    than poll SQLite's busy handler.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Attach the settings to the app's SQLite engines; call after ``db.init_app``."""
+        app.config.setdefault('SQLITE_PROFILE', os.environ.get('SQLITE_PROFILE', '0') == '1')
+        app.config.setdefault('SQLITE_BUSY_TIMEOUT', int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)))  # Milliseconds
+        app.config.setdefault('SQLITE_MMAP_SIZE', int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)))  # Bytes
+        app.config.setdefault('SQLITE_CACHE_SIZE', int(os.environ.get('SQLITE_CACHE_SIZE', 64 * 1024)))  # KiB
+        app.config.setdefault('SQLITE_SINGLE_WRITER', os.environ.get('SQLITE_SINGLE_WRITER', '0') == '1')
+        app.extensions['sqlite_profile'] = self
+        if not app.config['SQLITE_PROFILE']:
+            return
+        with app.app_context():
+            for engine in db.engines.values():
+                if engine.dialect.name == 'sqlite':
+                    self._configure(engine, dict(app.config))
+
+    def _configure(self, engine, config):
+        database = engine.url.database
+        on_disk = database not in (None, '', ':memory:') and not database.startswith('file::memory:')
+        pragmas = [
+            f"busy_timeout = {config['SQLITE_BUSY_TIMEOUT']}",
+            f"cache_size = {-config['SQLITE_CACHE_SIZE']}",  # Negative: in KiB rather than pages
+        ]
+        if on_disk:
+            pragmas = ['journal_mode = WAL', 'synchronous = NORMAL', f"mmap_size = {config['SQLITE_MMAP_SIZE']}"] + pragmas
+        writer_lock = _WriterLock(database + '.writer-lock') if on_disk and config['SQLITE_SINGLE_WRITER'] else None
+        lock_timeout = config['SQLITE_BUSY_TIMEOUT'] / 1000
+
+        @event.listens_for(engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            # Let the 'begin' listener below issue BEGIN, instead of the driver
+            dbapi_connection.isolation_level = None
+            for pragma in pragmas:
+                dbapi_connection.execute(f'PRAGMA {pragma}')
+
+        @event.listens_for(engine, 'begin')
+        def on_begin(conn):
+            conn.connection.dbapi_connection.execute('BEGIN')
+            conn.info['sqlite_writing'] = False
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            if conn.info.get('sqlite_writing', True) or not statement.lstrip().upper().startswith(WRITE_STATEMENTS):
+                return
+            conn.info['sqlite_writing'] = True
+            if writer_lock is not None and writer_lock.acquire(lock_timeout):
+                conn.info['sqlite_writer_lock'] = writer_lock
+            dbapi_connection = conn.connection.dbapi_connection
+            try:
+                dbapi_connection.execute('COMMIT')
+            except sqlite3.OperationalError:
+                # A read is still being stepped through; let SQLite upgrade in place
+                return
+            dbapi_connection.execute('BEGIN IMMEDIATE')
+
+        def release(conn):
+            lock = conn.info.pop('sqlite_writer_lock', None)
+            if lock is not None:
+                lock.release()
+
+        event.listen(engine, 'commit', release)
+        event.listen(engine, 'rollback', release)
+
+        @event.listens_for(engine, 'checkin')
+        def on_checkin(dbapi_connection, connection_record):
+            # A connection returned mid-transaction must not keep the lock
+            lock = connection_record.info.pop('sqlite_writer_lock', None)
+            if lock is not None:
+                lock.release()
+
+sqlite_profile = SQLiteProfile()
@@ -0,0 +1,60 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+from app.models.study_models import ContentVersion
+
+# Every write to courses, notes, practice questions or todos bumps the
+# version of the scopes it changes, in the same transaction as the write.
+# GET endpoints derive their ETag from the version, so a conditional
+# request is answered with one primary-key lookup and no row queries.
+# Scopes are never deleted, so a version, and the tags made from it, is
+# never handed out twice.
+
+versions_table = ContentVersion.__table__
+
+# Scope names; the {placeholders} are filled from the user id and URL arguments
+COURSES = 'courses:{user_id}'  # A user's course list
+TODOS = 'todos:{user_id}'  # A user's todos
+COURSE = 'course:{course_id}'  # One course, its notes and its practice questions
+
+def courses_scope(user_id):
+    return COURSES.format(user_id=user_id)
+
+def todos_scope(user_id):
+    return TODOS.format(user_id=user_id)
+
+def course_scope(course_id):
+    return COURSE.format(course_id=course_id)
+
+def bump(*scopes):
+    """Increment the version of each scope; the caller commits."""
+    db.session.execute(_bump_upsert(), [{'scope': scope} for scope in scopes])
+
+def current(scope):
+    """Return the scope's version, or None if it has never been recorded."""
+    return db.session.execute(
+        select(versions_table.c.version).where(versions_table.c.scope == scope)
+    ).scalar()
+
+def ensure(scope):
+    """Record a missing scope at version 0; return True if this call recorded it."""
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(versions_table).prefix_with('IGNORE')
+    else:
+        statement = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(versions_table).on_conflict_do_nothing()
+    return db.session.execute(statement, {'scope': scope, 'version': 0}).rowcount == 1
+
+def _bump_upsert():
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(versions_table).values(version=1)
+        return statement.on_duplicate_key_update(version=versions_table.c.version + 1)
+    # SQLite and PostgreSQL share the ON CONFLICT syntax
+    statement = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(versions_table).values(version=1)
+    return statement.on_conflict_do_update(
+        index_elements=['scope'],
+        set_={'version': versions_table.c.version + 1}
+    )
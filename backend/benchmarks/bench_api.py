@@ -0,0 +1,291 @@
+"""Load-test the main API endpoints offline and record throughput and latency.
+
+Seeds users x courses x notes x questions x study days into a temporary
+SQLite file, then drives each scenario with --concurrency threads in two
+ways:
+
+- wsgi: the Flask test client, measuring the app without a network stack
+- server: a threaded Werkzeug server on a local port, over real HTTP
+
+AI endpoints use the stub provider (--ai-latency seconds per call models a
+real one) and run jobs inline. Results are written as JSON; pass a previous
+file to --compare to print the change per scenario.
+
+    python benchmarks/bench_api.py [--users 20] [--courses 5] [--notes 50] [--questions 20] [--days 60]
+        [--requests 500] [--concurrency 8] [--modes wsgi,server] [--output results.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOPICS = ['Cell biology', 'Photosynthesis', 'The French Revolution', 'Derivatives', 'Enzymes', 'Plate tectonics']
+
+# name -> (method, path template, body factory)
+SCENARIOS = {
+    'courses': ('GET', '/api/courses/', None),
+    'notes': ('GET', '/api/course/{course_id}/notes', None),
+    'weekly_progress': ('GET', '/api/progress/weekly-progress', None),
+    'generate_notes': ('POST', '/api/course/{course_id}/generate-notes',
+                       lambda rng: {'topic': rng.choice(TOPICS), 'detail_level': 'brief', 'refresh': True}),
+    'generate_questions_batch': ('POST', '/api/course/{course_id}/generate-questions/batch',
+                                 lambda rng: {'topics': rng.sample(TOPICS, 3), 'count': 3, 'refresh': True}),
+}
+
+def seed(db, args):
+    from sqlalchemy import insert
+    from app.models.user import User
+    from app.models.study_models import Course, Note, PracticeQuestion
+    from app.models.progress_models import DailyStudy, StudyProgress, StudySession
+    from app.rollups import rebuild_rollup
+
+    rng = random.Random(11)
+    today = date.today()
+    users = []
+    for u in range(args.users):
+        user = User(username=f'loaduser{u}', email=f'loaduser{u}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        courses = [Course(title=f'Course {c}', description='Seeded course', user_id=user.id) for c in range(args.courses)]
+        db.session.add_all(courses)
+        db.session.flush()
+
+        db.session.execute(insert(Note), [
+            {'title': f'Note {n}', 'content': f'{rng.choice(TOPICS)} notes. ' * 40, 'course_id': course.id}
+            for course in courses for n in range(args.notes)
+        ])
+        question_rows = [
+            {'question': f'Question {q} on {rng.choice(TOPICS)}?', 'answer': 'An answer.', 'course_id': course.id}
+            for course in courses for q in range(args.questions)
+        ]
+        if question_rows:
+            db.session.execute(insert(PracticeQuestion), question_rows)
+            questions = db.session.query(PracticeQuestion.id, PracticeQuestion.course_id).join(Course).filter(Course.user_id == user.id).all()
+            db.session.execute(insert(StudyProgress), [
+                {'user_id': user.id, 'course_id': course_id, 'question_id': question_id, 'confidence_level': rng.randint(1, 3)}
+                for question_id, course_id in questions if rng.random() < 0.5
+            ] or [{'user_id': user.id, 'course_id': courses[0].id, 'question_id': questions[0][0], 'confidence_level': 2}])
+
+        # Study on most days, one session per study day
+        study_days = [today - timedelta(days=day) for day in range(args.days) if rng.random() < 0.8]
+        if study_days:
+            db.session.execute(insert(DailyStudy), [
+                {'user_id': user.id, 'study_date': day, 'total_minutes': rng.randint(15, 120)} for day in study_days
+            ])
+            db.session.execute(insert(StudySession), [
+                {'user_id': user.id, 'course_id': rng.choice(courses).id,
+                 'start_time': datetime.combine(day, datetime.min.time()) + timedelta(hours=18),
+                 'end_time': datetime.combine(day, datetime.min.time()) + timedelta(hours=19),
+                 'duration_minutes': 60}
+                for day in study_days
+            ])
+        # Build the rollup up front, as ending a session would have
+        rebuild_rollup(user.id, today)
+        db.session.commit()
+        users.append((user.id, [course.id for course in courses]))
+    return users
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(mode, scenario, concurrency, timings, errors, elapsed):
+    timings.sort()
+    count = len(timings)
+    return {
+        'mode': mode,
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'requests': count,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(count / elapsed, 1) if elapsed > 0 else None,
+        'mean_ms': round(sum(timings) / count, 2) if count else None,
+        'p50_ms': round(percentile(timings, 0.50), 2) if count else None,
+        'p90_ms': round(percentile(timings, 0.90), 2) if count else None,
+        'p95_ms': round(percentile(timings, 0.95), 2) if count else None,
+        'p99_ms': round(percentile(timings, 0.99), 2) if count else None,
+    }
+
+def plan(scenario, users, tokens, count, seed_value):
+    """Build the (method, path, headers, body) list for one scenario run."""
+    method, template, body = SCENARIOS[scenario]
+    rng = random.Random(seed_value)
+    requests = []
+    for _ in range(count):
+        user_id, course_ids = rng.choice(users)
+        path = template.format(course_id=rng.choice(course_ids))
+        headers = {'Authorization': f'Bearer {tokens[user_id]}'}
+        requests.append((method, path, headers, body(rng) if body else None))
+    return requests
+
+def run(send, requests, concurrency):
+    """Send the requests from concurrency threads; return timings, errors and wall time."""
+    timings = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def worker(request):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = send(local, *request)
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            timings.append(elapsed_ms)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, requests))
+    return timings, errors, time.perf_counter() - started
+
+def wsgi_sender(app):
+    def send(local, method, path, headers, body):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        res = local.client.open(path, method=method, headers=headers, json=body)
+        return res.status_code < 400
+    return send
+
+def server_sender(base_url):
+    import requests as http
+
+    def send(local, method, path, headers, body):
+        if not hasattr(local, 'session'):
+            local.session = http.Session()
+        res = local.session.request(method, base_url + path, headers=headers, json=body, timeout=60)
+        return res.status_code < 400
+    return send
+
+def start_server(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, as behind a real server
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_file):
+    with open(baseline_file) as f:
+        baseline = {(r['mode'], r['scenario']): r for r in json.load(f)['results']}
+    print(f"\nChange against {baseline_file}:")
+    print(f"{'mode':>7} {'scenario':>25} {'req/s':>9} {'p95':>9}")
+    for result in results:
+        old = baseline.get((result['mode'], result['scenario']))
+        if not old or not old['requests_per_second'] or not old['p95_ms']:
+            continue
+        rps = (result['requests_per_second'] / old['requests_per_second'] - 1) * 100
+        p95 = (result['p95_ms'] / old['p95_ms'] - 1) * 100
+        print(f"{result['mode']:>7} {result['scenario']:>25} {rps:>+8.1f}% {p95:>+8.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--courses', type=int, default=5, help='courses per user')
+    parser.add_argument('--notes', type=int, default=50, help='notes per course')
+    parser.add_argument('--questions', type=int, default=20, help='practice questions per course')
+    parser.add_argument('--days', type=int, default=60, help='days of study history per user')
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario and mode')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--modes', default='wsgi,server', help='comma-separated: wsgi, server')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenario names')
+    parser.add_argument('--ai-latency', type=float, default=0.0, help='stub provider seconds per call')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+    os.environ['AI_PROVIDER'] = 'stub'
+    os.environ['AI_STUB_LATENCY'] = str(args.ai_latency)
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config['JOBS_EAGER'] = True
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        users = seed(db, args)
+        print(f'Seeded {args.users} users x {args.courses} courses x {args.notes} notes x '
+              f'{args.questions} questions x {args.days} days in {time.perf_counter() - started:.1f}s')
+        tokens = {user_id: create_access_token(identity=user_id) for user_id, _ in users}
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    senders = {}
+    server = None
+    for mode in args.modes.split(','):
+        if mode == 'wsgi':
+            senders[mode] = wsgi_sender(app)
+        elif mode == 'server':
+            server, base_url = start_server(app)
+            senders[mode] = server_sender(base_url)
+        else:
+            parser.error(f'unknown mode {mode}')
+
+    results = []
+    print(f"{'mode':>7} {'scenario':>25} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    try:
+        for mode, send in senders.items():
+            for index, scenario in enumerate(scenarios):
+                # A short warm-up, then the measured run
+                run(send, plan(scenario, users, tokens, min(20, args.requests), index), args.concurrency)
+                timings, errors, elapsed = run(send, plan(scenario, users, tokens, args.requests, 100 + index), args.concurrency)
+                result = summarize(mode, scenario, args.concurrency, timings, errors, elapsed)
+                results.append(result)
+                print(f"{mode:>7} {scenario:>25} {result['requests_per_second']:>9} {result['p50_ms']:>8} "
+                      f"{result['p95_ms']:>8} {result['p99_ms']:>8} {errors:>7}")
+    finally:
+        if server is not None:
+            server.shutdown()
+        os.unlink(db_file.name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'benchmark': 'api',
+                'commit': git_commit(),
+                'created_at': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+                'results': results
+            }, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark confidence-rating throughput: legacy endpoint, upsert, and batch.
+
+Seeds one user with a course of practice questions in a temporary SQLite
+file and records ratings through the WSGI test client three ways:
+
+- legacy: the previous handler (ownership query, read, then write), mounted
+  on a spare route for comparison
+- upsert: POST /api/question-progress, one INSERT ... ON CONFLICT per rating
+- batch: POST /api/question-progress/batch, --batch-size ratings per statement
+
+    python benchmarks/bench_confidence.py [--ratings 2000] [--batch-size 50] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUESTIONS = 500
+
+def add_legacy_route(app):
+    from flask import request, jsonify
+    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from app.extensions import db
+    from app.models.study_models import Course, PracticeQuestion
+    from app.models.progress_models import StudyProgress
+
+    @app.route('/bench/legacy-question-progress', methods=['POST'])
+    @jwt_required()
+    def legacy_record_question_progress():
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+        question = db.session.query(PracticeQuestion).join(Course).filter(
+            PracticeQuestion.id == data['question_id'],
+            Course.user_id == current_user_id
+        ).first()
+        if not question:
+            return jsonify({"error": "Question not found"}), 404
+        progress = StudyProgress.query.filter_by(
+            user_id=current_user_id,
+            question_id=data['question_id']
+        ).first()
+        if progress:
+            progress.confidence_level = data['confidence_level']
+        else:
+            db.session.add(StudyProgress(
+                user_id=current_user_id,
+                course_id=question.course_id,
+                question_id=data['question_id'],
+                confidence_level=data['confidence_level']
+            ))
+        db.session.commit()
+        return jsonify({"message": "Progress recorded successfully"}), 200
+
+def seed(db):
+    from app.models.user import User
+    from app.models.study_models import Course, PracticeQuestion
+
+    user = User(username='rater', email='rater@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    course = Course(title='Flashcards', user_id=user.id)
+    db.session.add(course)
+    db.session.flush()
+    questions = [PracticeQuestion(question=f'Q{i}?', answer='A', course_id=course.id) for i in range(QUESTIONS)]
+    db.session.add_all(questions)
+    db.session.commit()
+    return user.id, [question.id for question in questions]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--ratings', type=int, default=2000, help='ratings recorded per mode')
+    parser.add_argument('--batch-size', type=int, default=50, help='ratings per batch request')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+    from app.models.progress_models import StudyProgress
+
+    app = create_app()
+    add_legacy_route(app)
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        user_id, question_ids = seed(db)
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    rng = random.Random(7)
+    ratings = [
+        {'question_id': rng.choice(question_ids), 'confidence_level': rng.randint(1, 3)}
+        for _ in range(args.ratings)
+    ]
+
+    def run_single(url):
+        for rating in ratings:
+            client.post(url, headers=headers, json=rating)
+
+    def run_batch():
+        for start in range(0, len(ratings), args.batch_size):
+            client.post('/api/question-progress/batch', headers=headers, json={'ratings': ratings[start:start + args.batch_size]})
+
+    modes = [
+        ('legacy', lambda: run_single('/bench/legacy-question-progress')),
+        ('upsert', lambda: run_single('/api/question-progress')),
+        (f'batch_{args.batch_size}', run_batch)
+    ]
+
+    results = []
+    print(f"{'mode':>10} {'ratings/s':>10}")
+    for name, run in modes:
+        with app.app_context():
+            StudyProgress.query.delete()
+            db.session.commit()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            rows = StudyProgress.query.count()
+        result = {'mode': name, 'ratings': args.ratings, 'seconds': round(elapsed, 3),
+                  'ratings_per_second': round(args.ratings / elapsed, 1), 'rows': rows}
+        results.append(result)
+        print(f"{name:>10} {result['ratings_per_second']:>10}")
+
+    os.unlink(db_file.name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'confidence', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark peak memory of /api/courses/<id>/export against course size.
+
+Each size runs in a fresh process so peak RSS (ru_maxrss) belongs to that
+run alone. The same rows are also loaded the old way, as ORM objects built
+into one list before serializing, for comparison. Streaming export should
+keep peak RSS roughly flat as the row count grows.
+
+    python benchmarks/bench_course_export.py [--rows 5000 50000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONTENT = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 20
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def seed_course(db, rows):
+    from sqlalchemy import insert
+    from app.models.user import User
+    from app.models.study_models import Course, Note, PracticeQuestion
+
+    user = User(username='exporter', email='exporter@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    course = Course(title='Big course', user_id=user.id)
+    db.session.add(course)
+    db.session.commit()
+
+    # Half notes, half questions, inserted in batches
+    for start in range(0, rows // 2, 5000):
+        count = min(5000, rows // 2 - start)
+        db.session.execute(insert(Note), [
+            {'title': f'Note {start + i}', 'content': CONTENT, 'course_id': course.id}
+            for i in range(count)
+        ])
+        db.session.execute(insert(PracticeQuestion), [
+            {'question': f'Question {start + i}?', 'answer': CONTENT, 'course_id': course.id}
+            for i in range(count)
+        ])
+        db.session.commit()
+    return user.id, course.id
+
+def run_single(rows, mode):
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+    from app.models.study_models import Note, PracticeQuestion
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user_id, course_id = seed_course(db, rows)
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+        db.session.remove()
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    exported_bytes = 0
+
+    if mode == 'stream':
+        res = app.test_client().get(f'/api/courses/{course_id}/export', headers=headers, buffered=False)
+        for chunk in res.response:
+            exported_bytes += len(chunk)
+        res.close()
+    else:
+        # What a client gets today from get_notes + get_questions without paging
+        with app.app_context():
+            notes = Note.query.filter_by(course_id=course_id).all()
+            questions = PracticeQuestion.query.filter_by(course_id=course_id).all()
+            payload = json.dumps({
+                'notes': [{'id': n.id, 'title': n.title, 'content': n.content, 'created_at': n.created_at.isoformat()} for n in notes],
+                'questions': [{'id': q.id, 'question': q.question, 'answer': q.answer, 'created_at': q.created_at.isoformat()} for q in questions]
+            })
+            exported_bytes = len(payload)
+
+    elapsed = time.perf_counter() - started
+    os.unlink(db_file.name)
+    return {
+        'rows': rows,
+        'mode': mode,
+        'seconds': round(elapsed, 2),
+        'megabytes': round(exported_bytes / (1024 * 1024), 1),
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak_rss_mb(),
+        'growth_mb': round(peak_rss_mb() - baseline, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 50000], help='rows per course')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--single', nargs=2, metavar=('ROWS', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(int(args.single[0]), args.single[1])))
+        return
+
+    results = []
+    print(f"{'rows':>8} {'mode':>12} {'seconds':>8} {'MB out':>8} {'RSS growth MB':>14}")
+    for rows in args.rows:
+        for mode in ('stream', 'materialize'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--single', str(rows), mode],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{rows:>8} {mode:>12} {result['seconds']:>8} {result['megabytes']:>8} {result['growth_mb']:>14}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'course_export', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark login throughput with password hashing inline and in the process pool.
+
+Seeds --users users into a temporary SQLite file and sends POST
+/api/auth/login from --concurrency threads through the WSGI test client,
+once with PASSWORD_HASH_WORKERS=0 (hashing on the request thread, as
+before) and once with the worker pool. Reports logins per second overall
+and per core, and latency percentiles.
+
+    python benchmarks/bench_login.py [--users 50] [--requests 400] [--concurrency 8]
+        [--workers N] [--iterations 260000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'correct horse battery staple'
+
+def time_logins(app, usernames, requests, concurrency):
+    local = threading.local()
+    timings = []
+    errors = 0
+    lock = threading.Lock()
+
+    def login(index):
+        nonlocal errors
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        started = time.perf_counter()
+        res = local.client.post('/api/auth/login', json={'username': usernames[index % len(usernames)], 'password': PASSWORD})
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            timings.append(elapsed_ms)
+            if res.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(requests)))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(requests / elapsed, 1),
+        'logins_per_second_per_core': round(requests / elapsed / (os.cpu_count() or 1), 1),
+        'p50_ms': round(timings[len(timings) // 2], 2),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=400, help='logins per measurement')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='hashing processes in the pool run')
+    parser.add_argument('--iterations', type=int, default=260000, help='PBKDF2 iterations')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.user import User
+    from app.passwords import password_hasher
+
+    app = create_app()
+    app.config['PASSWORD_HASH_ITERATIONS'] = args.iterations
+    app.config['PASSWORD_HASH_WORKERS'] = 0
+    with app.app_context():
+        db.create_all()
+        # Every user shares one hash; verifying costs the same either way
+        password_hash = password_hasher.hash(PASSWORD)
+        usernames = [f'loginuser{i}' for i in range(args.users)]
+        db.session.add_all(User(username=name, email=f'{name}@example.com', password_hash=password_hash) for name in usernames)
+        db.session.commit()
+
+    results = {'cores': os.cpu_count(), 'concurrency': args.concurrency, 'iterations': args.iterations}
+    try:
+        for label, workers in (('inline', 0), ('pool', args.workers)):
+            app.config['PASSWORD_HASH_WORKERS'] = workers
+            time_logins(app, usernames, min(20, args.requests), args.concurrency)  # Warm up (and start the pool)
+            result = time_logins(app, usernames, args.requests, args.concurrency)
+            result['workers'] = workers
+            results[label] = result
+            print(f"{label:>7}: {result['logins_per_second']:>7} logins/s "
+                  f"({result['logins_per_second_per_core']} per core), "
+                  f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, {result['errors']} errors")
+    finally:
+        password_hasher.shutdown()
+        os.unlink(db_file.name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'login', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark the per-request overhead of metrics collection.
+
+Measures it two ways against the in-memory SQLite app:
+
+- hooks: the metrics before/after/teardown hooks called directly inside a
+  request context, isolating the collection cost
+- end to end: GET /api/test through the WSGI test client with
+  METRICS_ENABLED on and off; the difference is the overhead as a client
+  sees it (noisier, since a request costs far more than the hooks)
+
+The target is under 50 microseconds per request.
+
+    python benchmarks/bench_metrics.py [--requests 20000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TARGET_US = 50
+
+def make_app(enabled):
+    os.environ['METRICS_ENABLED'] = '1' if enabled else '0'
+    # The engine is made in create_app(), so the URL must be set before it
+    os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+    # No tables here, so no job workers to poll them
+    os.environ['JOB_AUTOSTART'] = '0'
+    from app import create_app
+    return create_app()
+
+def time_hooks(app, requests):
+    from app.metrics import metrics
+    with app.test_request_context('/api/test'):
+        response = app.make_response('ok')
+        started = time.perf_counter()
+        for _ in range(requests):
+            metrics._before_request()
+            metrics._after_request(response)
+            metrics._teardown_request(None)
+        return (time.perf_counter() - started) / requests
+
+def time_requests(apps, requests, rounds=10):
+    """Return the best and median seconds per request for each app.
+
+    Rounds alternate between the apps so drift affects them equally.
+    """
+    clients = [app.test_client() for app in apps]
+    for client in clients:
+        for _ in range(200):
+            client.get('/api/test')
+    per_round = requests // rounds
+    timings = [[] for _ in clients]
+    for _ in range(rounds):
+        for client, samples in zip(clients, timings):
+            started = time.perf_counter()
+            for _ in range(per_round):
+                client.get('/api/test')
+            samples.append((time.perf_counter() - started) / per_round)
+    return [(min(samples), statistics.median(samples)) for samples in timings]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=20000, help='requests per measurement')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    enabled_app = make_app(True)
+    disabled_app = make_app(False)
+
+    hooks_us = time_hooks(enabled_app, args.requests) * 1e6
+    (on_best, on_median), (off_best, off_median) = time_requests([enabled_app, disabled_app], args.requests)
+    delta_us = (on_best - off_best) * 1e6
+
+    results = {
+        'hooks_us_per_request': round(hooks_us, 2),
+        'request_us_metrics_on': round(on_best * 1e6, 1),
+        'request_us_metrics_off': round(off_best * 1e6, 1),
+        'request_median_us_metrics_on': round(on_median * 1e6, 1),
+        'request_median_us_metrics_off': round(off_median * 1e6, 1),
+        'end_to_end_overhead_us': round(delta_us, 2),
+        'target_us': TARGET_US,
+        'within_target': hooks_us < TARGET_US
+    }
+    print(f"hooks:       {results['hooks_us_per_request']:>8} us/request")
+    print(f"end to end:  {results['end_to_end_overhead_us']:>8} us/request "
+          f"({results['request_us_metrics_off']} -> {results['request_us_metrics_on']} us)")
+    print(f"target:      {TARGET_US:>8} us/request ({'met' if results['within_target'] else 'missed'})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'metrics', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark /api/search latency over a large corpus for each search backend.
+
+Seeds one user with notes and practice questions (100k documents by
+default, Zipf-distributed filler words with the query topics mixed in) in a
+temporary SQLite file, then times a fixed set of queries
+through the WSGI test client, with and without course scoping.
+
+    python benchmarks/bench_search.py [--documents 100000] [--repeat 20] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COURSES = 20
+QUERIES = ['mitochondria', 'photosynthesis chloroplast', 'revolution', 'integral deriv', 'enzyme catalyst']
+TOPIC_WORDS = sorted({word for query in QUERIES for word in query.split()} | {'derivative'})
+FILLER_WORDS = [f'word{i}' for i in range(20000)]
+TOPIC_RATE = 0.01  # Share of words drawn from the query topics
+
+def random_text(rng, words):
+    # Filler words follow a Zipf-like distribution, as in natural text
+    return ' '.join(
+        rng.choice(TOPIC_WORDS) if rng.random() < TOPIC_RATE
+        else FILLER_WORDS[min(int(rng.paretovariate(1.0)) - 1, len(FILLER_WORDS) - 1)]
+        for _ in range(words)
+    )
+
+def seed(db, documents):
+    from sqlalchemy import insert
+    from app.models.user import User
+    from app.models.study_models import Course, Note, PracticeQuestion
+
+    rng = random.Random(42)
+    user = User(username='searcher', email='searcher@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    courses = [Course(title=f'Course {i}', user_id=user.id) for i in range(COURSES)]
+    db.session.add_all(courses)
+    db.session.commit()
+
+    for start in range(0, documents // 2, 5000):
+        count = min(5000, documents // 2 - start)
+        db.session.execute(insert(Note), [
+            {'title': random_text(rng, 3), 'content': random_text(rng, 80), 'course_id': rng.choice(courses).id}
+            for _ in range(count)
+        ])
+        db.session.execute(insert(PracticeQuestion), [
+            {'question': random_text(rng, 10) + '?', 'answer': random_text(rng, 20), 'course_id': rng.choice(courses).id}
+            for _ in range(count)
+        ])
+        db.session.commit()
+    return user.id, courses[0].id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--documents', type=int, default=100000, help='notes plus questions to index')
+    parser.add_argument('--repeat', type=int, default=20, help='requests per query')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        user_id, course_id = seed(db, args.documents)
+        print(f'Seeded {args.documents} documents in {time.perf_counter() - started:.1f}s')
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    results = []
+    print(f"{'backend':>8} {'scope':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for backend in ('fts5', 'python'):
+        app.config['SEARCH_BACKEND'] = backend
+        for scope, params in (('all', {}), ('course', {'course_id': course_id})):
+            # Warm up (builds the in-process index for the python backend)
+            client.get('/api/search', headers=headers, query_string={'q': QUERIES[0], **params})
+            timings = []
+            for _ in range(args.repeat):
+                for query in QUERIES:
+                    started = time.perf_counter()
+                    res = client.get('/api/search', headers=headers, query_string={'q': query, **params})
+                    timings.append((time.perf_counter() - started) * 1000)
+                    assert res.status_code == 200
+            timings.sort()
+            result = {
+                'backend': backend,
+                'scope': scope,
+                'documents': args.documents,
+                'p50_ms': round(statistics.median(timings), 2),
+                'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 2)
+            }
+            results.append(result)
+            print(f"{backend:>8} {scope:>7} {result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+    os.unlink(db_file.name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'search', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark list-endpoint serialization at 10k rows: legacy versus serializers.
+
+Seeds one course with notes in a temporary SQLite file and fetches the
+whole list in one page through the WSGI test client:
+
+- legacy: the previous handler (ORM objects, hand-built dicts), mounted on
+  a spare route for comparison
+- serializers: GET /api/course/<id>/notes, column projection plus the
+  shared note serializer
+
+Each mode runs with the orjson provider (FAST_JSON) and with the standard
+json module.
+
+    python benchmarks/bench_serializers.py [--rows 10000] [--repeat 10] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def add_legacy_route(app):
+    from flask import jsonify
+    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from app.models.study_models import Course, Note
+
+    @app.route('/bench/legacy-notes/<int:course_id>')
+    @jwt_required()
+    def legacy_get_notes(course_id):
+        current_user_id = get_jwt_identity()
+        course = Course.query.filter_by(id=course_id, user_id=current_user_id).first()
+        if not course:
+            return jsonify({"error": "Course not found"}), 404
+        notes = Note.query.filter_by(course_id=course_id).order_by(Note.created_at, Note.id).all()
+        result = []
+        for note in notes:
+            result.append({
+                'id': note.id,
+                'title': note.title,
+                'content': note.content,
+                'created_at': note.created_at.isoformat(),
+                'course_id': note.course_id
+            })
+        return jsonify({"items": result, "next_cursor": None}), 200
+
+def seed(db, rows):
+    from sqlalchemy import insert
+    from app.models.user import User
+    from app.models.study_models import Course, Note
+
+    user = User(username='reader', email='reader@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    course = Course(title='Big course', user_id=user.id)
+    db.session.add(course)
+    db.session.commit()
+    db.session.execute(insert(Note), [
+        {'title': f'Note {i}', 'content': f'Content of note {i}. ' * 20, 'course_id': course.id}
+        for i in range(rows)
+    ])
+    db.session.commit()
+    return user.id, course.id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=10000, help='notes in the listed course')
+    parser.add_argument('--repeat', type=int, default=10, help='requests per mode')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+    os.environ['MAX_PAGE_SIZE'] = str(args.rows)
+
+    from flask.json.provider import DefaultJSONProvider
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+    from app.json_provider import OrjsonProvider, orjson
+
+    app = create_app()
+    add_legacy_route(app)
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        user_id, course_id = seed(db, args.rows)
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    providers = [('json', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    else:
+        print('orjson is not installed; timing the json provider only')
+
+    modes = [
+        ('legacy', f'/bench/legacy-notes/{course_id}', {}),
+        ('serializers', f'/api/course/{course_id}/notes', {'limit': args.rows})
+    ]
+
+    results = []
+    print(f"{'mode':>12} {'encoder':>8} {'p50 ms':>8} {'rows/s':>10}")
+    for name, url, params in modes:
+        for encoder, provider in providers:
+            app.json = provider
+            res = client.get(url, headers=headers, query_string=params)
+            assert res.status_code == 200 and len(res.get_json()['items']) == args.rows
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                client.get(url, headers=headers, query_string=params)
+                timings.append(time.perf_counter() - started)
+            p50 = statistics.median(timings)
+            result = {'mode': name, 'encoder': encoder, 'rows': args.rows,
+                      'p50_ms': round(p50 * 1000, 2), 'rows_per_second': round(args.rows / p50)}
+            results.append(result)
+            print(f"{name:>12} {encoder:>8} {result['p50_ms']:>8} {result['rows_per_second']:>10}")
+
+    os.unlink(db_file.name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'serializers', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Benchmark SQLite write throughput under contention from several worker processes.
+
+Forks --workers processes, each creating its own app and engine as a
+gunicorn worker would, and runs --threads threads in each. Every thread
+acts for its own user and repeatedly starts and ends a study session,
+updates a todo (three write requests), logs in and streams a set of AI
+notes from the stub provider through the WSGI test client. Logins and
+generations are where a transaction that holds the write lock too long
+shows up: the password check and the completion, whose cache entry is
+written on a second connection, run while the request's transaction is
+open. The same load runs against a fresh database file with:
+
+- default: the driver's defaults (rollback journal, deferred BEGIN)
+- profile: SQLITE_PROFILE (WAL, tuned pragmas, write lock at the first write)
+- single-writer: the profile plus SQLITE_SINGLE_WRITER
+
+Reports requests per second and how many of each kind failed, mostly with
+"database is locked".
+
+    python benchmarks/bench_sqlite.py [--workers 4] [--threads 4] [--iterations 25] [--ai-latency 0.05] [--output results.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROFILES = {
+    'default': {'SQLITE_PROFILE': '0', 'SQLITE_SINGLE_WRITER': '0'},
+    'profile': {'SQLITE_PROFILE': '1', 'SQLITE_SINGLE_WRITER': '0'},
+    'single-writer': {'SQLITE_PROFILE': '1', 'SQLITE_SINGLE_WRITER': '1'},
+}
+
+PASSWORD = 'benchmark-password'
+
+def seed(users):
+    """Create one user with a todo and a course per thread; return (username, token, todo id, course id) tuples."""
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+    from app.models.user import User
+    from app.models.progress_models import Todo
+    from app.models.study_models import Course
+    from app.passwords import password_hasher
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        # Every account shares one hash, so seeding costs a single PBKDF2 run
+        password_hash = password_hasher.hash(PASSWORD)
+        accounts = []
+        for i in range(users):
+            user = User(username=f'writer{i}', email=f'writer{i}@example.com', password_hash=password_hash)
+            db.session.add(user)
+            db.session.flush()
+            todo = Todo(text='Revise chapter 1', user_id=user.id)
+            course = Course(title=f'Course {i}', user_id=user.id)
+            db.session.add_all([todo, course])
+            db.session.flush()
+            accounts.append((user.username, create_access_token(identity=user.id), todo.id, course.id))
+        db.session.commit()
+        for engine in db.engines.values():
+            engine.dispose()
+    return accounts
+
+def worker(accounts, iterations, results):
+    """Run one worker process: a thread per account, five requests per iteration."""
+    from app import create_app
+    app = create_app()
+    counts = {'ok': 0, 'write_errors': 0, 'login_errors': 0, 'ai_errors': 0}
+    lock = threading.Lock()
+
+    def run(username, token, todo_id, course_id):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        local = dict.fromkeys(counts, 0)
+
+        def record(kind, ok):
+            local['ok' if ok else f'{kind}_errors'] += 1
+
+        for i in range(iterations):
+            res = client.post('/api/progress/study-session/start', json={}, headers=headers)
+            record('write', res.status_code < 400)
+            if res.status_code == 201:
+                session_id = res.get_json()['session_id']
+                res = client.post(f'/api/progress/study-session/{session_id}/end', headers=headers)
+                record('write', res.status_code < 400)
+            res = client.put(f'/api/progress/todos/{todo_id}', json={'completed': i % 2 == 0}, headers=headers)
+            record('write', res.status_code < 400)
+
+            res = client.post('/api/auth/login', json={'username': username, 'password': PASSWORD})
+            record('login', res.status_code == 200)
+
+            # A new topic each time, so every generation misses the cache and writes an entry
+            res = client.post(f'/api/course/{course_id}/generate-notes/stream',
+                              json={'topic': f'{username} topic {i}'}, headers=headers)
+            body = res.get_data(as_text=True)
+            record('ai', res.status_code == 200 and 'event: done' in body)
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    threads = [threading.Thread(target=run, args=account) for account in accounts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(counts)
+
+def run_profile(name, args):
+    directory = tempfile.mkdtemp()
+    os.environ.update(PROFILES[name])
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'app.db')}"
+    try:
+        accounts = seed(args.workers * args.threads)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(accounts[w * args.threads:(w + 1) * args.threads], args.iterations, results))
+            for w in range(args.workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        counts = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(directory)
+
+    totals = {key: sum(count[key] for count in counts) for key in counts[0]}
+    errors = totals['write_errors'] + totals['login_errors'] + totals['ai_errors']
+    return {
+        'profile': name,
+        'workers': args.workers,
+        'threads': args.threads,
+        'requests': totals['ok'] + errors,
+        'errors': errors,
+        'write_errors': totals['write_errors'],
+        'login_errors': totals['login_errors'],
+        'ai_errors': totals['ai_errors'],
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(totals['ok'] / elapsed, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='threads per worker')
+    parser.add_argument('--iterations', type=int, default=25, help='session start/end, todo update, login and generation rounds per thread')
+    parser.add_argument('--ai-latency', type=float, default=0.05, help='seconds the stub provider takes per completion')
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='comma-separated: ' + ', '.join(PROFILES))
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    # Passwords are hashed inline in the request thread, and no job workers run
+    os.environ.update({
+        'PASSWORD_HASH_WORKERS': '0',
+        'JOB_AUTOSTART': '0',
+        'AI_PROVIDER': 'stub',
+        'AI_STUB_LATENCY': str(args.ai_latency)
+    })
+
+    results = []
+    print(f"{'profile':>14} {'requests/s':>11} {'requests':>9} {'write err':>10} {'login err':>10} {'ai err':>7} {'seconds':>8}")
+    for name in args.profiles.split(','):
+        result = run_profile(name, args)
+        results.append(result)
+        print(f"{name:>14} {result['requests_per_second']:>11} {result['requests']:>9} {result['write_errors']:>10} "
+              f"{result['login_errors']:>10} {result['ai_errors']:>7} {result['seconds']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'sqlite', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
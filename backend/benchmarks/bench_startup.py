@@ -0,0 +1,98 @@
+"""Benchmark cold start: interpreter, imports and create_app in a fresh process.
+
+Starts --runs fresh interpreters that import the app and call create_app,
+each under ``python -X importtime``, and reports the median of:
+
+- wall time for the whole process
+- cumulative import time of the ``app`` package
+- time spent in create_app after the imports
+- peak RSS of the process
+- modules loaded
+
+plus the slowest imports of the last run. tests/test_startup.py enforces
+the import budget.
+
+    python benchmarks/bench_startup.py [--runs 10] [--top 15] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = '''
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules)
+}))
+'''
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def run_once():
+    env = {**os.environ, 'DATABASE_URL': 'sqlite:///:memory:'}
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', SCRIPT],
+                             cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    timings = parse_importtime(process.stderr)
+    result['wall_ms'] = wall_ms
+    result['app_import_ms'] = timings['app'][1] / 1000
+    return result, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        result, timings = run_once()
+        runs.append(result)
+
+    results = {key: round(statistics.median(run[key] for run in runs), 1) for key in runs[0]}
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+
+    print(f"wall:           {results['wall_ms']:>8} ms")
+    print(f"app import:     {results['app_import_ms']:>8} ms (cumulative, -X importtime)")
+    print(f"create_app:     {results['create_app_ms']:>8} ms")
+    print(f"peak RSS:       {results['peak_rss_mb']:>8} MB")
+    print(f"modules:        {results['modules']:>8}")
+    print(f"\nSlowest imports (self time):")
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:>7.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'benchmark': 'startup',
+                'runs': args.runs,
+                'results': results,
+                'slowest_imports': [{'module': name, 'self_ms': self_us / 1000} for name, (self_us, _) in slowest]
+            }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
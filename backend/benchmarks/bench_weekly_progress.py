@@ -0,0 +1,122 @@
+"""Benchmark /api/weekly-progress against course count and streak length.
+
+Seeds one user per (courses, streak) combination in a temporary SQLite file
+and times the endpoint through the WSGI test client. Latency and query
+count should stay flat along both axes.
+
+    python benchmarks/bench_weekly_progress.py [--repeat 50] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COURSE_COUNTS = [1, 10, 100, 500]
+STREAK_LENGTHS = [1, 30, 200, 1000]
+QUESTIONS_PER_COURSE = 5
+
+def seed_user(db, username, course_count, streak_days):
+    from app.models.user import User
+    from app.models.study_models import Course, PracticeQuestion
+    from app.models.progress_models import StudyProgress, DailyStudy
+
+    user = User(username=username, email=f'{username}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+
+    for i in range(course_count):
+        course = Course(title=f'Course {i}', user_id=user.id)
+        db.session.add(course)
+        db.session.flush()
+        questions = [
+            PracticeQuestion(question=f'Q{j}?', answer='A', course_id=course.id)
+            for j in range(QUESTIONS_PER_COURSE)
+        ]
+        db.session.add_all(questions)
+        db.session.flush()
+        db.session.add_all([
+            StudyProgress(
+                user_id=user.id,
+                course_id=course.id,
+                question_id=question.id,
+                confidence_level=j % 3 + 1
+            )
+            for j, question in enumerate(questions)
+        ])
+
+    db.session.add_all([
+        DailyStudy(user_id=user.id, study_date=date.today() - timedelta(days=day), total_minutes=45)
+        for day in range(streak_days)
+    ])
+    db.session.commit()
+    return user.id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=50, help='requests per combination')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    client = app.test_client()
+    statements = []
+
+    with app.app_context():
+        db.create_all()
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(1))
+
+    results = []
+    print(f"{'courses':>8} {'streak':>7} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for course_count in COURSE_COUNTS:
+        for streak_days in STREAK_LENGTHS:
+            with app.app_context():
+                user_id = seed_user(db, f'user_{course_count}_{streak_days}', course_count, streak_days)
+                headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+            # Warm up, then count queries on a single request
+            client.get('/api/weekly-progress', headers=headers)
+            statements.clear()
+            res = client.get('/api/weekly-progress', headers=headers)
+            queries = len(statements)
+            assert res.get_json()['streak'] == streak_days
+
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                client.get('/api/weekly-progress', headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+
+            result = {
+                'courses': course_count,
+                'streak': streak_days,
+                'queries': queries,
+                'p50_ms': round(statistics.median(timings), 2),
+                'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 2)
+            }
+            results.append(result)
+            print(f"{course_count:>8} {streak_days:>7} {queries:>8} {result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+    os.unlink(db_file.name)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'weekly_progress', 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
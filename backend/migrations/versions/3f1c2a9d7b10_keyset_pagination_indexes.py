@@ -0,0 +1,33 @@
+"""Add (owner, created_at, id) indexes for keyset pagination
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_courses_user_created', 'courses', ['user_id', 'created_at', 'id']),
+    ('ix_notes_course_created', 'notes', ['course_id', 'created_at', 'id']),
+    ('ix_practice_questions_course_created', 'practice_questions', ['course_id', 'created_at', 'id']),
+    ('ix_todos_user_created', 'todos', ['user_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    # Databases created by db.create_all() may already have these
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, columns in INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,31 @@
+"""Make study_progress unique per (user_id, question_id)
+
+Revision ID: 8d4e6b2c1a57
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e6b2c1a57'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the newest row of any duplicates left by concurrent writes
+    op.execute(
+        "DELETE FROM study_progress WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MAX(id) AS id FROM study_progress GROUP BY user_id, question_id) AS keep)"
+    )
+    op.create_index(
+        'uq_study_progress_user_question', 'study_progress', ['user_id', 'question_id'],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('uq_study_progress_user_question', table_name='study_progress', if_exists=True)
@@ -0,0 +1,45 @@
+"""Give every practice question a review card, new cards having no due_at
+
+Revision ID: a7c3e1d95b28
+Revises: e5b8d3f2a064
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e1d95b28'
+down_revision = 'e5b8d3f2a064'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() makes the table in its current shape
+    if 'review_cards' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('review_cards') as batch_op:
+        batch_op.alter_column('due_at', existing_type=sa.DateTime(), nullable=True)
+    op.create_index('ix_review_cards_question', 'review_cards', ['question_id'], if_not_exists=True)
+
+    # Cards left behind by deleted questions, then a new card for every question without one
+    op.execute(
+        "DELETE FROM review_cards WHERE NOT EXISTS ("
+        "SELECT 1 FROM practice_questions q JOIN courses c ON c.id = q.course_id "
+        "WHERE q.id = review_cards.question_id AND c.user_id = review_cards.user_id)"
+    )
+    op.execute(
+        "INSERT INTO review_cards (user_id, course_id, question_id, ease, interval_days, repetitions, lapses, created_at) "
+        "SELECT c.user_id, q.course_id, q.id, 2.5, 0, 0, 0, CURRENT_TIMESTAMP "
+        "FROM practice_questions q JOIN courses c ON c.id = q.course_id "
+        "WHERE NOT EXISTS (SELECT 1 FROM review_cards r WHERE r.user_id = c.user_id AND r.question_id = q.id)"
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM review_cards WHERE due_at IS NULL")
+    op.drop_index('ix_review_cards_question', table_name='review_cards', if_exists=True)
+    with op.batch_alter_table('review_cards') as batch_op:
+        batch_op.alter_column('due_at', existing_type=sa.DateTime(), nullable=False)
@@ -0,0 +1,31 @@
+"""Stop SQLite reusing the ids of deleted courses
+
+Revision ID: c2a7f4e91b36
+Revises: 8d4e6b2c1a57
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a7f4e91b36'
+down_revision = '8d4e6b2c1a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other databases never reuse sequence values; SQLite needs AUTOINCREMENT,
+    # which it only accepts when the table is created
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('courses', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('courses', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
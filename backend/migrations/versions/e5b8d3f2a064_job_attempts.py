@@ -0,0 +1,33 @@
+"""Count the attempts of each generation job
+
+Revision ID: e5b8d3f2a064
+Revises: c2a7f4e91b36
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8d3f2a064'
+down_revision = 'c2a7f4e91b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() makes the table with the column, so only older
+    # generation_jobs tables need it added
+    inspector = sa.inspect(op.get_bind())
+    if 'generation_jobs' not in inspector.get_table_names():
+        return
+    if 'attempts' in {column['name'] for column in inspector.get_columns('generation_jobs')}:
+        return
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.drop_column('attempts')
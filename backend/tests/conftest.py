@@ -1,6 +1,10 @@
+import os
 import pytest
+from unittest import mock
 from app import create_app
 from app.extensions import db
+from app.passwords import password_hasher
+from app.query_stats import query_stats
 from app.models.user import User
 from app.models.study_models import Course, Note, PracticeQuestion
 from flask_jwt_extended import create_access_token
@@ -8,10 +12,10 @@ from flask_jwt_extended import create_access_token
 @pytest.fixture
 def app():
     """Create and configure a Flask app for testing."""
-    app = create_app()
+    with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+        app = create_app()
     app.config.update({
         'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
         'JWT_SECRET_KEY': 'test-key'
     })
     
@@ -21,11 +25,22 @@ def app():
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture(autouse=True)
+def password_hash_pool():
+    """Stop the password hashing worker processes after every test, unittest cases included."""
+    yield
+    password_hasher.shutdown()
+
 @pytest.fixture
 def client(app):
     """A test client for the app."""
     return app.test_client()
 
+@pytest.fixture
+def max_queries(app):
+    """Pin an endpoint's query count: ``with max_queries(3): client.get(...)``."""
+    return query_stats.assert_max_queries
+
 @pytest.fixture
 def runner(app):
     """A test CLI runner for the app."""
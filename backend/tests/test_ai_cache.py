@@ -0,0 +1,129 @@
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import create_app
+from app.extensions import db
+from app.ai_cache import completion_cache, fingerprint
+from app.ai_providers import Completion
+from app.ai_service import AIService
+from app.models.ai_models import CompletionCacheEntry
+
+def fake_completion(text):
+    """Build a provider response with the padding real completions have."""
+    return Completion(f"  {text}  ", 10, 2)
+
+class CompletionCacheTestCase(unittest.TestCase):
+    """Test case for the two-tier AI completion cache."""
+
+    def setUp(self):
+        """Set up the app and an empty cache."""
+        with patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'AI_PROVIDER': 'stub',
+            'AI_CACHE_MEMORY_SIZE': 2,
+            'AI_CACHE_MAX_ROWS': 3
+        })
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        CompletionCacheEntry.query.delete()
+        db.session.commit()
+        completion_cache.clear_memory()
+        self.baseline = completion_cache.stats()
+        self.ai_service = AIService()
+
+    def tearDown(self):
+        """Clean up after the test."""
+        completion_cache.clear_memory()
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def counter(self, name):
+        return completion_cache.stats()[name] - self.baseline[name]
+
+    def test_fingerprint_normalizes_whitespace(self):
+        """Test that prompt indentation does not change the key."""
+        key = fingerprint('m', 'Course: Bio\n    Topic: Cells', 500, 0.7)
+        self.assertEqual(key, fingerprint('m', '  Course:   Bio Topic: Cells\n', 500, 0.7))
+        self.assertNotEqual(key, fingerprint('m', 'Course: Bio Topic: Cells', 1000, 0.7))
+        self.assertNotEqual(key, fingerprint('other', 'Course: Bio Topic: Cells', 500, 0.7))
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_repeated_prompt_is_served_from_cache(self, mock_complete):
+        """Test that identical requests only reach the provider once."""
+        mock_complete.return_value = fake_completion("Cell notes")
+
+        first = self.ai_service.generate_notes('Biology', 'Cells', 'brief')
+        second = self.ai_service.generate_notes('Biology', 'Cells', 'brief')
+
+        self.assertEqual(first, "Cell notes")
+        self.assertEqual(second, "Cell notes")
+        self.assertEqual(mock_complete.call_count, 1)
+        self.assertEqual(self.counter('misses'), 1)
+        self.assertEqual(self.counter('memory_hits'), 1)
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_persistent_tier_survives_memory_loss(self, mock_complete):
+        """Test that another process (empty LRU) is served from the table."""
+        mock_complete.return_value = fake_completion("Strategy text")
+        self.ai_service.generate_test_strategies('essay')
+
+        completion_cache.clear_memory()
+        self.assertEqual(self.ai_service.generate_test_strategies('essay'), "Strategy text")
+        self.assertEqual(mock_complete.call_count, 1)
+        self.assertEqual(self.counter('db_hits'), 1)
+
+        entry = CompletionCacheEntry.query.one()
+        self.assertEqual(entry.hit_count, 1)
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_bypass_refreshes_cached_completion(self, mock_complete):
+        """Test that use_cache=False calls the provider and replaces the entry."""
+        mock_complete.return_value = fake_completion("Old notes")
+        self.ai_service.generate_notes('Biology', 'Cells')
+
+        mock_complete.return_value = fake_completion("New notes")
+        self.assertEqual(self.ai_service.generate_notes('Biology', 'Cells', use_cache=False), "New notes")
+        self.assertEqual(self.ai_service.generate_notes('Biology', 'Cells'), "New notes")
+        self.assertEqual(mock_complete.call_count, 2)
+        self.assertEqual(self.counter('bypasses'), 1)
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_provider_errors_are_not_cached(self, mock_complete):
+        """Test that a failed completion is retried on the next call."""
+        mock_complete.side_effect = RuntimeError("rate limited")
+        self.assertIn("rate limited", self.ai_service.generate_notes('Biology', 'Cells'))
+
+        mock_complete.side_effect = None
+        mock_complete.return_value = fake_completion("Cell notes")
+        self.assertEqual(self.ai_service.generate_notes('Biology', 'Cells'), "Cell notes")
+        self.assertEqual(CompletionCacheEntry.query.count(), 1)
+
+    def test_lru_and_row_budget_eviction(self):
+        """Test that both tiers stay within their configured sizes."""
+        for i in range(5):
+            completion_cache.set(f'key-{i}', f'text-{i}', model='m')
+
+        self.assertEqual(completion_cache.stats()['memory_entries'], 2)
+        self.assertEqual(CompletionCacheEntry.query.count(), 3)
+        self.assertIsNone(db.session.get(CompletionCacheEntry, 'key-0'))
+        self.assertIsNotNone(db.session.get(CompletionCacheEntry, 'key-4'))
+        self.assertEqual(self.counter('evictions'), 2)
+
+    def test_expired_entries_are_misses(self):
+        """Test that rows older than the TTL are ignored."""
+        completion_cache.set('stale', 'old text', model='m')
+        entry = db.session.get(CompletionCacheEntry, 'stale')
+        entry.created_at = datetime.utcnow() - timedelta(seconds=self.app.config['AI_CACHE_TTL'] + 1)
+        db.session.commit()
+        completion_cache.clear_memory()
+
+        self.assertIsNone(completion_cache.get('stale'))
+        self.assertEqual(self.counter('misses'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from app import create_app
+from app.ai_providers import AIProviderError, OpenAIProvider, StubProvider, ai_providers
+from app.ai_service import AIService, parse_practice_questions
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal /v1/completions endpoint that records the connections it serves."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.client_address, self.headers['Authorization'], body))
+
+        if body['prompt'] == 'fail':
+            self._send(429, {'error': {'message': 'Rate limit reached'}})
+        elif body['prompt'] == 'slow':
+            time.sleep(0.5)
+            self._send(200, {'choices': [{'text': 'late'}]})
+        elif body.get('stream'):
+            lines = [f"data: {json.dumps({'choices': [{'text': chunk}]})}\n\n" for chunk in ('Hello', ' world')]
+            payload = (''.join(lines) + 'data: [DONE]\n\n').encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self._send(200, {
+                'choices': [{'text': f"\n{body['model']}:{body['max_tokens']}"}],
+                'usage': {'prompt_tokens': 3, 'completion_tokens': 2}
+            })
+
+    def _send(self, status, data):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class OpenAIProviderTestCase(unittest.TestCase):
+    """Test case for the HTTP OpenAI provider against a local server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenAIHandler)
+        self.server.requests = []
+        # The timeout test hangs up before the slow response is written
+        self.server.handle_error = lambda request, client_address: None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.provider = OpenAIProvider(
+            api_key='test-key',
+            model='test-model',
+            base_url=f'http://127.0.0.1:{self.server.server_port}/v1',
+            read_timeout=0.2,
+            pool_size=2
+        )
+
+    def tearDown(self):
+        self.provider.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requires_api_key(self):
+        """Test that the key is checked when the provider is built."""
+        with self.assertRaises(ValueError):
+            OpenAIProvider(api_key=None, model='test-model')
+
+    def test_complete_reuses_connection(self):
+        """Test that sequential calls share one keep-alive connection."""
+        for _ in range(3):
+            completion = self.provider.complete('prompt', max_tokens=50, temperature=0.7)
+
+        self.assertEqual(completion.text, '\ntest-model:50')
+        self.assertEqual(completion.completion_tokens, 2)
+        self.assertEqual(len({address for address, _, _ in self.server.requests}), 1)
+        self.assertEqual(self.server.requests[0][1], 'Bearer test-key')
+
+    def test_stream(self):
+        """Test that streamed chunks are parsed from the SSE body."""
+        self.assertEqual(list(self.provider.stream('prompt', max_tokens=50, temperature=0.7)), ['Hello', ' world'])
+
+    def test_errors_and_timeouts(self):
+        """Test that HTTP errors and read timeouts raise AIProviderError."""
+        with self.assertRaisesRegex(AIProviderError, 'Rate limit reached'):
+            self.provider.complete('fail', max_tokens=50, temperature=0.7)
+        with self.assertRaises(AIProviderError):
+            self.provider.complete('slow', max_tokens=50, temperature=0.7)
+
+class StubProviderTestCase(unittest.TestCase):
+    """Test case for the offline stub provider and provider selection."""
+
+    def test_output_is_deterministic(self):
+        """Test that the same prompt always gives the same text."""
+        stub = StubProvider(tokens=20)
+        first = stub.complete('Explain photosynthesis in plants', max_tokens=100, temperature=0.7)
+        second = StubProvider(tokens=20).complete('Explain photosynthesis in plants', max_tokens=100, temperature=0.7)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.completion_tokens, 20)
+        self.assertEqual(''.join(stub.stream('Explain photosynthesis in plants', 100, 0.7)), first.text)
+        self.assertEqual(stub.complete('Explain photosynthesis in plants', max_tokens=5, temperature=0.7).completion_tokens, 5)
+
+    def test_latency(self):
+        """Test that configured latency is applied per call and per token."""
+        stub = StubProvider(latency=0.05, token_latency=0.005, tokens=10)
+        started = time.perf_counter()
+        stub.complete('Some prompt text', max_tokens=100, temperature=0.7)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.1)
+
+    def test_questions_prompt_returns_parseable_json(self):
+        """Test that the stub answers question prompts with valid questions."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            app = create_app()
+        app.config['AI_PROVIDER'] = 'stub'
+        with app.app_context():
+            ai_service = AIService()
+            questions = parse_practice_questions(ai_service.generate_practice_questions('Biology', 'Cells', count=4))
+
+        self.assertEqual(len(questions), 4)
+        self.assertEqual(questions[0]['question'], 'Stub question 1 about Cells?')
+
+    def test_registry_builds_configured_provider(self):
+        """Test provider selection from config, including registered providers."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            app = create_app()
+        app.config.update({'AI_PROVIDER': 'stub', 'AI_STUB_TOKENS': 7})
+        with app.app_context():
+            provider = ai_providers.get()
+            self.assertIsInstance(provider, StubProvider)
+            self.assertEqual(provider.tokens, 7)
+            self.assertIs(ai_providers.get(), provider)
+
+        custom = StubProvider(model='custom')
+        ai_providers.register('custom', lambda config: custom)
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            app = create_app()
+        app.config['AI_PROVIDER'] = 'custom'
+        with app.app_context():
+            self.assertEqual(AIService().model, 'custom')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,19 +1,20 @@
 import json
+import os
 import unittest
+from unittest import mock
 from app import create_app
 from app.extensions import db
 from app.models.user import User
+from app.passwords import password_hasher
 
 class AuthTestCase(unittest.TestCase):
     """Test case for the authentication blueprint."""
 
     def setUp(self):
         """Set up test client and initialize test database."""
-        self.app = create_app()
-        self.app.config.update({
-            'TESTING': True,
-            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
-        })
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
         self.client = self.app.test_client()
         
         with self.app.app_context():
@@ -135,3 +136,53 @@ class AuthTestCase(unittest.TestCase):
         data = json.loads(res.data)
         self.assertEqual(res.status_code, 401)
         self.assertEqual(data['error'], 'Invalid username or password')
+    
+    def test_login_rehashes_outdated_hash(self):
+        """Test that a hash made with an older cost is upgraded on login."""
+        self.app.config['PASSWORD_HASH_ITERATIONS'] = 1000
+        with self.app.app_context():
+            user = User(username='testuser', email='test@example.com')
+            user.password = 'testpassword'
+            db.session.add(user)
+            db.session.commit()
+            self.assertTrue(user.password_hash.startswith('pbkdf2:sha256:1000$'))
+        
+        self.app.config['PASSWORD_HASH_ITERATIONS'] = 2000
+        res = self.client.post(
+            '/api/auth/login',
+            data=json.dumps({'username': 'testuser', 'password': 'testpassword'}),
+            content_type='application/json'
+        )
+        self.assertEqual(res.status_code, 200)
+        
+        with self.app.app_context():
+            user = User.query.filter_by(username='testuser').first()
+            self.assertTrue(user.password_hash.startswith('pbkdf2:sha256:2000$'))
+            self.assertFalse(password_hasher.needs_rehash(user.password_hash))
+            self.assertTrue(user.check_password('testpassword'))
+    
+    def test_hashing_inline_and_in_pool_agree(self):
+        """Test that hashes made in the worker pool verify inline and vice versa."""
+        with self.app.app_context():
+            self.app.config['PASSWORD_HASH_WORKERS'] = 1
+            pooled = password_hasher.hash('testpassword')
+            self.app.config['PASSWORD_HASH_WORKERS'] = 0
+            inline = password_hasher.hash('testpassword')
+            self.assertTrue(password_hasher.verify(pooled, 'testpassword'))
+            self.assertFalse(password_hasher.verify(pooled, 'wrongpassword'))
+            self.app.config['PASSWORD_HASH_WORKERS'] = 1
+            self.assertTrue(password_hasher.verify(inline, 'testpassword'))
+    
+    def test_method_with_its_own_cost(self):
+        """Test that a configured method carrying a cost is not given a second one."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:', 'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1500'}):
+            app = create_app()
+        with app.app_context():
+            self.assertEqual(password_hasher.method(), 'pbkdf2:sha256:1500')
+            password_hash = password_hasher.hash('testpassword')
+            self.assertTrue(password_hash.startswith('pbkdf2:sha256:1500$'))
+            self.assertTrue(password_hasher.verify(password_hash, 'testpassword'))
+            
+            app.config['PASSWORD_HASH_ITERATIONS'] = 3000
+            self.assertEqual(password_hasher.method(), 'pbkdf2:sha256:3000')
+            self.assertTrue(password_hasher.needs_rehash(password_hash))
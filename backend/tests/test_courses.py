@@ -1,9 +1,12 @@
 import json
+import os
 import unittest
+from unittest import mock
+from datetime import datetime
 from app import create_app
 from app.extensions import db
 from app.models.user import User
-from app.models.study_models import Course
+from app.models.study_models import Course, Note, PracticeQuestion, Test, TestQuestion
 from flask_jwt_extended import create_access_token
 
 class CoursesTestCase(unittest.TestCase):
@@ -11,11 +14,9 @@ class CoursesTestCase(unittest.TestCase):
 
     def setUp(self):
         """Set up test client and initialize test database."""
-        self.app = create_app()
-        self.app.config.update({
-            'TESTING': True,
-            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
-        })
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
         self.client = self.app.test_client()
         
         with self.app.app_context():
@@ -76,12 +77,89 @@ class CoursesTestCase(unittest.TestCase):
         res = self.client.get('/api/courses/', headers=self.headers)
         
         # Check response
-        data = json.loads(res.data)
+        data = json.loads(res.data)['items']
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(data), 2)
         self.assertEqual(data[0]['title'], 'Course 1')
         self.assertEqual(data[1]['title'], 'Course 2')
     
+    def test_get_courses_paginated(self):
+        """Test walking course pages by cursor, including rows with equal timestamps."""
+        created_at = datetime(2024, 1, 1)
+        with self.app.app_context():
+            db.session.add_all([
+                Course(title=f'Course {i}', user_id=self.user.id, created_at=created_at)
+                for i in range(5)
+            ])
+            db.session.commit()
+        
+        titles = []
+        cursor = None
+        pages = 0
+        while True:
+            url = '/api/courses/?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            res = self.client.get(url, headers=self.headers)
+            self.assertEqual(res.status_code, 200)
+            data = res.get_json()
+            self.assertLessEqual(len(data['items']), 2)
+            titles.extend(course['title'] for course in data['items'])
+            pages += 1
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        
+        self.assertEqual(pages, 3)
+        self.assertEqual(titles, [f'Course {i}' for i in range(5)])
+    
+    def test_get_courses_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        res = self.client.get('/api/courses/?cursor=not-a-cursor', headers=self.headers)
+        self.assertEqual(res.status_code, 400)
+    
+    def test_export_course(self):
+        """Test streaming a course with its notes, questions and tests as NDJSON."""
+        with self.app.app_context():
+            course = Course(title='Export Course', user_id=self.user.id)
+            db.session.add(course)
+            db.session.flush()
+            db.session.add_all([Note(title=f'Note {i}', content='Content', course_id=course.id) for i in range(3)])
+            db.session.add(PracticeQuestion(question='Q?', answer='A', course_id=course.id))
+            test = Test(title='Midterm', due_date=datetime(2024, 5, 1), course_id=course.id)
+            db.session.add(test)
+            db.session.flush()
+            db.session.add_all([
+                TestQuestion(question='T1?', options=['a', 'b'], correct_answer='a', test_id=test.id),
+                TestQuestion(question='T2?', correct_answer='yes', test_id=test.id)
+            ])
+            db.session.commit()
+            course_id = course.id
+        
+        res = self.client.get(f'/api/courses/{course_id}/export', headers=self.headers)
+        
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.is_streamed)
+        self.assertEqual(res.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+        self.assertEqual(
+            [record['type'] for record in records],
+            ['course', 'note', 'note', 'note', 'question', 'test', 'test_question', 'test_question']
+        )
+        self.assertEqual(records[0]['title'], 'Export Course')
+        self.assertEqual(records[5]['due_date'], '2024-05-01T00:00:00')
+        self.assertEqual(records[6]['options'], ['a', 'b'])
+        
+        # Another user's course is not exported
+        with self.app.app_context():
+            other = User(username='other', email='other@example.com', password_hash='x')
+            db.session.add(other)
+            db.session.flush()
+            other_course = Course(title='Private', user_id=other.id)
+            db.session.add(other_course)
+            db.session.commit()
+            other_course_id = other_course.id
+        res = self.client.get(f'/api/courses/{other_course_id}/export', headers=self.headers)
+        self.assertEqual(res.status_code, 404)
+    
     def test_get_course(self):
         """Test getting a specific course."""
         # Create a test course
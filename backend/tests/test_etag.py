@@ -0,0 +1,140 @@
+import json
+import os
+import unittest
+from unittest import mock
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.study_models import Course, Note
+from flask_jwt_extended import create_access_token
+
+class ConditionalGetTestCase(unittest.TestCase):
+    """Test case for ETags and conditional GET on list endpoints."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create two users, the first with a course and a note
+            self.user = User(username='testuser', email='test@example.com')
+            self.user.password = 'testpassword'
+            self.other_user = User(username='otheruser', email='other@example.com')
+            self.other_user.password = 'testpassword'
+            db.session.add_all([self.user, self.other_user])
+            db.session.flush()
+
+            self.course = Course(title='Test Course', user_id=self.user.id)
+            db.session.add(self.course)
+            db.session.flush()
+            db.session.add(Note(title='Note', content='Content', course_id=self.course.id))
+            db.session.commit()
+            self.notes_url = f'/api/course/{self.course.id}/notes'
+
+            # Create JWT tokens for both users
+            self.headers = {
+                'Authorization': f'Bearer {create_access_token(identity=self.user.id)}',
+                'Content-Type': 'application/json'
+            }
+            self.other_headers = {
+                'Authorization': f'Bearer {create_access_token(identity=self.other_user.id)}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def revalidate(self, url, etag, headers=None):
+        return self.client.get(url, headers={**(headers or self.headers), 'If-None-Match': f'"{etag}"'})
+
+    def test_not_modified_skips_row_tables(self):
+        """Test that a matching If-None-Match gets a 304 after only the version lookup."""
+        res = self.client.get(self.notes_url, headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        etag = res.get_etag()[0]
+        self.assertIsNotNone(etag)
+        self.assertEqual(res.headers['Cache-Control'], 'private, no-cache')
+
+        statements = []
+        with self.app.app_context():
+            def record(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                res = self.revalidate(self.notes_url, etag)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.get_etag()[0], etag)
+        self.assertEqual(res.data, b'')
+        self.assertTrue(statements)
+        self.assertTrue(all('content_versions' in statement and 'notes' not in statement for statement in statements))
+
+    def test_writes_change_the_etag(self):
+        """Test that notes and course writes invalidate the tags they affect."""
+        notes_etag = self.client.get(self.notes_url, headers=self.headers).get_etag()[0]
+        courses_etag = self.client.get('/api/courses/', headers=self.headers).get_etag()[0]
+
+        self.client.post(self.notes_url, headers=self.headers, data=json.dumps({'title': 'New', 'content': 'More'}))
+        res = self.revalidate(self.notes_url, notes_etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.get_json()['items']), 2)
+        # Notes do not touch the course list
+        self.assertEqual(self.revalidate('/api/courses/', courses_etag).status_code, 304)
+
+        self.client.put(f'/api/courses/{self.course.id}', headers=self.headers, data=json.dumps({'title': 'Renamed'}))
+        res = self.revalidate('/api/courses/', courses_etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['items'][0]['title'], 'Renamed')
+
+    def test_todos_etag(self):
+        """Test that todo writes change the todos tag."""
+        etag = self.client.get('/api/progress/todos', headers=self.headers).get_etag()[0]
+        self.assertEqual(self.revalidate('/api/progress/todos', etag).status_code, 304)
+        self.client.post('/api/progress/todos', headers=self.headers, data=json.dumps({'text': 'Read chapter 1'}))
+        self.assertEqual(self.revalidate('/api/progress/todos', etag).status_code, 200)
+
+    def test_tags_are_per_user_and_page(self):
+        """Test that another user's request or another page never matches the tag."""
+        etag = self.client.get(self.notes_url, headers=self.headers).get_etag()[0]
+        self.assertEqual(self.revalidate(self.notes_url, etag, self.other_headers).status_code, 404)
+        self.assertEqual(self.revalidate(f'{self.notes_url}?limit=1', etag).status_code, 200)
+
+    def test_deleted_course_is_not_found(self):
+        """Test that a deleted course answers 404 even to a previously valid tag."""
+        url = f'/api/courses/{self.course.id}'
+        etag = self.client.get(url, headers=self.headers).get_etag()[0]
+        self.client.delete(url, headers=self.headers)
+        self.assertEqual(self.revalidate(url, etag).status_code, 404)
+
+    def test_deleting_a_course_changes_its_todos_and_reused_id(self):
+        """Test that a delete invalidates linked todos and that a course reusing the id gets new tags."""
+        self.client.post('/api/progress/todos', headers=self.headers,
+                         data=json.dumps({'text': 'Revise', 'course_id': self.course.id}))
+        todos_etag = self.client.get('/api/progress/todos', headers=self.headers).get_etag()[0]
+        notes_etag = self.client.get(self.notes_url, headers=self.headers).get_etag()[0]
+
+        self.client.delete(f'/api/courses/{self.course.id}', headers=self.headers)
+        res = self.revalidate('/api/progress/todos', todos_etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(res.get_json()['items'][0]['course_id'])
+
+        with self.app.app_context():
+            db.session.add(Course(id=self.course.id, title='Reused', user_id=self.user.id))
+            db.session.commit()
+        res = self.revalidate(self.notes_url, notes_etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['items'], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import io
+import json
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.extensions import db
+from app.bulk_import import iter_json_array
+from app.models.user import User
+from app.models.study_models import Course, Note, PracticeQuestion
+from flask_jwt_extended import create_access_token
+
+class BulkImportTestCase(unittest.TestCase):
+    """Test case for bulk importing notes and practice questions."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'IMPORT_CHUNK_SIZE': 2
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create a test user
+            self.user = User(username='testuser', email='test@example.com')
+            self.user.password = 'testpassword'
+            db.session.add(self.user)
+            db.session.flush()
+
+            # Create a test course
+            self.course = Course(title='Test Course', description='Test Description', user_id=self.user.id)
+            db.session.add(self.course)
+
+            db.session.commit()
+
+            # Create a JWT token for the test user
+            self.access_token = create_access_token(identity=self.user.id)
+            self.headers = {'Authorization': f'Bearer {self.access_token}'}
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_import_notes_ndjson(self):
+        """Test that valid lines are inserted and bad lines are reported by number."""
+        lines = [
+            json.dumps({'title': 'Note 1', 'content': 'Content 1'}),
+            '{not json',
+            json.dumps({'title': 'Note 2', 'content': 'Content 2'}),
+            '',
+            json.dumps({'title': 'No content'}),
+            json.dumps({'title': 'Note 3', 'content': 'Content 3'}),
+            json.dumps(['not', 'an', 'object'])
+        ]
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/notes/import',
+            headers={**self.headers, 'Content-Type': 'application/x-ndjson'},
+            data='\n'.join(lines)
+        )
+
+        data = res.get_json()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['imported'], 3)
+        self.assertEqual(data['failed'], 3)
+        self.assertEqual([error['line'] for error in data['errors']], [2, 5, 7])
+        self.assertIn('Invalid JSON', data['errors'][0]['error'])
+        self.assertIn('rows_per_second', data)
+        with self.app.app_context():
+            notes = Note.query.filter_by(course_id=self.course.id).order_by(Note.id).all()
+            self.assertEqual([note.title for note in notes], ['Note 1', 'Note 2', 'Note 3'])
+            self.assertTrue(all(note.created_at for note in notes))
+
+    def test_import_questions_json_array(self):
+        """Test importing a JSON array body, read in chunks smaller than one record."""
+        records = [
+            {'question': f'Qüestion {i}?', 'answer': f'Answer {i}', 'difficulty': 'hard'}
+            for i in range(5)
+        ]
+        records.append({'question': 'Q?', 'answer': 'A', 'difficulty': 'impossible'})
+
+        with patch('app.bulk_import.READ_SIZE', 7):
+            res = self.client.post(
+                f'/api/course/{self.course.id}/questions/import',
+                headers={**self.headers, 'Content-Type': 'application/json'},
+                data=json.dumps(records, ensure_ascii=False).encode('utf-8')
+            )
+
+        data = res.get_json()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['imported'], 5)
+        self.assertEqual(data['errors'], [{'line': 6, 'error': 'Difficulty must be easy, medium or hard'}])
+        with self.app.app_context():
+            questions = PracticeQuestion.query.filter_by(course_id=self.course.id).order_by(PracticeQuestion.id).all()
+            self.assertEqual(questions[0].question, 'Qüestion 0?')
+            self.assertEqual({question.difficulty for question in questions}, {'hard'})
+
+    def test_malformed_json_array(self):
+        """Test that structural errors stop the array parse with a report."""
+        parse = lambda body: list(iter_json_array(io.BytesIO(body), max_record_bytes=1024))
+
+        records = parse(b'[{"a": 1}, {"a": 2} {"a": 3}]')
+        self.assertEqual([record for _, record in records[:2]], [{'a': 1}, {'a': 2}])
+        self.assertEqual(records[2][0], 3)
+        self.assertIn("Expected ','", str(records[2][1]))
+
+        self.assertIn('Expected a JSON array', str(parse(b'{"a": 1}')[0][1]))
+        self.assertIn('Invalid JSON', str(parse(b'[{"a": ')[0][1]))
+
+    def test_oversized_records(self):
+        """Test that records over IMPORT_MAX_RECORD_BYTES are rejected in both formats."""
+        self.app.config['IMPORT_MAX_RECORD_BYTES'] = 100
+        big = {'title': 'Big', 'content': 'x' * 200}
+        lines = [
+            json.dumps({'title': 'Note 1', 'content': 'Content 1'}),
+            json.dumps(big),
+            json.dumps({'title': 'Note 2', 'content': 'Content 2'})
+        ]
+
+        with patch('app.bulk_import.READ_SIZE', 16):
+            res = self.client.post(
+                f'/api/course/{self.course.id}/notes/import',
+                headers={**self.headers, 'Content-Type': 'application/x-ndjson'},
+                data='\n'.join(lines)
+            )
+        data = res.get_json()
+        self.assertEqual(data['imported'], 2)
+        self.assertEqual(data['errors'], [{'line': 2, 'error': 'Record is larger than 100 bytes'}])
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/notes/import',
+            headers={**self.headers, 'Content-Type': 'application/json'},
+            data=json.dumps([big])
+        )
+        self.assertEqual(res.get_json()['errors'], [{'line': 1, 'error': 'Record is larger than 100 bytes'}])
+
+    def test_import_requires_own_course(self):
+        """Test that importing into another user's course is rejected."""
+        with self.app.app_context():
+            other = User(username='other', email='other@example.com', password_hash='x')
+            db.session.add(other)
+            db.session.flush()
+            course = Course(title='Other Course', user_id=other.id)
+            db.session.add(course)
+            db.session.commit()
+            course_id = course.id
+
+        res = self.client.post(
+            f'/api/course/{course_id}/notes/import',
+            headers={**self.headers, 'Content-Type': 'application/x-ndjson'},
+            data=json.dumps({'title': 'Note', 'content': 'Content'})
+        )
+        self.assertEqual(res.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import create_app
+from app.extensions import db
+from app.ai_providers import AIProviderError, StubProvider, ai_providers
+from app.jobs import job_queue
+from app.models.user import User
+from app.models.study_models import Course, Note
+from app.models.job_models import GenerationJob
+from flask_jwt_extended import create_access_token
+
+class FailingProvider(StubProvider):
+    def complete(self, prompt, max_tokens, temperature):
+        raise AIProviderError("provider unavailable")
+
+ai_providers.register('failing', lambda config: FailingProvider())
+
+class JobsTestCase(unittest.TestCase):
+    """Test case for the job queue and the jobs blueprint."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        # A file, not :memory:, so the worker threads get connections of their own
+        self.directory = tempfile.mkdtemp()
+        with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{os.path.join(self.directory, 'app.db')}"}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'JOB_WORKERS': 2,
+            'JOB_POLL_INTERVAL': 0.05
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create a test user
+            self.user = User(username='testuser', email='test@example.com')
+            self.user.password = 'testpassword'
+            db.session.add(self.user)
+            db.session.flush()
+
+            # Create a test course
+            self.course = Course(title='Test Course', description='Test Description', user_id=self.user.id)
+            db.session.add(self.course)
+
+            db.session.commit()
+
+            # Create a JWT token for the test user
+            self.access_token = create_access_token(identity=self.user.id)
+            self.headers = {
+                'Authorization': f'Bearer {self.access_token}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Stop the workers and clean up after the test."""
+        job_queue.shutdown(timeout=5)
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def wait_for_job(self, status_url, timeout=5):
+        """Poll a job until a worker has finished it."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            res = self.client.get(status_url, headers=self.headers)
+            job = json.loads(res.data)
+            if job['status'] in ('succeeded', 'failed'):
+                return job
+            time.sleep(0.02)
+        self.fail(f"Job at {status_url} did not finish within {timeout}s")
+
+    @patch('app.ai_service.AIService.complete')
+    def test_worker_persists_generated_note(self, mock_complete):
+        """Test that a background worker runs the job and saves the note."""
+        mock_complete.return_value = "Worker-generated notes."
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-notes',
+            headers=self.headers,
+            data=json.dumps({'topic': 'Queues', 'detail_level': 'brief'})
+        )
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(data['status'], 'queued')
+
+        job = self.wait_for_job(data['status_url'])
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['note']['content'], "Worker-generated notes.")
+        mock_complete.assert_called_once()
+        self.assertIn('Queues', mock_complete.call_args.args[0])
+        self.assertEqual(mock_complete.call_args.kwargs['detail_level'], 'brief')
+        self.assertEqual(mock_complete.call_args.kwargs['use_cache'], True)
+
+        with self.app.app_context():
+            note = Note.query.filter_by(title='Notes: Queues').first()
+            self.assertIsNotNone(note)
+            self.assertEqual(note.id, job['result']['note']['id'])
+
+    def test_failed_job_reports_error(self):
+        """Test that a provider error marks the job failed without saving a note."""
+        self.app.config.update({'AI_PROVIDER': 'failing', 'AI_CACHE_ENABLED': False})
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-notes',
+            headers=self.headers,
+            data=json.dumps({'topic': 'Outages'})
+        )
+        job = self.wait_for_job(json.loads(res.data)['status_url'])
+
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], "provider unavailable")
+        self.assertNotIn('result', job)
+        with self.app.app_context():
+            self.assertEqual(Note.query.count(), 0)
+
+        res = self.client.post('/api/test-strategies', headers=self.headers, data=json.dumps({'test_type': 'essay'}))
+        job = self.wait_for_job(json.loads(res.data)['status_url'])
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], "provider unavailable")
+
+    @patch('app.ai_service.AIService.complete')
+    def test_job_stats(self, mock_complete):
+        """Test that stats report queue depth and latency of finished jobs."""
+        mock_complete.return_value = "Notes."
+
+        status_urls = []
+        for i in range(3):
+            res = self.client.post(
+                f'/api/course/{self.course.id}/generate-notes',
+                headers=self.headers,
+                data=json.dumps({'topic': f'Topic {i}'})
+            )
+            status_urls.append(json.loads(res.data)['status_url'])
+        for status_url in status_urls:
+            self.wait_for_job(status_url)
+
+        res = self.client.get('/api/jobs/stats', headers=self.headers)
+        stats = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['succeeded'], 3)
+        self.assertEqual(stats['latency']['sample_size'], 3)
+        self.assertIsNotNone(stats['latency']['total_p95'])
+
+    @patch('app.ai_service.AIService.complete')
+    def test_abandoned_jobs_are_reclaimed(self, mock_complete):
+        """Test that running jobs past their lease are requeued, or failed once out of attempts."""
+        mock_complete.return_value = "Recovered notes."
+        self.app.config.update({'JOB_LEASE': 60, 'JOB_MAX_ATTEMPTS': 2})
+        long_ago = datetime.utcnow() - timedelta(seconds=120)
+        with self.app.app_context():
+            payload = {'course_id': self.course.id, 'topic': 'Crashes', 'detail_level': 'medium'}
+            jobs = [
+                GenerationJob(user_id=self.user.id, kind='generate_notes', payload=payload,
+                              status='running', started_at=long_ago, attempts=1),
+                GenerationJob(user_id=self.user.id, kind='generate_notes', payload=payload,
+                              status='running', started_at=long_ago, attempts=2),
+                GenerationJob(user_id=self.user.id, kind='generate_notes', payload=payload,
+                              status='running', started_at=datetime.utcnow(), attempts=1)
+            ]
+            db.session.add_all(jobs)
+            db.session.commit()
+            requeued, exhausted, live = [job.id for job in jobs]
+
+            self.assertEqual(job_queue.reclaim_stale(), 1)
+
+        status = lambda job_id: self.client.get(f'/api/jobs/{job_id}', headers=self.headers).get_json()
+        self.assertEqual(status(requeued)['status'], 'queued')
+        self.assertEqual(status(exhausted)['status'], 'failed')
+        self.assertEqual(status(exhausted)['error'], 'The worker stopped before the job finished')
+        self.assertEqual(status(live)['status'], 'running')
+
+        # Let the first request start the workers, which pick the job up again
+        self.app.config['TESTING'] = False
+        job = self.wait_for_job(f'/api/jobs/{requeued}')
+        self.assertEqual(job['status'], 'succeeded')
+
+    @patch('app.ai_service.AIService.complete')
+    def test_first_request_starts_workers(self, mock_complete):
+        """Test that jobs queued by an earlier process run without a new enqueue."""
+        mock_complete.return_value = "Leftover notes."
+        with self.app.app_context():
+            job = GenerationJob(user_id=self.user.id, kind='generate_notes',
+                                payload={'course_id': self.course.id, 'topic': 'Leftovers', 'detail_level': 'medium'})
+            db.session.add(job)
+            db.session.commit()
+            status_url = f'/api/jobs/{job.id}'
+
+        self.app.config['TESTING'] = False
+        job = self.wait_for_job(status_url)
+        self.assertEqual(job['status'], 'succeeded')
+
+    def test_job_belongs_to_user(self):
+        """Test that users cannot see each other's jobs."""
+        with self.app.app_context():
+            other = User(username='otheruser', email='other@example.com')
+            other.password = 'otherpassword'
+            db.session.add(other)
+            db.session.flush()
+            job = GenerationJob(user_id=other.id, kind='generate_notes', payload={})
+            db.session.add(job)
+            db.session.commit()
+            job_id = job.id
+
+        res = self.client.get(f'/api/jobs/{job_id}', headers=self.headers)
+        self.assertEqual(res.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
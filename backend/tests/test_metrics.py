@@ -0,0 +1,106 @@
+import os
+import unittest
+from unittest import mock
+from app import create_app
+from app.ai_providers import AIProviderError, StubProvider
+from app.ai_service import AIService
+from app.extensions import db
+from app.metrics import Histogram, metrics
+from app.models.user import User
+from app.models.study_models import Course
+from flask_jwt_extended import create_access_token
+
+class FailingProvider(StubProvider):
+    def complete(self, prompt, max_tokens, temperature):
+        raise AIProviderError("upstream unavailable")
+
+class MetricsTestCase(unittest.TestCase):
+    """Test case for the /metrics endpoint."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'AI_CACHE_ENABLED': False
+        })
+        self.client = self.app.test_client()
+        metrics.reset()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create a test user with a course
+            user = User(username='testuser', email='test@example.com')
+            user.password = 'testpassword'
+            db.session.add(user)
+            db.session.flush()
+            course = Course(title='Test Course', user_id=user.id)
+            db.session.add(course)
+            db.session.commit()
+            self.course_id = course.id
+            self.headers = {
+                'Authorization': f'Bearer {create_access_token(identity=user.id)}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        metrics.reset()
+
+    def scrape(self):
+        res = self.client.get('/metrics')
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return res.get_data(as_text=True)
+
+    def test_request_latency_by_route(self):
+        """Test that requests are counted per blueprint, route template and status."""
+        self.client.get(f'/api/course/{self.course_id}/notes', headers=self.headers)
+        self.client.get('/api/course/999/notes', headers=self.headers)
+        body = self.scrape()
+
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        labels = 'blueprint="notes",route="/api/course/<int:course_id>/notes",method="GET"'
+        self.assertIn(f'http_request_duration_seconds_count{{{labels},status="200"}} 1', body)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels},status="404"}} 1', body)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},status="200",le="+Inf"}} 1', body)
+        # Finished requests are no longer in flight; the scrape itself still is
+        self.assertIn('http_requests_in_flight{blueprint="notes"} 0', body)
+        self.assertIn('http_requests_in_flight{blueprint=""} 1', body)
+
+    def test_ai_calls_by_model_and_detail_level(self):
+        """Test that provider calls record latency, tokens and errors."""
+        with self.app.app_context():
+            AIService(provider=StubProvider(tokens=12)).generate_notes('Biology', 'Cells', detail_level='brief')
+            AIService(provider=FailingProvider(model='flaky')).generate_notes('Biology', 'Cells', detail_level='nonsense')
+            AIService(provider=StubProvider()).generate_practice_questions('Biology', 'Cells')
+            AIService(provider=StubProvider()).generate_test_strategies('final')
+        body = self.scrape()
+
+        self.assertIn('ai_request_duration_seconds_count{model="stub",detail_level="brief",mode="complete"} 1', body)
+        self.assertIn('ai_tokens_total{model="stub",detail_level="brief",kind="completion"} 12', body)
+        self.assertIn('ai_request_errors_total{model="flaky",detail_level="other",mode="complete"} 1', body)
+        # Prompts without a detail level are labelled by operation
+        self.assertIn('ai_request_duration_seconds_count{model="stub",detail_level="questions",mode="complete"} 1', body)
+        self.assertIn('ai_request_duration_seconds_count{model="stub",detail_level="strategies",mode="complete"} 1', body)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test the text format of a histogram."""
+        histogram = Histogram('work_seconds', 'Work.', ['kind'], buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(('a',), value)
+        self.assertEqual(histogram.render()[2:], [
+            'work_seconds_bucket{kind="a",le="0.1"} 1',
+            'work_seconds_bucket{kind="a",le="1.0"} 2',
+            'work_seconds_bucket{kind="a",le="+Inf"} 3',
+            'work_seconds_sum{kind="a"} 5.55',
+            'work_seconds_count{kind="a"} 3'
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
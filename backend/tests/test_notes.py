@@ -1,4 +1,5 @@
 import json
+import os
 import unittest
 from unittest.mock import patch
 from app import create_app
@@ -12,10 +13,11 @@ class NotesTestCase(unittest.TestCase):
 
     def setUp(self):
         """Set up test client and initialize test database."""
-        self.app = create_app()
+        with patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
         self.app.config.update({
             'TESTING': True,
-            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
+            'JOBS_EAGER': True
         })
         self.client = self.app.test_client()
         
@@ -26,6 +28,7 @@ class NotesTestCase(unittest.TestCase):
             self.user = User(username='testuser', email='test@example.com')
             self.user.password = 'testpassword'
             db.session.add(self.user)
+            db.session.flush()
             
             # Create a test course
             self.course = Course(title='Test Course', description='Test Description', user_id=self.user.id)
@@ -82,17 +85,17 @@ class NotesTestCase(unittest.TestCase):
         res = self.client.get(f'/api/course/{self.course.id}/notes', headers=self.headers)
         
         # Check response
-        data = json.loads(res.data)
+        data = json.loads(res.data)['items']
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(data), 2)
         self.assertEqual(data[0]['title'], 'Note 1')
         self.assertEqual(data[1]['title'], 'Note 2')
     
-    @patch('app.ai_service.AIService.generate_notes')
-    def test_generate_notes(self, mock_generate_notes):
+    @patch('app.ai_service.AIService.complete')
+    def test_generate_notes(self, mock_complete):
         """Test generating notes with AI."""
         # Mock the AI service response
-        mock_generate_notes.return_value = "These are AI-generated notes about the test topic."
+        mock_complete.return_value = "These are AI-generated notes about the test topic."
         
         # Generate notes
         res = self.client.post(
@@ -104,11 +107,18 @@ class NotesTestCase(unittest.TestCase):
             })
         )
         
-        # Check response
+        # Check response: generation is handed to the job queue
         data = json.loads(res.data)
-        self.assertEqual(res.status_code, 201)
-        self.assertEqual(data['title'], 'Notes: Test Topic')
-        self.assertEqual(data['content'], "These are AI-generated notes about the test topic.")
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(data['status'], 'succeeded')
+        self.assertEqual(res.headers['Location'], f"/api/jobs/{data['job_id']}")
+        
+        # Poll the job for the generated note
+        res = self.client.get(data['status_url'], headers=self.headers)
+        job = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(job['result']['note']['title'], 'Notes: Test Topic')
+        self.assertEqual(job['result']['note']['content'], "These are AI-generated notes about the test topic.")
         
         # Verify the note was saved to the database
         with self.app.app_context():
@@ -0,0 +1,173 @@
+import json
+import os
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.study_models import Course, Note, PracticeQuestion
+from app import versions
+from app.ownership import ownership_cache
+from app.query_stats import query_stats
+from flask_jwt_extended import create_access_token
+
+class OwnershipCacheTestCase(unittest.TestCase):
+    """Test case for the course ownership cache."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        # Requests share this context, so their queries reach the counters
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        # Two users, each with a course; the first course has a note
+        users = [User(username=f'user{i}', email=f'user{i}@example.com', password_hash='x') for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        courses = [Course(title=f'Course {i}', user_id=user.id) for i, user in enumerate(users)]
+        db.session.add_all(courses)
+        db.session.flush()
+        note = Note(title='Note', content='Content', course_id=courses[0].id)
+        db.session.add(note)
+        db.session.commit()
+        self.user_id = users[0].id
+        self.course_id, self.other_course_id = courses[0].id, courses[1].id
+        self.note_id = note.id
+        self.headers = {
+            'Authorization': f'Bearer {create_access_token(identity=self.user_id)}',
+            'Content-Type': 'application/json'
+        }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def get(self, url):
+        with query_stats.count_queries() as tally:
+            res = self.client.get(url, headers=self.headers)
+        return res, tally.count
+
+    def test_repeat_reads_skip_the_ownership_query(self):
+        """Test that only the first read of a course checks ownership in the database."""
+        url = f'/api/course/{self.course_id}/notes'
+        res, first = self.get(url)
+        self.assertEqual(res.status_code, 200)
+        res, second = self.get(url)
+        self.assertEqual(res.status_code, 200)
+        # The first read also records the course's version scope
+        self.assertEqual(first - second, 2)
+        self.assertEqual(ownership_cache.stats()['hits'], 1)
+
+    def test_other_users_course_stays_hidden(self):
+        """Test that a cached negative answer is still a 404."""
+        for _ in range(2):
+            res, _ = self.get(f'/api/course/{self.other_course_id}/notes')
+            self.assertEqual(res.status_code, 404)
+        self.assertEqual(ownership_cache.stats()['hits'], 1)
+
+    def test_delete_course_invalidates(self):
+        """Test that a deleted course is not served from a stale entry."""
+        self.get(f'/api/course/{self.course_id}/notes')
+        res = self.client.delete(f'/api/courses/{self.course_id}', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        res, _ = self.get(f'/api/course/{self.course_id}/notes')
+        self.assertEqual(res.status_code, 404)
+
+    def test_create_course_invalidates(self):
+        """Test that a course created after a miss on its id is visible at once."""
+        next_id = self.other_course_id + 1
+        res, _ = self.get(f'/api/course/{next_id}/notes')
+        self.assertEqual(res.status_code, 404)
+        res = self.client.post('/api/courses/', json={'title': 'New Course'}, headers=self.headers)
+        self.assertEqual(res.get_json()['id'], next_id)
+        res, _ = self.get(f'/api/course/{next_id}/notes')
+        self.assertEqual(res.status_code, 200)
+
+    def test_deleted_course_id_is_not_reused(self):
+        """Test that a stale entry in another process can never cover another user's new course."""
+        res = self.client.post('/api/courses/', json={'title': 'Newest'}, headers=self.headers)
+        course_id = res.get_json()['id']
+        self.get(f'/api/course/{course_id}/notes')
+
+        # Deleted by another process, so this process keeps its entry
+        db.session.delete(db.session.get(Course, course_id))
+        db.session.commit()
+        self.assertTrue(ownership_cache.owns_course(self.user_id, course_id))
+
+        other_headers = {**self.headers, 'Authorization': f'Bearer {create_access_token(identity=self.user_id + 1)}'}
+        res = self.client.post('/api/courses/', json={'title': 'Private'}, headers=other_headers)
+        self.assertNotEqual(res.get_json()['id'], course_id)
+        res, _ = self.get(f"/api/course/{res.get_json()['id']}/notes")
+        self.assertEqual(res.status_code, 404)
+
+    def test_writes_ignore_a_stale_entry(self):
+        """Test that writes into a course deleted by another process are refused, not orphaned."""
+        self.get(f'/api/course/{self.course_id}/notes')
+        # Deleted by another process, so this process keeps its entry
+        db.session.delete(db.session.get(Course, self.course_id))
+        db.session.commit()
+        self.assertTrue(ownership_cache.owns_course(self.user_id, self.course_id))
+
+        base = f'/api/course/{self.course_id}'
+        note = {'title': 'Orphan', 'content': 'Content'}
+        question = {'question': 'Orphan?', 'answer': 'A'}
+        for url, body in ((f'{base}/notes', note), (f'{base}/questions', question)):
+            self.assertEqual(self.client.post(url, json=body, headers=self.headers).status_code, 404)
+        for url, body in ((f'{base}/notes/import', note), (f'{base}/questions/import', question)):
+            res = self.client.post(url, data=json.dumps(body), headers={**self.headers, 'Content-Type': 'application/x-ndjson'})
+            self.assertEqual(res.status_code, 404)
+        self.assertEqual(Note.query.filter_by(course_id=self.course_id).count(), 0)
+        self.assertEqual(PracticeQuestion.query.filter_by(course_id=self.course_id).count(), 0)
+
+    def test_import_stops_when_the_course_is_deleted(self):
+        """Test that a course deleted between import chunks stops the import."""
+        self.app.config['IMPORT_CHUNK_SIZE'] = 1
+        lines = '\n'.join(json.dumps({'title': f'Note {i}', 'content': 'Content'}) for i in range(3))
+        real_bump = versions.bump
+
+        def bump_then_delete(*scopes):
+            real_bump(*scopes)
+            # Another request deletes the course once the first chunk is written
+            db.session.execute(Course.__table__.delete().where(Course.id == self.course_id))
+
+        with mock.patch('app.versions.bump', side_effect=bump_then_delete):
+            res = self.client.post(f'/api/course/{self.course_id}/notes/import', data=lines,
+                                   headers={**self.headers, 'Content-Type': 'application/x-ndjson'})
+        self.assertEqual(res.status_code, 404)
+        # Nothing after the chunk that was already committed
+        self.assertEqual(Note.query.filter(Note.title.like('Note %')).count(), 1)
+
+    def test_note_fetch_is_one_query_and_fills_cache(self):
+        """Test that a note is fetched and authorized together."""
+        res, count = self.get(f'/api/notes/{self.note_id}')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(count, 1)
+        self.assertTrue(ownership_cache.owns_course(self.user_id, self.course_id))
+        self.assertEqual(ownership_cache.stats()['hits'], 1)
+
+        headers = {**self.headers, 'Authorization': f'Bearer {create_access_token(identity=self.user_id + 1)}'}
+        self.assertEqual(self.client.get(f'/api/notes/{self.note_id}', headers=headers).status_code, 404)
+
+    def test_ttl_and_size(self):
+        """Test that entries expire and the least recently used are evicted."""
+        self.app.config['COURSE_OWNERSHIP_TTL'] = 0
+        ownership_cache.owns_course(self.user_id, self.course_id)
+        ownership_cache.owns_course(self.user_id, self.course_id)
+        self.assertEqual(ownership_cache.stats()['hits'], 0)
+
+        self.app.config.update({'COURSE_OWNERSHIP_TTL': 60, 'COURSE_OWNERSHIP_CACHE_SIZE': 1})
+        ownership_cache.owns_course(self.user_id, self.course_id)
+        ownership_cache.owns_course(self.user_id, self.other_course_id)
+        stats = ownership_cache.stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertGreaterEqual(stats['evictions'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
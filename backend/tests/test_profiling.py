@@ -0,0 +1,103 @@
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.profiling import request_profiler
+from flask_jwt_extended import create_access_token
+
+class RequestProfilerTestCase(unittest.TestCase):
+    """Test case for on-demand request profiling."""
+
+    def setUp(self):
+        """Create a directory for profiles."""
+        self.profile_dir = tempfile.mkdtemp()
+        self.app = None
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.app is not None:
+            with self.app.app_context():
+                db.session.remove()
+                db.drop_all()
+        shutil.rmtree(self.profile_dir)
+
+    def make_app(self, **settings):
+        # Profiling settings are read when the app is created
+        environ = {'DATABASE_URL': 'sqlite:///:memory:', 'PROFILE_DIR': self.profile_dir, **settings}
+        with mock.patch.dict(os.environ, environ):
+            app = create_app()
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com')
+            user.password = 'testpassword'
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+        self.app = app
+        return app
+
+    def profiles(self, suffix):
+        return sorted(name for name in os.listdir(self.profile_dir) if name.endswith(suffix))
+
+    def test_disabled_installs_no_hooks(self):
+        """Test that without a token or sample rate nothing runs per request."""
+        app = self.make_app()
+        hooks = app.before_request_funcs.get(None, []) + app.after_request_funcs.get(None, [])
+        self.assertNotIn(request_profiler._before_request, hooks)
+        self.assertNotIn(request_profiler._after_request, hooks)
+        app.test_client().get('/api/progress/weekly-progress', headers={**self.headers, 'X-Profile': 'anything'})
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_header_profiles_with_cprofile(self):
+        """Test that the privileged header writes a pstats file and its metadata."""
+        app = self.make_app(PROFILE_TOKEN='let-me-profile')
+        client = app.test_client()
+        client.get('/api/progress/weekly-progress', headers=self.headers)
+        client.get('/api/progress/weekly-progress', headers={**self.headers, 'X-Profile': 'wrong'})
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+        res = client.get('/api/progress/weekly-progress', headers={**self.headers, 'X-Profile': 'let-me-profile'})
+        self.assertEqual(res.status_code, 200)
+        [meta_file] = self.profiles('.json')
+        self.assertIn('-GET-api_progress_weekly-progress-u', meta_file)
+        with open(os.path.join(self.profile_dir, meta_file)) as f:
+            meta = json.load(f)
+        self.assertEqual(meta['route'], '/api/progress/weekly-progress')
+        self.assertEqual(meta['user_id'], self.user_id)
+        self.assertEqual(meta['status'], 200)
+        self.assertGreater(meta['query_count'], 0)
+        self.assertEqual(meta['mode'], 'cprofile')
+
+        stats = pstats.Stats(os.path.join(self.profile_dir, meta['profile']))
+        self.assertTrue(any(name == 'get_weekly_progress' for _, _, name in stats.stats))
+
+    def test_sampler_writes_collapsed_stacks(self):
+        """Test that sampled requests produce flamegraph-ready collapsed stacks."""
+        app = self.make_app(PROFILE_SAMPLE_RATE='1', PROFILE_MODE='sampler', PROFILE_SAMPLE_INTERVAL='0.001')
+
+        @app.route('/test/slow')
+        def slow_view():
+            time.sleep(0.05)
+            return 'done'
+
+        app.test_client().get('/test/slow')
+        [folded] = self.profiles('.folded')
+        self.assertIn('-uanon', folded)
+        with open(os.path.join(self.profile_dir, folded)) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertIn('slow_view (test_profiling.py', stack)
+        self.assertGreater(int(count), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,23 +1,25 @@
 import json
+import os
 import unittest
+from unittest import mock
 from datetime import datetime, date, timedelta
 from app import create_app
 from app.extensions import db
 from app.models.user import User
 from app.models.study_models import Course, PracticeQuestion
-from app.models.progress_models import StudyProgress, DailyStudy, StudySession, Todo
+from app.models.progress_models import StudyProgress, DailyStudy, StudySession, StudyRollup, Todo
+from app import rollups
 from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 
 class ProgressTestCase(unittest.TestCase):
     """Test case for the progress blueprint."""
 
     def setUp(self):
         """Set up test client and initialize test database."""
-        self.app = create_app()
-        self.app.config.update({
-            'TESTING': True,
-            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
-        })
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
         self.client = self.app.test_client()
         
         with self.app.app_context():
@@ -27,10 +29,12 @@ class ProgressTestCase(unittest.TestCase):
             self.user = User(username='testuser', email='test@example.com')
             self.user.password = 'testpassword'
             db.session.add(self.user)
+            db.session.flush()
             
             # Create a test course
             self.course = Course(title='Test Course', description='Test Description', user_id=self.user.id)
             db.session.add(self.course)
+            db.session.flush()
             
             # Create a test question
             self.question = PracticeQuestion(
@@ -82,6 +86,82 @@ class ProgressTestCase(unittest.TestCase):
             self.assertIsNotNone(progress)
             self.assertEqual(progress.confidence_level, 2)
     
+    def test_record_question_progress_upserts(self):
+        """Test that rating a question again updates its single progress row."""
+        for level in (1, 3):
+            res = self.client.post(
+                '/api/question-progress',
+                headers=self.headers,
+                data=json.dumps({'question_id': self.question.id, 'confidence_level': level})
+            )
+            self.assertEqual(res.status_code, 200)
+        
+        with self.app.app_context():
+            rows = StudyProgress.query.filter_by(user_id=self.user.id, question_id=self.question.id).all()
+            self.assertEqual([row.confidence_level for row in rows], [3])
+            self.assertEqual(rows[0].course_id, self.course.id)
+            self.assertIsNotNone(rows[0].created_at)
+    
+    def test_record_question_progress_requires_access(self):
+        """Test that another user's question cannot be rated."""
+        with self.app.app_context():
+            other = User(username='other', email='other@example.com', password_hash='x')
+            db.session.add(other)
+            db.session.flush()
+            course = Course(title='Other Course', user_id=other.id)
+            db.session.add(course)
+            db.session.flush()
+            question = PracticeQuestion(question='Other?', answer='A', course_id=course.id)
+            db.session.add(question)
+            db.session.commit()
+            question_id = question.id
+        
+        res = self.client.post(
+            '/api/question-progress',
+            headers=self.headers,
+            data=json.dumps({'question_id': question_id, 'confidence_level': 2})
+        )
+        self.assertEqual(res.status_code, 404)
+        with self.app.app_context():
+            self.assertEqual(StudyProgress.query.count(), 0)
+    
+    def test_record_question_progress_batch(self):
+        """Test recording many ratings in one request, skipping unknown questions."""
+        with self.app.app_context():
+            questions = [PracticeQuestion(question=f'Q{i}?', answer='A', course_id=self.course.id) for i in range(3)]
+            db.session.add_all(questions)
+            db.session.add(StudyProgress(user_id=self.user.id, course_id=self.course.id, question_id=self.question.id, confidence_level=1))
+            db.session.commit()
+            question_ids = [question.id for question in questions]
+        
+        ratings = [{'question_id': question_id, 'confidence_level': 2} for question_id in question_ids]
+        ratings += [
+            {'question_id': self.question.id, 'confidence_level': 2},
+            {'question_id': self.question.id, 'confidence_level': 3},
+            {'question_id': 9999, 'confidence_level': 1}
+        ]
+        res, queries = self.count_queries(lambda: self.client.post(
+            '/api/question-progress/batch',
+            headers=self.headers,
+            data=json.dumps({'ratings': ratings})
+        ))
+        
+        data = res.get_json()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['recorded'], 4)
+        self.assertEqual(data['not_found'], [9999])
+        self.assertEqual(queries, 1)
+        with self.app.app_context():
+            levels = dict(db.session.query(StudyProgress.question_id, StudyProgress.confidence_level).all())
+            self.assertEqual(levels, {**dict.fromkeys(question_ids, 2), self.question.id: 3})
+        
+        res = self.client.post(
+            '/api/question-progress/batch',
+            headers=self.headers,
+            data=json.dumps({'ratings': [{'question_id': self.question.id, 'confidence_level': 5}]})
+        )
+        self.assertEqual(res.status_code, 400)
+    
     def test_start_study_session(self):
         """Test starting a study session."""
         res = self.client.post(
@@ -146,6 +226,174 @@ class ProgressTestCase(unittest.TestCase):
             ).first()
             self.assertIsNotNone(daily_study)
             self.assertEqual(daily_study.total_minutes, updated_session.duration_minutes)
+            
+            # Check that the rollup was updated with it
+            rollup = StudyRollup.query.filter_by(user_id=self.user.id).first()
+            self.assertEqual(rollup.current_streak, 1)
+            self.assertEqual(rollup.last_study_date, date.today())
+            self.assertEqual(rollup.minutes_7d, updated_session.duration_minutes)
+    
+    def end_session(self, minutes):
+        """Start a session `minutes` ago and end it through the API."""
+        with self.app.app_context():
+            session = StudySession(
+                user_id=self.user.id,
+                start_time=datetime.utcnow() - timedelta(minutes=minutes)
+            )
+            db.session.add(session)
+            db.session.commit()
+            session_id = session.id
+        return self.client.post(f'/api/study-session/{session_id}/end', headers=self.headers)
+    
+    def test_rollup_streaks_follow_session_ends(self):
+        """Test that ending sessions extends the streak and keeps the longest one."""
+        with self.app.app_context():
+            # A finished 5-day run, then a gap, then yesterday
+            for day in [1] + list(range(10, 15)):
+                db.session.add(DailyStudy(user_id=self.user.id, study_date=date.today() - timedelta(days=day), total_minutes=20))
+            db.session.commit()
+            rollups.rebuild_all()
+            rollup = rollups.get_rollup(self.user.id)
+            self.assertEqual((rollup.current_streak, rollup.longest_streak), (1, 5))
+            self.assertEqual(rollup.minutes_7d, 20)
+            self.assertEqual(rollup.minutes_30d, 120)
+        
+        self.end_session(30)
+        self.end_session(15)
+        
+        data = self.client.get('/api/weekly-progress', headers=self.headers).get_json()
+        self.assertEqual(data['streak'], 2)
+        self.assertEqual(data['longest_streak'], 5)
+        self.assertEqual(data['weekly_data']['values'][-1], 0.75)
+        self.assertEqual(data['minutes_last_30_days'], 165)
+        with self.app.app_context():
+            rollup = rollups.get_rollup(self.user.id)
+            self.assertEqual(rollup.minutes_7d, 65)
+            self.assertEqual(rollup.current_streak, 2)
+    
+    def test_rebuild_rollups_command(self):
+        """Test that the CLI command recomputes rollups from daily study records."""
+        with self.app.app_context():
+            for day in range(4):
+                db.session.add(DailyStudy(user_id=self.user.id, study_date=date.today() - timedelta(days=day), total_minutes=10))
+            db.session.commit()
+        
+        result = self.app.test_cli_runner().invoke(args=['rebuild-rollups'])
+        
+        self.assertIn('Rebuilt study rollups for 1 users', result.output)
+        with self.app.app_context():
+            rollup = rollups.get_rollup(self.user.id)
+            self.assertEqual(rollup.current_streak, 4)
+            self.assertEqual(rollup.longest_streak, 4)
+            self.assertEqual(rollup.minutes_30d, 40)
+    
+    def test_get_todos_newest_first(self):
+        """Test that todos page newest first and the cursor continues from there."""
+        with self.app.app_context():
+            db.session.add_all([
+                Todo(user_id=self.user.id, text=f'Todo {i}', created_at=datetime(2024, 1, 1 + i))
+                for i in range(3)
+            ])
+            db.session.commit()
+        
+        first = self.client.get('/api/progress/todos?limit=2', headers=self.headers).get_json()
+        self.assertEqual([todo['text'] for todo in first['items']], ['Todo 2', 'Todo 1'])
+        
+        second = self.client.get(f"/api/progress/todos?limit=2&cursor={first['next_cursor']}", headers=self.headers).get_json()
+        self.assertEqual([todo['text'] for todo in second['items']], ['Todo 0'])
+        self.assertIsNone(second['next_cursor'])
+    
+    def count_queries(self, func):
+        """Run func and return (result, number of SQL statements it executed)."""
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = func()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return result, len(statements)
+    
+    def seed_progress(self, course_count, streak_days):
+        """Add courses with rated questions and an unbroken run of study days."""
+        with self.app.app_context():
+            for i in range(course_count):
+                course = Course(title=f'Course {i}', user_id=self.user.id)
+                db.session.add(course)
+                db.session.flush()
+                question = PracticeQuestion(question='Q?', answer='A', course_id=course.id)
+                db.session.add(question)
+                db.session.flush()
+                db.session.add(StudyProgress(
+                    user_id=self.user.id,
+                    course_id=course.id,
+                    question_id=question.id,
+                    confidence_level=i % 3 + 1
+                ))
+            for day in range(streak_days):
+                db.session.add(DailyStudy(
+                    user_id=self.user.id,
+                    study_date=date.today() - timedelta(days=day),
+                    total_minutes=30
+                ))
+            db.session.commit()
+            # Rows added directly bypass the rollup, as after a backfill
+            rollups.rebuild_all()
+    
+    def test_weekly_progress(self):
+        """Test the weekly totals, confidence distribution, performance and streak."""
+        with self.app.app_context():
+            second_question = PracticeQuestion(question='Second?', answer='Yes', course_id=self.course.id)
+            db.session.add(second_question)
+            db.session.flush()
+            db.session.add_all([
+                StudyProgress(user_id=self.user.id, course_id=self.course.id, question_id=self.question.id, confidence_level=3),
+                StudyProgress(user_id=self.user.id, course_id=self.course.id, question_id=second_question.id, confidence_level=2),
+                DailyStudy(user_id=self.user.id, study_date=date.today(), total_minutes=90),
+                DailyStudy(user_id=self.user.id, study_date=date.today() - timedelta(days=1), total_minutes=30),
+                # A gap two days ago ends the streak; this day still counts for the week
+                DailyStudy(user_id=self.user.id, study_date=date.today() - timedelta(days=3), total_minutes=60),
+                # Outside the 7-day window
+                DailyStudy(user_id=self.user.id, study_date=date.today() - timedelta(days=10), total_minutes=600)
+            ])
+            db.session.add(Course(title='Empty Course', user_id=self.user.id))
+            db.session.commit()
+        
+        res = self.client.get('/api/weekly-progress', headers=self.headers)
+        
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(data['weekly_data']['labels']), 7)
+        self.assertEqual(data['weekly_data']['labels'][-1], date.today().isoformat())
+        self.assertEqual(data['weekly_data']['values'][-1], 1.5)
+        self.assertEqual(data['total_hours'], 3.0)
+        self.assertEqual(data['streak'], 2)
+        self.assertEqual(data['confidence_distribution'], {'low': 0, 'medium': 1, 'high': 1})
+        self.assertEqual(data['course_performance'], [
+            {'id': self.course.id, 'title': 'Test Course', 'performance': 83.3},
+            {'id': self.course.id + 1, 'title': 'Empty Course', 'performance': 0}
+        ])
+    
+    def test_weekly_progress_query_count_is_constant(self):
+        """Test that more courses and a longer streak do not add queries."""
+        self.seed_progress(course_count=2, streak_days=3)
+        res, small = self.count_queries(lambda: self.client.get('/api/weekly-progress', headers=self.headers))
+        self.assertEqual(res.get_json()['streak'], 3)
+        
+        self.seed_progress(course_count=30, streak_days=0)
+        with self.app.app_context():
+            for day in range(3, 120):
+                db.session.add(DailyStudy(user_id=self.user.id, study_date=date.today() - timedelta(days=day), total_minutes=15))
+            db.session.commit()
+            rollups.rebuild_all()
+        res, large = self.count_queries(lambda: self.client.get('/api/weekly-progress', headers=self.headers))
+        
+        self.assertEqual(res.get_json()['streak'], 120)
+        self.assertEqual(len(res.get_json()['course_performance']), 33)
+        self.assertEqual(small, large)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import json
+import os
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.study_models import Course, Note, PracticeQuestion
+from app.query_stats import query_stats
+from flask_jwt_extended import create_access_token
+
+class QueryStatsTestCase(unittest.TestCase):
+    """Test case for query counting, pinning what each read endpoint runs.
+
+    Every course has several notes and questions, so a per-row query
+    anywhere shows up as a count above the pin.
+    """
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        # Requests share this context, so their queries reach the counters
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        # Create a test user with three populated courses
+        user = User(username='testuser', email='test@example.com')
+        user.password = 'testpassword'
+        db.session.add(user)
+        db.session.flush()
+        courses = [Course(title=f'Course {i}', user_id=user.id) for i in range(3)]
+        db.session.add_all(courses)
+        db.session.flush()
+        for course in courses:
+            db.session.add_all([Note(title=f'Note {i}', content='Cells and mitochondria', course_id=course.id) for i in range(5)])
+            db.session.add_all([PracticeQuestion(question=f'Q{i}?', answer='A', course_id=course.id) for i in range(5)])
+        db.session.commit()
+        self.course_id = courses[0].id
+
+        self.headers = {
+            'Authorization': f'Bearer {create_access_token(identity=user.id)}',
+            'Content-Type': 'application/json'
+        }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def assert_queries(self, url, limit, **kwargs):
+        with query_stats.assert_max_queries(limit):
+            res = self.client.get(url, headers=self.headers, **kwargs)
+        self.assertEqual(res.status_code, 200, url)
+        return res
+
+    def test_list_endpoints(self):
+        """Test that list and detail endpoints run a fixed number of queries."""
+        # The first read of a version scope also records it: one extra insert
+        self.assert_queries('/api/courses/', 3)
+        self.assert_queries(f'/api/courses/{self.course_id}', 3)
+        self.assert_queries(f'/api/course/{self.course_id}/notes', 3)
+        self.assert_queries(f'/api/course/{self.course_id}/questions', 3)
+        self.assert_queries('/api/progress/todos', 3)
+
+    def test_progress_and_study_endpoints(self):
+        """Test the dashboard, review and search endpoints."""
+        self.assert_queries('/api/progress/weekly-progress', 9)  # Builds the rollup on first read
+        self.assert_queries('/api/progress/weekly-progress', 3)
+        self.assert_queries('/api/review/next?n=10', 2)
+        self.assert_queries('/api/search?q=mitochondria', 2)
+
+    def test_not_modified_runs_one_query(self):
+        """Test that a conditional GET that matches costs a single lookup."""
+        etag = self.client.get('/api/courses/', headers=self.headers).get_etag()[0]
+        with query_stats.assert_max_queries(1):
+            res = self.client.get('/api/courses/', headers={**self.headers, 'If-None-Match': f'"{etag}"'})
+        self.assertEqual(res.status_code, 304)
+
+    def test_assert_max_queries_fails_over_limit(self):
+        """Test that the helper fails and lists the statements that ran."""
+        with self.assertRaises(AssertionError) as raised:
+            with query_stats.assert_max_queries(1):
+                self.client.get(f'/api/course/{self.course_id}/notes', headers=self.headers)
+        self.assertIn('4 queries run, at most 1 expected', str(raised.exception))
+        self.assertIn('FROM notes', str(raised.exception))
+
+    def test_debug_headers(self):
+        """Test that query counts are sent as headers only when enabled."""
+        res = self.client.get('/api/courses/', headers=self.headers)
+        self.assertNotIn('X-Query-Count', res.headers)
+
+        self.app.config['QUERY_STATS_HEADERS'] = True
+        res = self.client.get('/api/courses/', headers=self.headers)
+        self.assertEqual(res.headers['X-Query-Count'], '2')
+        self.assertIn('X-Query-Time-Ms', res.headers)
+        self.assertTrue(res.headers['Server-Timing'].startswith('db;'))
+
+    def test_logs_over_budget_and_repeated_statements(self):
+        """Test that a request over budget, or repeating a statement, is logged."""
+        @self.app.route('/test/n-plus-one')
+        def n_plus_one():
+            titles = [Course.query.filter_by(id=note.course_id).first().title for note in Note.query.all()]
+            return json.dumps(titles)
+
+        self.app.config.update({'QUERY_BUDGET': 5, 'QUERY_REPEAT_THRESHOLD': 3})
+        with self.assertLogs(self.app.logger, 'WARNING') as logs:
+            self.client.get('/test/n-plus-one')
+        output = '\n'.join(logs.output)
+        self.assertIn('GET /test/n-plus-one ran 16 queries', output)
+        self.assertIn('ran the same statement 15 times (possible N+1)', output)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,17 @@
 import json
+import os
+import re
+import threading
+import time
 import unittest
 from unittest.mock import patch
 from app import create_app
 from app.extensions import db
+from app.ai_cache import completion_cache
+from app.ai_providers import Completion
 from app.models.user import User
 from app.models.study_models import Course, PracticeQuestion
+from app.models.progress_models import ReviewCard
 from flask_jwt_extended import create_access_token
 
 class QuestionsTestCase(unittest.TestCase):
@@ -12,13 +19,17 @@ class QuestionsTestCase(unittest.TestCase):
 
     def setUp(self):
         """Set up test client and initialize test database."""
-        self.app = create_app()
+        with patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
         self.app.config.update({
             'TESTING': True,
-            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
+            'AI_PROVIDER': 'stub',
+            'AI_FANOUT_CONCURRENCY': 4
         })
         self.client = self.app.test_client()
         
+        completion_cache.clear_memory()
+        
         with self.app.app_context():
             db.create_all()
             
@@ -26,6 +37,7 @@ class QuestionsTestCase(unittest.TestCase):
             self.user = User(username='testuser', email='test@example.com')
             self.user.password = 'testpassword'
             db.session.add(self.user)
+            db.session.flush()
             
             # Create a test course
             self.course = Course(title='Test Course', description='Test Description', user_id=self.user.id)
@@ -84,8 +96,84 @@ class QuestionsTestCase(unittest.TestCase):
         res = self.client.get(f'/api/course/{self.course.id}/questions', headers=self.headers)
         
         # Check response
-        data = json.loads(res.data)
+        data = json.loads(res.data)['items']
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(data), 2)
         self.assertEqual(data[0]['question'], 'Q1?')
-        self.assertEqual(data[1]['question'], 'Q2?')
\ No newline at end of file
+        self.assertEqual(data[1]['question'], 'Q2?')
+    
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_generate_questions_batch(self, mock_complete):
+        """Test concurrent generation across topics with one failing topic."""
+        lock = threading.Lock()
+        in_flight = {'now': 0, 'peak': 0}
+        
+        def fake_completion(prompt, **kwargs):
+            topic = re.search(r'Topic: (.+)', prompt).group(1).strip()
+            with lock:
+                in_flight['now'] += 1
+                in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+            time.sleep(0.05)
+            with lock:
+                in_flight['now'] -= 1
+            if topic == 'Broken':
+                raise RuntimeError("provider unavailable")
+            questions = [
+                {'question': f'{topic} Q{i}?', 'answer': f'{topic} A{i}', 'difficulty': 'hard'}
+                for i in range(3)
+            ]
+            return Completion(json.dumps(questions), 100, 100)
+        
+        mock_complete.side_effect = fake_completion
+        topics = [f'Topic {i}' for i in range(7)] + ['Broken']
+        
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-questions/batch',
+            headers=self.headers,
+            data=json.dumps({'topics': topics, 'count': 2})
+        )
+        
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(data['questions']), 14)
+        self.assertEqual([t['topic'] for t in data['topics']], topics)
+        self.assertEqual(data['topics'][-1]['status'], 'failed')
+        self.assertEqual(data['topics'][-1]['error'], 'provider unavailable')
+        self.assertTrue(all(t['latency_ms'] >= 50 for t in data['topics']))
+        
+        # Calls overlap, but never beyond the configured limit
+        self.assertGreater(in_flight['peak'], 1)
+        self.assertLessEqual(in_flight['peak'], 4)
+        
+        with self.app.app_context():
+            self.assertEqual(PracticeQuestion.query.filter_by(course_id=self.course.id).count(), 14)
+            self.assertEqual(PracticeQuestion.query.filter_by(question='Topic 0 Q1?').first().difficulty, 'hard')
+            # The bulk insert queues each question for review
+            self.assertEqual(ReviewCard.query.filter_by(course_id=self.course.id, due_at=None).count(), 14)
+    
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_generate_questions_batch_all_failed(self, mock_complete):
+        """Test that a batch where every topic fails saves nothing."""
+        mock_complete.return_value = Completion("Sorry, I can't help.", 100, 5)
+        
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-questions/batch',
+            headers=self.headers,
+            data=json.dumps({'topics': ['Cells', 'Genes']})
+        )
+        
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 502)
+        self.assertEqual({t['status'] for t in data['topics']}, {'failed'})
+        with self.app.app_context():
+            self.assertEqual(PracticeQuestion.query.count(), 0)
+    
+    def test_generate_questions_batch_validation(self):
+        """Test that the topic list is required and bounded."""
+        url = f'/api/course/{self.course.id}/generate-questions/batch'
+        
+        res = self.client.post(url, headers=self.headers, data=json.dumps({'topics': 'Cells'}))
+        self.assertEqual(res.status_code, 400)
+        
+        res = self.client.post(url, headers=self.headers, data=json.dumps({'topics': [f'T{i}' for i in range(31)]}))
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.study_models import Course
+from app.models.progress_models import StudyRollup
+from app.replicas import STICKY_COOKIE, replica_router
+from flask_jwt_extended import create_access_token
+
+class ReplicaRoutingTestCase(unittest.TestCase):
+    """Test case for read-replica routing, with two SQLite files.
+
+    Nothing replicates between the files, so each test can tell from the
+    data which database a request read.
+    """
+
+    def setUp(self):
+        """Create a primary and a replica database holding different course titles."""
+        self.directory = tempfile.mkdtemp()
+        environ = {
+            'DATABASE_URL': f"sqlite:///{os.path.join(self.directory, 'primary.db')}",
+            'DATABASE_REPLICA_URL': f"sqlite:///{os.path.join(self.directory, 'replica.db')}"
+        }
+        with mock.patch.dict(os.environ, environ):
+            self.app = create_app()
+        # The bind registered a metadata on the shared db; later apps have no replica
+        self.addCleanup(db.metadatas.pop, 'replica', None)
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines['replica'])
+            for engine, title in ((db.engines[None], 'On primary'), (db.engines['replica'], 'On replica')):
+                with engine.begin() as connection:
+                    connection.execute(User.__table__.insert(), {'id': 1, 'username': 'testuser', 'email': 'test@example.com', 'password_hash': 'x'})
+                    connection.execute(Course.__table__.insert(), {'id': 1, 'title': title, 'user_id': 1})
+            self.headers = {
+                'Authorization': f'Bearer {create_access_token(identity=1)}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def course_titles(self):
+        res = self.client.get('/api/courses/', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        return [course['title'] for course in res.get_json()['items']]
+
+    def test_get_reads_from_replica(self):
+        """Test that GET handlers read the replica."""
+        self.assertEqual(self.course_titles(), ['On replica'])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        """Test that a user's reads see their own write, then return to the replica."""
+        res = self.client.post('/api/courses/', json={'title': 'New Course'}, headers=self.headers)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.course_titles(), ['On primary', 'New Course'])
+
+        # The window travels in the cookie, so a fresh process honours it
+        cookie = res.headers['Set-Cookie'].split(';')[0]
+        self.assertTrue(cookie.startswith(f'{STICKY_COOKIE}='))
+        with self.app.test_request_context(headers={'Cookie': cookie}):
+            self.assertTrue(replica_router.is_sticky(1))
+            # It only covers the user who wrote
+            self.assertFalse(replica_router.is_sticky(2))
+
+        # Other clients, without the cookie, still read the replica
+        other_client = self.app.test_client()
+        res = other_client.get('/api/courses/', headers=self.headers)
+        self.assertEqual(res.get_json()['items'][0]['title'], 'On replica')
+
+        self.app.config['DB_REPLICA_STICKY_SECONDS'] = 0
+        self.client.put('/api/courses/1', json={'description': 'Edited'}, headers=self.headers)
+        self.assertEqual(self.course_titles(), ['On replica'])
+
+    def test_forged_cookie_is_ignored(self):
+        """Test that a cookie not signed with the app's key does not pin reads to the primary."""
+        self.client.set_cookie('localhost', STICKY_COOKIE, '[1, 9999999999]')
+        self.assertEqual(self.course_titles(), ['On replica'])
+
+    def test_writes_in_a_get_go_to_the_primary(self):
+        """Test that a GET which builds a missing row writes it to the primary."""
+        res = self.client.get('/api/progress/weekly-progress', headers=self.headers)
+        self.assertEqual(res.status_code, 200)
+        with self.app.app_context():
+            self.assertIsNotNone(db.session.get(StudyRollup, 1))
+            with db.engines['replica'].connect() as connection:
+                self.assertIsNone(connection.execute(StudyRollup.__table__.select()).first())
+
+    def test_outside_requests_use_the_primary(self):
+        """Test that jobs and commands, which run outside a request, use the primary."""
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Course, 1).title, 'On primary')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import os
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.study_models import Course, PracticeQuestion
+from app.models.progress_models import ReviewCard
+from app.review import schedule
+from flask_jwt_extended import create_access_token
+
+class ScheduleTestCase(unittest.TestCase):
+    """Test case for the SM-2 scheduling rule."""
+
+    def test_intervals_grow_with_ease(self):
+        """Test the 1, 6, then interval * ease progression."""
+        now = datetime(2024, 1, 1)
+        card = None
+        intervals = []
+        for _ in range(3):
+            card = schedule(card, 4, now)
+            intervals.append(card['interval_days'])
+        self.assertEqual(intervals, [1, 6, 15.0])
+        self.assertEqual(card['due_at'], now + timedelta(days=15))
+        self.assertEqual(card['ease'], 2.5)
+
+    def test_lapse_resets_and_lowers_ease(self):
+        """Test that a failed answer restarts the run and ease never drops below 1.3."""
+        card = {'ease': 1.4, 'interval_days': 40, 'repetitions': 5, 'lapses': 0}
+        card = schedule(card, 0, datetime(2024, 1, 1))
+        self.assertEqual((card['interval_days'], card['repetitions'], card['lapses']), (1, 0, 1))
+        self.assertEqual(card['ease'], 1.3)
+
+class ReviewTestCase(unittest.TestCase):
+    """Test case for the review blueprint."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create a test user
+            self.user = User(username='testuser', email='test@example.com')
+            self.user.password = 'testpassword'
+            db.session.add(self.user)
+            db.session.flush()
+
+            # Create two courses with questions
+            self.course = Course(title='Test Course', user_id=self.user.id)
+            self.other_course = Course(title='Other Course', user_id=self.user.id)
+            db.session.add_all([self.course, self.other_course])
+            db.session.flush()
+            questions = [PracticeQuestion(question=f'Q{i}?', answer='A', course_id=self.course.id) for i in range(4)]
+            questions.append(PracticeQuestion(question='Other?', answer='A', course_id=self.other_course.id))
+            db.session.add_all(questions)
+            db.session.commit()
+            self.question_ids = [question.id for question in questions]
+
+            # Create a JWT token for the test user
+            self.access_token = create_access_token(identity=self.user.id)
+            self.headers = {
+                'Authorization': f'Bearer {self.access_token}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def answer(self, answers):
+        return self.client.post('/api/review/answers', headers=self.headers, data=json.dumps({'answers': answers}))
+
+    def test_new_questions_then_due_cards(self):
+        """Test that unseen questions are served until cards fall due, due cards first."""
+        data = self.client.get('/api/review/next?n=3', headers=self.headers).get_json()
+        self.assertEqual([card['question_id'] for card in data['cards']], self.question_ids[:3])
+        self.assertTrue(all(card['new'] for card in data['cards']))
+
+        res = self.answer([
+            {'question_id': self.question_ids[0], 'grade': 5},
+            {'question_id': self.question_ids[1], 'grade': 1},
+            {'question_id': 9999, 'grade': 4}
+        ])
+        data = res.get_json()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['reviewed'], 2)
+        self.assertEqual(data['not_found'], [9999])
+
+        # Nothing is due yet, so the remaining new questions come next
+        data = self.client.get('/api/review/next?n=10', headers=self.headers).get_json()
+        self.assertEqual([card['question_id'] for card in data['cards']], self.question_ids[2:])
+
+        # Once both cards are due, the one due longest comes first
+        with self.app.app_context():
+            cards = {card.question_id: card for card in ReviewCard.query.all()}
+            cards[self.question_ids[0]].due_at = datetime.utcnow() - timedelta(days=1)
+            cards[self.question_ids[1]].due_at = datetime.utcnow() - timedelta(days=2)
+            db.session.commit()
+        data = self.client.get('/api/review/next?n=3', headers=self.headers).get_json()
+        self.assertEqual(
+            [(card['question_id'], card['new']) for card in data['cards']],
+            [(self.question_ids[1], False), (self.question_ids[0], False), (self.question_ids[2], True)]
+        )
+
+    def test_answers_update_cards_in_place(self):
+        """Test that answering again reschedules the existing card."""
+        for grade in (4, 4):
+            self.answer([{'question_id': self.question_ids[0], 'grade': grade}])
+
+        with self.app.app_context():
+            cards = ReviewCard.query.filter_by(user_id=self.user.id, question_id=self.question_ids[0]).all()
+            self.assertEqual(len(cards), 1)
+            self.assertEqual((cards[0].repetitions, cards[0].interval_days), (2, 6))
+            self.assertEqual(cards[0].course_id, self.course.id)
+
+        for grade in (7, True, 4.0):
+            self.assertEqual(self.answer([{'question_id': self.question_ids[0], 'grade': grade}]).status_code, 400)
+
+    def test_course_scoping(self):
+        """Test that course_id limits the queue to that course."""
+        data = self.client.get(f'/api/review/next?course_id={self.other_course.id}', headers=self.headers).get_json()
+        self.assertEqual([card['question_id'] for card in data['cards']], [self.question_ids[4]])
+
+    def test_questions_start_as_new_cards(self):
+        """Test that created and imported questions queue new cards, and deleted questions lose theirs."""
+        res = self.client.post(f'/api/course/{self.course.id}/questions/import', headers={
+            **self.headers, 'Content-Type': 'application/x-ndjson'
+        }, data='\n'.join(json.dumps({'question': f'Imported {i}?', 'answer': 'A'}) for i in range(3)))
+        self.assertEqual(res.get_json()['imported'], 3)
+        res = self.client.post(f'/api/course/{self.course.id}/questions', headers=self.headers,
+                               data=json.dumps({'question': 'Created?', 'answer': 'A'}))
+
+        with self.app.app_context():
+            cards = ReviewCard.query.filter_by(user_id=self.user.id).all()
+            self.assertEqual(len(cards), len(self.question_ids) + 4)
+            self.assertTrue(all(card.due_at is None for card in cards))
+
+        data = self.client.get('/api/review/next?n=100', headers=self.headers).get_json()
+        self.assertEqual(len(data['cards']), len(self.question_ids) + 4)
+        self.assertTrue(all(card['new'] for card in data['cards']))
+
+        self.assertEqual(res.status_code, 201)
+        self.client.delete(f'/api/courses/{self.other_course.id}', headers=self.headers)
+        with self.app.app_context():
+            self.assertIsNone(ReviewCard.query.filter_by(question_id=self.question_ids[4]).first())
+
+    def test_new_card_query_uses_index(self):
+        """Test that the new-card fill is an index range scan, not an anti-join over every question."""
+        with self.app.app_context():
+            query = (
+                select(ReviewCard.id)
+                .where(ReviewCard.user_id == self.user.id, ReviewCard.due_at.is_(None))
+                .order_by(ReviewCard.id)
+                .limit(20)
+            )
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = ' '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}')))
+        self.assertIn('ix_review_cards_user_due', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_due_query_uses_index(self):
+        """Test that the due queue is an index range scan, not a table scan."""
+        with self.app.app_context():
+            query = (
+                select(ReviewCard.id)
+                .where(ReviewCard.user_id == self.user.id, ReviewCard.due_at <= datetime.utcnow())
+                .order_by(ReviewCard.due_at)
+                .limit(20)
+            )
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = ' '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}')))
+        self.assertIn('ix_review_cards_user_due', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+if __name__ == '__main__':
+    unittest.main()
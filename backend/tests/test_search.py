@@ -0,0 +1,163 @@
+import json
+import os
+import unittest
+from unittest import mock
+from app import create_app
+from app import versions
+from app.extensions import db
+from app.models.user import User
+from app.models.study_models import Course, Note, PracticeQuestion
+from flask_jwt_extended import create_access_token
+
+class SearchTestCase(unittest.TestCase):
+    """Test case for full-text search, run against the FTS5 index."""
+
+    backend = 'fts5'
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'SEARCH_BACKEND': self.backend
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            # Create a test user
+            self.user = User(username='testuser', email='test@example.com')
+            self.user.password = 'testpassword'
+            db.session.add(self.user)
+            db.session.flush()
+
+            # Create two test courses
+            self.biology = Course(title='Biology', user_id=self.user.id)
+            self.history = Course(title='History', user_id=self.user.id)
+            db.session.add_all([self.biology, self.history])
+            db.session.flush()
+
+            db.session.add_all([
+                Note(title='Cells', content='Mitochondria are the powerhouse of the cell. Mitochondria make ATP.', course_id=self.biology.id),
+                Note(title='Plants', content='Photosynthesis happens in chloroplasts, not mitochondria.', course_id=self.biology.id),
+                PracticeQuestion(question='What do mitochondria produce?', answer='ATP', course_id=self.biology.id),
+                Note(title='Rome', content='The Roman Republic became an empire.', course_id=self.history.id)
+            ])
+            db.session.commit()
+
+            # Create a JWT token for the test user
+            self.access_token = create_access_token(identity=self.user.id)
+            self.headers = {
+                'Authorization': f'Bearer {self.access_token}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def search(self, query, **params):
+        res = self.client.get('/api/search', headers=self.headers, query_string={'q': query, **params})
+        self.assertEqual(res.status_code, 200)
+        data = res.get_json()
+        self.assertEqual(data['backend'], self.backend)
+        return data['results']
+
+    def test_ranked_results_with_snippets(self):
+        """Test that matches come back best first with highlighted snippets."""
+        results = self.search('mitochondria')
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual((results[0]['type'], results[0]['title']), ('note', 'Cells'))
+        self.assertIn('question', {result['type'] for result in results})
+        self.assertIn('<mark>Mitochondria</mark>', results[0]['snippet'])
+        self.assertGreaterEqual(results[0]['score'], results[-1]['score'])
+
+    def test_prefix_and_all_terms(self):
+        """Test that the last term matches as a prefix and every term must match."""
+        self.assertEqual([result['title'] for result in self.search('photosynth')], ['Plants'])
+        self.assertEqual([result['title'] for result in self.search('mitochondria chloroplasts')], ['Plants'])
+        self.assertEqual(self.search('mitochondria empire'), [])
+
+    def test_course_scoping(self):
+        """Test course filtering and that other users' courses are never searched."""
+        self.assertEqual(self.search('roman', course_id=self.biology.id), [])
+        self.assertEqual(len(self.search('roman', course_id=self.history.id)), 1)
+
+        with self.app.app_context():
+            other = User(username='other', email='other@example.com', password_hash='x')
+            db.session.add(other)
+            db.session.flush()
+            course = Course(title='Other', user_id=other.id)
+            db.session.add(course)
+            db.session.flush()
+            db.session.add(Note(title='Secret', content='Private roman notes', course_id=course.id))
+            db.session.commit()
+            other_course_id = course.id
+
+        self.assertEqual(len(self.search('roman')), 1)
+        res = self.client.get('/api/search', headers=self.headers, query_string={'q': 'roman', 'course_id': other_course_id})
+        self.assertEqual(res.status_code, 404)
+
+    def test_index_follows_writes(self):
+        """Test that creates, updates, deletes and bulk imports are searchable at once."""
+        # Build the index before writing, so the writes must update it
+        self.assertEqual(self.search('glycolysis'), [])
+
+        res = self.client.post(
+            f'/api/course/{self.biology.id}/notes',
+            headers=self.headers,
+            data=json.dumps({'title': 'Energy', 'content': 'Glycolysis splits glucose.'})
+        )
+        note_id = res.get_json()['id']
+        self.assertEqual([result['id'] for result in self.search('glycolysis')], [note_id])
+
+        self.client.put(f'/api/notes/{note_id}', headers=self.headers, data=json.dumps({'content': 'The Krebs cycle.'}))
+        self.assertEqual(self.search('glycolysis'), [])
+        self.assertEqual(len(self.search('krebs')), 1)
+
+        self.client.delete(f'/api/notes/{note_id}', headers=self.headers)
+        self.assertEqual(self.search('krebs'), [])
+
+        self.client.post(
+            f'/api/course/{self.history.id}/questions/import',
+            headers={**self.headers, 'Content-Type': 'application/x-ndjson'},
+            data=json.dumps({'question': 'Who crossed the Rubicon?', 'answer': 'Caesar'})
+        )
+        self.assertEqual([result['type'] for result in self.search('rubicon')], ['question'])
+
+        self.client.delete(f'/api/courses/{self.biology.id}', headers=self.headers)
+        self.assertEqual(self.search('mitochondria'), [])
+
+    def test_requires_query(self):
+        """Test that an empty query is rejected."""
+        res = self.client.get('/api/search', headers=self.headers)
+        self.assertEqual(res.status_code, 400)
+
+class InvertedIndexSearchTestCase(SearchTestCase):
+    """The same tests against the pure-Python inverted index."""
+
+    backend = 'python'
+
+    def test_index_follows_other_processes(self):
+        """Test that writes committed outside this process's sessions are found through the course version."""
+        self.assertEqual(self.search('glycolysis'), [])
+
+        # Written the way another process would be seen: no session events
+        with self.app.app_context(), db.engine.begin() as conn:
+            conn.execute(Note.__table__.insert(), {'title': 'Energy', 'content': 'Glycolysis splits glucose.', 'course_id': self.biology.id})
+            conn.execute(Note.__table__.delete().where(Note.__table__.c.title == 'Rome'))
+            conn.execute(versions._bump_upsert(), [
+                {'scope': versions.course_scope(self.biology.id)},
+                {'scope': versions.course_scope(self.history.id)}
+            ])
+
+        self.assertEqual([result['title'] for result in self.search('glycolysis')], ['Energy'])
+        self.assertEqual(self.search('roman'), [])
+
+if __name__ == '__main__':
+    unittest.main()
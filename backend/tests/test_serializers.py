@@ -0,0 +1,68 @@
+import json
+import os
+import unittest
+from unittest import mock
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.extensions import db
+from app.json_provider import OrjsonProvider, orjson
+from app.models.user import User
+from app.models.study_models import Course
+from app.models.progress_models import Todo
+from app.serializers import course_serializer, todo_serializer
+
+class SerializerTestCase(unittest.TestCase):
+    """Test case for the shared response serializers."""
+
+    def setUp(self):
+        """Set up an app context with a test database."""
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(username='testuser', email='test@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        self.user_id = user.id
+        self.course = Course(title='Test Course', description='Desc', user_id=user.id)
+        db.session.add(self.course)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_rows_match_instances(self):
+        """Test that projected rows and mapped instances serialize the same way."""
+        row = db.session.execute(course_serializer.select()).one()
+        self.assertEqual(course_serializer.row(row), course_serializer.one(self.course))
+        self.assertEqual(course_serializer.rows([row]), [course_serializer.one(self.course)])
+        self.assertEqual(course_serializer.one(self.course)['created_at'], self.course.created_at.isoformat())
+
+    def test_optional_date_stays_none(self):
+        """Test that an empty date column serializes as None."""
+        db.session.add_all([
+            Todo(text='No due date', user_id=self.user_id),
+            Todo(text='Due', user_id=self.user_id, due_date=date(2024, 5, 1))
+        ])
+        db.session.commit()
+        rows = db.session.execute(todo_serializer.select().order_by(Todo.id)).all()
+        self.assertEqual([todo['due_date'] for todo in todo_serializer.rows(rows)], [None, '2024-05-01'])
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_provider_matches_default(self):
+        """Test that the orjson provider decodes to the same data as the default provider."""
+        data = {'b': [1, 2.5, None, True], 'a': 'café', 'when': datetime(2024, 1, 2, 3, 4, 5), 'day': date(2024, 1, 2)}
+        fast = OrjsonProvider(self.app).dumps(data)
+        default = DefaultJSONProvider(self.app).dumps(data)
+        self.assertEqual(json.loads(fast), json.loads(default))
+        self.assertLess(fast.index('"a"'), fast.index('"b"'))
+
+if __name__ == '__main__':
+    unittest.main()
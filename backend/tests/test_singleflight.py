@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import create_app
+from app.extensions import db
+from app.ai_cache import completion_cache, fingerprint
+from app.ai_providers import Completion
+from app.ai_service import AIService
+from app.models.ai_models import CompletionCacheEntry, InflightLock
+from app.models.user import User
+from app.singleflight import single_flight
+from flask_jwt_extended import create_access_token
+
+class SingleFlightTestCase(unittest.TestCase):
+    """Test case for coalescing identical in-flight AI requests."""
+
+    def setUp(self):
+        """Set up the app with the stub provider and empty caches."""
+        # A file, not :memory:, so each thread gets its own connection as processes would
+        self.directory = tempfile.mkdtemp()
+        with patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{os.path.join(self.directory, 'app.db')}"}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'AI_PROVIDER': 'stub',
+            'AI_SINGLEFLIGHT_POLL': 0.01
+        })
+        with self.app.app_context():
+            db.create_all()
+            CompletionCacheEntry.query.delete()
+            InflightLock.query.delete()
+            db.session.commit()
+        completion_cache.clear_memory()
+        self.baseline = single_flight.stats()
+
+    def tearDown(self):
+        """Clean up after the test."""
+        completion_cache.clear_memory()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def counter(self, name):
+        return single_flight.stats()[name] - self.baseline[name]
+
+    def run_in_app(self, func):
+        with self.app.app_context():
+            return func()
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_concurrent_identical_requests_share_one_call(self, mock_complete):
+        """Test that threads asking for the same notes wait for one provider call."""
+        def slow_completion(prompt, **kwargs):
+            time.sleep(0.2)
+            return Completion("Shared notes", 10, 2)
+        mock_complete.side_effect = slow_completion
+
+        results = []
+        def generate():
+            results.append(self.run_in_app(lambda: AIService().generate_notes('Biology', 'Cells')))
+
+        threads = [threading.Thread(target=generate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["Shared notes"] * 8)
+        self.assertEqual(mock_complete.call_count, 1)
+        self.assertEqual(self.counter('leaders'), 1)
+        self.assertEqual(self.counter('coalesced_local'), 7)
+        with self.app.app_context():
+            self.assertEqual(InflightLock.query.count(), 0)
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_errors_reach_every_waiter(self, mock_complete):
+        """Test that a failed shared call fails each waiter rather than retrying."""
+        def failing_completion(prompt, **kwargs):
+            time.sleep(0.1)
+            raise RuntimeError("provider unavailable")
+        mock_complete.side_effect = failing_completion
+
+        results = []
+        def generate():
+            results.append(self.run_in_app(lambda: AIService().generate_test_strategies('essay')))
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(mock_complete.call_count, 1)
+        self.assertTrue(all('provider unavailable' in result for result in results))
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_waits_for_another_process(self, mock_complete):
+        """Test that a lock held by another process is awaited and its result reused."""
+        with self.app.app_context():
+            ai_service = AIService()
+            prompt, max_tokens = ai_service.notes_prompt('Biology', 'Cells')
+            key = fingerprint(ai_service.model, prompt, max_tokens, 0.7)
+            db.session.add(InflightLock(
+                key=key,
+                owner='other-process',
+                expires_at=datetime.utcnow() + timedelta(seconds=30)
+            ))
+            db.session.commit()
+
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(self.run_in_app(lambda: AIService().generate_notes('Biology', 'Cells')))
+        )
+        waiter.start()
+        time.sleep(0.1)
+        self.assertEqual(results, [])
+
+        # The other process finishes: it caches its completion and drops the lock
+        with self.app.app_context():
+            completion_cache.set(key, "Notes from elsewhere", model=ai_service.model)
+            completion_cache.clear_memory()
+            InflightLock.query.delete()
+            db.session.commit()
+        waiter.join(5)
+
+        self.assertEqual(results, ["Notes from elsewhere"])
+        mock_complete.assert_not_called()
+        self.assertEqual(self.counter('coalesced_remote'), 1)
+
+    @patch('app.ai_providers.StubProvider.complete')
+    def test_expired_lock_is_taken_over(self, mock_complete):
+        """Test that a lock left by a crashed process does not block callers."""
+        mock_complete.return_value = Completion("Fresh notes", 10, 2)
+        with self.app.app_context():
+            ai_service = AIService()
+            prompt, max_tokens = ai_service.notes_prompt('Biology', 'Cells')
+            db.session.add(InflightLock(
+                key=fingerprint(ai_service.model, prompt, max_tokens, 0.7),
+                owner='crashed-process',
+                expires_at=datetime.utcnow() - timedelta(seconds=1)
+            ))
+            db.session.commit()
+
+            self.assertEqual(ai_service.generate_notes('Biology', 'Cells'), "Fresh notes")
+            self.assertEqual(InflightLock.query.count(), 0)
+        self.assertEqual(self.counter('leaders'), 1)
+
+    def test_stats_endpoint(self):
+        """Test that collapsed-call counters are exposed over the API."""
+        with self.app.app_context():
+            user = User(username='testuser', email='test@example.com')
+            user.password = 'testpassword'
+            db.session.add(user)
+            db.session.commit()
+            headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+        res = self.app.test_client().get('/api/ai/stats', headers=headers)
+        data = res.get_json()
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('coalesced', data['single_flight'])
+        self.assertIn('hit_rate', data['completion_cache'])
+
+if __name__ == '__main__':
+    unittest.main()
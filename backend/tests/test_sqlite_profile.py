@@ -0,0 +1,192 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from flask import jsonify, request
+from sqlalchemy import text
+from app import create_app, rollups, versions
+from app.ai_cache import completion_cache
+from app.extensions import db
+from app.models.ai_models import CompletionCacheEntry
+from app.models.study_models import Course, Note
+from app.models.user import User
+from app.passwords import password_hasher
+from app.sqlite_profile import fcntl
+from flask_jwt_extended import create_access_token
+
+class SQLiteProfileTestCase(unittest.TestCase):
+    """Test case for the SQLite production profile."""
+
+    def setUp(self):
+        """Create a directory for the database file."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'app.db')
+        self.app = None
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.app is not None:
+            with self.app.app_context():
+                db.session.remove()
+                for engine in db.engines.values():
+                    engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def make_app(self, database_url=None, **settings):
+        # Engines, and so the profile, are set up when the app is created
+        environ = {'DATABASE_URL': database_url or f'sqlite:///{self.path}', 'SQLITE_PROFILE': '1', **settings}
+        with mock.patch.dict(os.environ, environ):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+
+        @self.app.route('/test/transaction', methods=['GET', 'POST'])
+        def transaction():
+            # Start the transaction, then see what another connection can still do
+            db.session.execute(text('SELECT 1'))
+            if request.args.get('write'):
+                db.session.execute(text('CREATE TABLE IF NOT EXISTS scratch (x)'))
+            other_can_write, writer_lock_held = self.other_can_write(), self.writer_lock_held()
+            db.session.commit()
+            return jsonify({'other_can_write': other_can_write, 'writer_lock_held': writer_lock_held})
+
+        return self.app
+
+    def make_user(self):
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser', email='test@example.com')
+            user.password = 'testpassword'
+            db.session.add(user)
+            db.session.commit()
+            return user
+
+    def other_can_write(self):
+        other = sqlite3.connect(self.path, timeout=0)
+        try:
+            other.execute('BEGIN IMMEDIATE')
+            other.rollback()
+            return True
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            other.close()
+
+    def writer_lock_held(self):
+        if fcntl is None or not os.path.exists(self.path + '.writer-lock'):
+            return False
+        with open(self.path + '.writer-lock', 'a') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(f, fcntl.LOCK_UN)
+            return False
+
+    def pragma(self, name):
+        with self.app.app_context():
+            return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+    def test_pragmas_set_on_connect(self):
+        """Test that file databases get WAL and the tuned pragmas."""
+        self.make_app(SQLITE_BUSY_TIMEOUT='2500', SQLITE_CACHE_SIZE='1024')
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 2500)
+        self.assertEqual(self.pragma('mmap_size'), 256 * 1024 * 1024)
+        self.assertEqual(self.pragma('cache_size'), -1024)
+
+    def test_memory_database_keeps_its_journal(self):
+        """Test that an in-memory database is not switched to WAL."""
+        self.make_app('sqlite:///:memory:')
+        self.assertEqual(self.pragma('journal_mode'), 'memory')
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+    def test_write_lock_taken_at_first_write(self):
+        """Test that transactions only take the write lock once they write, whatever the method."""
+        client = self.make_app().test_client()
+        for method in (client.get, client.post):
+            self.assertTrue(method('/test/transaction').get_json()['other_can_write'])
+            result = method('/test/transaction?write=1').get_json()
+            self.assertFalse(result['other_can_write'])
+            self.assertFalse(result['writer_lock_held'])
+
+    @unittest.skipIf(fcntl is None, 'needs fcntl')
+    def test_single_writer_lock(self):
+        """Test that write transactions hold the shared writer lock until they end."""
+        client = self.make_app(SQLITE_SINGLE_WRITER='1').test_client()
+        self.assertFalse(client.post('/test/transaction').get_json()['writer_lock_held'])
+        self.assertTrue(client.post('/test/transaction?write=1').get_json()['writer_lock_held'])
+        self.assertFalse(self.writer_lock_held())
+
+    def test_get_that_writes_survives_a_concurrent_commit(self):
+        """Test that a GET's lazy write does not fail when another connection committed after its read began."""
+        client = self.make_app().test_client()
+        user = self.make_user()
+        with self.app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+        def commit_elsewhere(read):
+            # After the request's first read, so its transaction has a snapshot, commit from another connection
+            calls = []
+            def wrapper(*args, **kwargs):
+                result = read(*args, **kwargs)
+                if not calls:
+                    calls.append(True)
+                    other = sqlite3.connect(self.path, timeout=0)
+                    with other:
+                        other.execute("UPDATE users SET email = email")
+                    other.close()
+                return result
+            return wrapper
+
+        # The todos list records its version scope on first read; weekly
+        # progress builds the user's rollup row
+        with mock.patch.object(versions, 'current', commit_elsewhere(versions.current)):
+            res = client.get('/api/progress/todos', headers=headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNotNone(res.get_etag()[0])
+        with mock.patch.object(rollups, 'get_rollup', commit_elsewhere(rollups.get_rollup)):
+            res = client.get('/api/progress/weekly-progress', headers=headers)
+        self.assertEqual(res.status_code, 200)
+
+    def test_login_holds_no_lock_while_checking_the_password(self):
+        """Test that other writers are not blocked while a login hashes the password."""
+        client = self.make_app(SQLITE_SINGLE_WRITER='1', SQLITE_BUSY_TIMEOUT='200').test_client()
+        self.make_user()
+        seen = []
+
+        def verify(password_hash, password):
+            seen.append((self.other_can_write(), self.writer_lock_held()))
+            return real_verify(password_hash, password)
+
+        real_verify = password_hasher.verify
+        with mock.patch.object(password_hasher, 'verify', verify):
+            res = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(seen, [(True, False)])
+
+    def test_streamed_generation_writes_its_cache_entry(self):
+        """Test that the completion cache can write on its own connection while the request's transaction is open."""
+        client = self.make_app(SQLITE_SINGLE_WRITER='1', SQLITE_BUSY_TIMEOUT='200').test_client()
+        self.app.config['AI_PROVIDER'] = 'stub'
+        completion_cache.clear_memory()
+        user = self.make_user()
+        with self.app.app_context():
+            course = Course(title='Biology', user_id=user.id)
+            db.session.add(course)
+            db.session.commit()
+            course_id = course.id
+            headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+        res = client.post(f'/api/course/{course_id}/generate-notes/stream', json={'topic': 'Cells'}, headers=headers)
+        body = res.get_data(as_text=True)
+        self.assertIn('event: done', body)
+        self.assertNotIn('event: error', body)
+        with self.app.app_context():
+            self.assertEqual(CompletionCacheEntry.query.count(), 1)
+            self.assertEqual(Note.query.filter_by(course_id=course_id).count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
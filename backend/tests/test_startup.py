@@ -0,0 +1,75 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import inspect
+from app import create_app
+from app.extensions import db, init_db_command
+from app.preload import preload
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of the app package, from python -X importtime
+IMPORT_BUDGET_MS = float(os.environ.get('STARTUP_IMPORT_BUDGET_MS', 1500))
+
+# Only needed by the migration CLI, a configured OpenAI provider or the
+# password pool, so booting the app must not import them
+DEFERRED_MODULES = ('alembic', 'mako', 'openai', 'langchain', 'requests', 'multiprocessing')
+
+class StartupTestCase(unittest.TestCase):
+    """Test case for application startup cost."""
+
+    def test_import_time_budget(self):
+        """Test that importing the app and creating it stays within budget and imports nothing heavy."""
+        script = (
+            'import json, sys\n'
+            'from app import create_app\n'
+            'create_app()\n'
+            'print(json.dumps(sorted({name.split(".")[0] for name in sys.modules})))\n'
+        )
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=BACKEND, env={**os.environ, 'DATABASE_URL': 'sqlite:///:memory:'},
+            capture_output=True, text=True, check=True
+        )
+        [app_line] = [line for line in process.stderr.splitlines() if line.endswith('| app')]
+        app_import_ms = int(app_line.split('|')[1]) / 1000
+        self.assertLess(app_import_ms, IMPORT_BUDGET_MS)
+
+        loaded = set(json.loads(process.stdout.strip().splitlines()[-1]))
+        self.assertEqual(loaded & set(DEFERRED_MODULES), set())
+
+    def test_schema_is_created_by_the_cli(self):
+        """Test that create_app leaves the schema alone and init-db creates it."""
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'app.db')}"}):
+                app = create_app()
+            with app.app_context():
+                self.assertEqual(inspect(db.engine).get_table_names(), [])
+
+                result = app.test_cli_runner().invoke(init_db_command)
+                self.assertEqual(result.exit_code, 0)
+                self.assertIn('users', inspect(db.engine).get_table_names())
+                db.engine.dispose()
+
+    def test_migration_commands_load_on_demand(self):
+        """Test that the db command group still lists Flask-Migrate's commands."""
+        app = create_app()
+        result = app.test_cli_runner().invoke(args=['db', '--help'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('upgrade', result.output)
+        self.assertIn('migrate', app.extensions)
+
+    def test_preload_freezes_objects(self):
+        """Test that the preload hook moves loaded objects out of garbage collection."""
+        app = create_app()
+        self.addCleanup(gc.unfreeze)
+        preload(app)
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
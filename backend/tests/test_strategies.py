@@ -1,4 +1,5 @@
 import json
+import os
 import unittest
 from unittest.mock import patch
 from app import create_app
@@ -11,10 +12,11 @@ class StrategiesTestCase(unittest.TestCase):
 
     def setUp(self):
         """Set up test client and initialize test database."""
-        self.app = create_app()
+        with patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
         self.app.config.update({
             'TESTING': True,
-            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'
+            'JOBS_EAGER': True
         })
         self.client = self.app.test_client()
         
@@ -40,11 +42,11 @@ class StrategiesTestCase(unittest.TestCase):
             db.session.remove()
             db.drop_all()
     
-    @patch('app.ai_service.AIService.generate_test_strategies')
-    def test_get_test_strategies(self, mock_generate_strategies):
+    @patch('app.ai_service.AIService.complete')
+    def test_get_test_strategies(self, mock_complete):
         """Test generating test strategies with AI."""
         # Mock the AI service response
-        mock_generate_strategies.return_value = "These are test strategies for multiple-choice exams."
+        mock_complete.return_value = "These are test strategies for multiple-choice exams."
         
         # Generate strategies
         res = self.client.post(
@@ -56,14 +58,20 @@ class StrategiesTestCase(unittest.TestCase):
             })
         )
         
-        # Check response
+        # Check response: generation is handed to the job queue
         data = json.loads(res.data)
+        self.assertEqual(res.status_code, 202)
+        
+        # Poll the job for the strategies
+        res = self.client.get(data['status_url'], headers=self.headers)
+        job = json.loads(res.data)
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(data['test_type'], 'multiple-choice')
-        self.assertEqual(data['strategies'], "These are test strategies for multiple-choice exams.")
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['test_type'], 'multiple-choice')
+        self.assertEqual(job['result']['strategies'], "These are test strategies for multiple-choice exams.")
         
-        # Verify that the AIService was called with the right parameters
-        mock_generate_strategies.assert_called_once_with(
-            test_type='multiple-choice',
-            student_problems=['test anxiety', 'time management']
-        )
+        # Verify that the AIService was called with the right prompt
+        prompt = mock_complete.call_args.args[0]
+        self.assertIn('multiple-choice', prompt)
+        self.assertIn('test anxiety, time management', prompt)
+        self.assertEqual(mock_complete.call_args.kwargs['use_cache'], True)
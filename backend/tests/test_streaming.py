@@ -0,0 +1,156 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.extensions import db
+from app.ai_cache import completion_cache
+from app.models.user import User
+from app.models.study_models import Course, Note
+from app.models.ai_models import CompletionCacheEntry
+from flask_jwt_extended import create_access_token
+
+class FakeStream:
+    """Stand-in for a provider's streamed completion."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.yielded = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.yielded += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+def parse_events(body):
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+class StreamingTestCase(unittest.TestCase):
+    """Test case for the SSE generation endpoints."""
+
+    def setUp(self):
+        """Set up test client and initialize test database."""
+        with patch.dict(os.environ, {'DATABASE_URL': 'sqlite:///:memory:'}):
+            self.app = create_app()
+        self.app.config.update({
+            'TESTING': True,
+            'AI_PROVIDER': 'stub'
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            CompletionCacheEntry.query.delete()
+            completion_cache.clear_memory()
+
+            # Create a test user
+            self.user = User(username='testuser', email='test@example.com')
+            self.user.password = 'testpassword'
+            db.session.add(self.user)
+            db.session.flush()
+
+            # Create a test course
+            self.course = Course(title='Test Course', description='Test Description', user_id=self.user.id)
+            db.session.add(self.course)
+
+            db.session.commit()
+
+            # Create a JWT token for the test user
+            self.access_token = create_access_token(identity=self.user.id)
+            self.headers = {
+                'Authorization': f'Bearer {self.access_token}',
+                'Content-Type': 'application/json'
+            }
+
+    def tearDown(self):
+        """Clean up after the test."""
+        with self.app.app_context():
+            completion_cache.clear_memory()
+            db.session.remove()
+            db.drop_all()
+
+    @patch('app.ai_providers.StubProvider.stream')
+    def test_stream_notes(self, mock_stream):
+        """Test that notes arrive as token events and are saved on completion."""
+        stream = FakeStream(['\n\n# Cells', '\n- Membrane', '\n- Nucleus'])
+        mock_stream.return_value = stream
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-notes/stream',
+            headers=self.headers,
+            data=json.dumps({'topic': 'Cells'})
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.mimetype, 'text/event-stream')
+        events = parse_events(res.get_data(as_text=True))
+        self.assertEqual([name for name, _ in events], ['token', 'token', 'token', 'done'])
+        self.assertEqual(events[0][1]['text'], '# Cells')
+        self.assertEqual(events[-1][1]['content'], '# Cells\n- Membrane\n- Nucleus')
+        self.assertTrue(stream.closed)
+
+        with self.app.app_context():
+            note = Note.query.filter_by(title='Notes: Cells').first()
+            self.assertIsNotNone(note)
+            self.assertEqual(note.id, events[-1][1]['id'])
+
+    @patch('app.ai_providers.StubProvider.stream')
+    def test_client_disconnect_cancels_upstream(self, mock_stream):
+        """Test that closing the response stops the stream without saving a note."""
+        stream = FakeStream(['one ', 'two ', 'three ', 'four'])
+        mock_stream.return_value = stream
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-notes/stream',
+            headers=self.headers,
+            data=json.dumps({'topic': 'Cells'}),
+            buffered=False
+        )
+        first = next(iter(res.response))
+        res.close()
+
+        self.assertIn(b'event: token', first)
+        self.assertTrue(stream.closed)
+        self.assertEqual(stream.yielded, 1)
+        with self.app.app_context():
+            self.assertEqual(Note.query.count(), 0)
+            self.assertEqual(CompletionCacheEntry.query.count(), 0)
+
+    @patch('app.ai_providers.StubProvider.stream')
+    def test_stream_test_strategies_uses_cache(self, mock_stream):
+        """Test that a repeated strategies stream is served from the cache."""
+        mock_stream.side_effect = lambda *args, **kwargs: FakeStream(['Read ', 'every ', 'question.'])
+        body = json.dumps({'test_type': 'essay', 'problems': ['time management']})
+
+        first = parse_events(self.client.post('/api/test-strategies/stream', headers=self.headers, data=body).get_data(as_text=True))
+        second = parse_events(self.client.post('/api/test-strategies/stream', headers=self.headers, data=body).get_data(as_text=True))
+
+        self.assertEqual(first[-1], ('done', {'test_type': 'essay', 'strategies': 'Read every question.'}))
+        self.assertEqual(second, [('token', {'text': 'Read every question.'}), first[-1]])
+        self.assertEqual(mock_stream.call_count, 1)
+
+    @patch('app.ai_providers.StubProvider.stream')
+    def test_stream_reports_provider_error(self, mock_stream):
+        """Test that a provider failure is reported as an error event."""
+        mock_stream.side_effect = RuntimeError("provider unavailable")
+
+        res = self.client.post(
+            f'/api/course/{self.course.id}/generate-notes/stream',
+            headers=self.headers,
+            data=json.dumps({'topic': 'Cells'})
+        )
+
+        events = parse_events(res.get_data(as_text=True))
+        self.assertEqual(events, [('error', {'error': 'provider unavailable'})])
+
+if __name__ == '__main__':
+    unittest.main()
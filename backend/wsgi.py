@@ -1,6 +1,10 @@
 from app import create_app
+from app.preload import preload
 
 app = create_app()
+# Under a preloading server (gunicorn --preload) this runs once in the
+# master, so forked workers share the loaded app copy-on-write
+preload(app)
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
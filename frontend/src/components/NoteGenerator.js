@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
+import { waitForJob } from '../services/jobs';
 
 const NoteGenerator = ({ courseId }) => {
   const [topic, setTopic] = useState('');
@@ -35,12 +36,15 @@ const NoteGenerator = ({ courseId }) => {
         }
       );
       
+      // Generation is queued; wait for the job to produce the note
+      const result = await waitForJob(response.data.status_url, token);
+      
       // Navigate to view the new note
-      navigate(`/course/${courseId}/note/${response.data.id}`);
+      navigate(`/course/${courseId}/note/${result.note.id}`);
       
     } catch (err) {
       console.error('Error generating notes:', err);
-      setError(err.response?.data?.error || 'Failed to generate notes. Please try again.');
+      setError(err.response?.data?.error || err.message || 'Failed to generate notes. Please try again.');
     } finally {
       setIsGenerating(false);
     }
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import axios from 'axios';
 import ReactMarkdown from 'react-markdown';
+import { waitForJob } from '../services/jobs';
 
 const TestStrategies = () => {
   const [testType, setTestType] = useState('multiple-choice');
@@ -67,11 +68,14 @@ const TestStrategies = () => {
         }
       );
       
-      setStrategies(response.data.strategies);
+      // Generation is queued; wait for the job to produce the strategies
+      const result = await waitForJob(response.data.status_url, token);
+      
+      setStrategies(result.strategies);
       
     } catch (err) {
       console.error('Error generating test strategies:', err);
-      setError(err.response?.data?.error || 'Failed to generate strategies. Please try again.');
+      setError(err.response?.data?.error || err.message || 'Failed to generate strategies. Please try again.');
     } finally {
       setIsLoading(false);
     }
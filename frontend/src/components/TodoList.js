@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { format } from 'date-fns';
+import { fetchAllPages } from '../services/pagination';
 
 const TodoList = () => {
   const [todos, setTodos] = useState([]);
@@ -18,12 +19,7 @@ const TodoList = () => {
     setLoading(true);
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get('/api/progress/todos', {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-      setTodos(response.data);
+      setTodos(await fetchAllPages('/api/progress/todos', token));
     } catch (err) {
       console.error('Error fetching todos:', err);
       setError('Failed to load todo list. Please try again.');
@@ -1,8 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import axios from 'axios';
 import { format, addDays } from 'date-fns';
 import TodoList from '../components/TodoList';
+import { fetchAllPages } from '../services/pagination';
 
 const Dashboard = () => {
   const [courses, setCourses] = useState([]);
@@ -16,12 +16,7 @@ const Dashboard = () => {
     const fetchCourses = async () => {
       try {
         const token = localStorage.getItem('token');
-        const response = await axios.get('/api/courses', {
-          headers: {
-            'Authorization': `Bearer ${token}`
-          }
-        });
-        setCourses(response.data);
+        setCourses(await fetchAllPages('/api/courses', token));
       } catch (err) {
         console.error('Error fetching courses:', err);
         setError('Failed to load courses. Please try again.');
@@ -0,0 +1,29 @@
+import axios from 'axios';
+
+const POLL_INTERVAL_MS = 1000;
+const JOB_TIMEOUT_MS = 5 * 60 * 1000;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Poll a queued generation job until it finishes and return its result;
+// give up once the deadline passes so a stuck job cannot spin forever
+export const waitForJob = async (statusUrl, token, timeoutMs = JOB_TIMEOUT_MS) => {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const response = await axios.get(statusUrl, {
+      headers: {
+        'Authorization': `Bearer ${token}`
+      }
+    });
+    
+    if (response.data.status === 'succeeded') {
+      return response.data.result;
+    }
+    if (response.data.status === 'failed') {
+      throw new Error(response.data.error || 'Generation failed');
+    }
+    
+    await sleep(POLL_INTERVAL_MS);
+  }
+  throw new Error('Generation timed out, please try again later');
+};
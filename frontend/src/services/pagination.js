@@ -0,0 +1,20 @@
+import axios from 'axios';
+
+// Follow next_cursor through a paginated list endpoint and return every item
+export const fetchAllPages = async (url, token) => {
+  const items = [];
+  let cursor = null;
+  
+  do {
+    const response = await axios.get(url, {
+      params: cursor ? { cursor } : {},
+      headers: {
+        'Authorization': `Bearer ${token}`
+      }
+    });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  
+  return items;
+};